@@ -0,0 +1,85 @@
+"""
+Alembic 运行环境
+应用启动时由 app.database.migrations.run_migrations 传入已建立的数据库连接；
+在命令行中执行 alembic 时使用应用的数据库引擎 (DATABASE_URL)。
+"""
+
+from logging.config import fileConfig
+
+from alembic import context
+
+from app.database.fts import TRANSACTION_FTS_TABLE
+from app.models.base import Base
+
+config = context.config
+target_metadata = Base.metadata
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    """自动生成迁移时忽略由迁移维护的全文索引虚拟表及其影子表"""
+    if type_ == "table" and name.startswith(TRANSACTION_FTS_TABLE):
+        return False
+    return True
+
+
+def report_version_applied(ctx, step, heads, run_args):
+    """每个迁移执行完成后打印版本号和说明"""
+    if step.is_stamp:
+        return
+    revision = step.up_revision
+    action = "执行" if step.is_upgrade else "回退"
+    print(f"🛠️ {action}数据库迁移 {revision.revision}: {revision.doc}")
+
+
+def run_migrations(connection):
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        # SQLite 不支持大部分 ALTER TABLE 操作，自动生成的迁移使用批量重建表的方式
+        render_as_batch=connection.dialect.name == "sqlite",
+        # 每个迁移在独立事务中执行，失败时已完成的迁移保持有效
+        transaction_per_migration=True,
+        on_version_apply=report_version_applied,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_offline():
+    """生成 SQL 脚本而不连接数据库 (alembic upgrade head --sql)"""
+    from app.database.connection import DATABASE_URL
+
+    context.configure(
+        url=DATABASE_URL,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        literal_binds=True,
+        render_as_batch=DATABASE_URL.startswith("sqlite"),
+        transaction_per_migration=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        run_migrations(connection)
+        return
+
+    # 命令行执行时使用 alembic.ini 中的日志配置
+    if config.config_file_name is not None:
+        fileConfig(config.config_file_name)
+
+    from app.database.connection import engine
+
+    with engine.connect() as connection:
+        run_migrations(connection)
+        connection.commit()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
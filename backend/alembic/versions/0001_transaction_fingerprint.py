@@ -0,0 +1,89 @@
+"""交易明细去重指纹
+
+为交易明细添加去重指纹列、回填已有数据并创建唯一索引。
+同一指纹只保留在最早的记录上，其余重复记录保持为空，避免唯一索引冲突。
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.fingerprint import compute_transaction_fingerprint
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+transaction_details = sa.table(
+    "transaction_details",
+    sa.column("id", sa.Integer),
+    sa.column("transaction_time", sa.DateTime),
+    sa.column("amount", sa.Float),
+    sa.column("counterparty", sa.String),
+    sa.column("item_name", sa.String),
+    sa.column("fingerprint", sa.String),
+)
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+    columns = {column["name"] for column in inspector.get_columns("transaction_details")}
+    if "fingerprint" not in columns:
+        op.add_column("transaction_details", sa.Column("fingerprint", sa.String(64), nullable=True))
+
+    table = transaction_details
+    seen_fingerprints = set(
+        connection.execute(
+            sa.select(table.c.fingerprint).where(table.c.fingerprint.is_not(None))
+        ).scalars()
+    )
+    rows = connection.execute(
+        sa.select(
+            table.c.id,
+            table.c.transaction_time,
+            table.c.amount,
+            table.c.counterparty,
+            table.c.item_name,
+        )
+        .where(table.c.fingerprint.is_(None))
+        .order_by(table.c.id)
+    ).all()
+
+    updates = []
+    for row in rows:
+        fingerprint = compute_transaction_fingerprint(
+            row.transaction_time, row.amount, row.counterparty, row.item_name
+        )
+        if fingerprint in seen_fingerprints:
+            continue
+        seen_fingerprints.add(fingerprint)
+        updates.append({"row_id": row.id, "value": fingerprint})
+
+    update_statement = (
+        sa.update(table)
+        .where(table.c.id == sa.bindparam("row_id"))
+        .values(fingerprint=sa.bindparam("value"))
+    )
+    for start in range(0, len(updates), BACKFILL_BATCH_SIZE):
+        connection.execute(update_statement, updates[start : start + BACKFILL_BATCH_SIZE])
+
+    existing_indexes = {index["name"] for index in inspector.get_indexes("transaction_details")}
+    if "ix_transaction_details_fingerprint" not in existing_indexes:
+        op.create_index(
+            "ix_transaction_details_fingerprint", "transaction_details", ["fingerprint"], unique=True
+        )
+
+    print(f"🔑 交易指纹回填完成: {len(updates)} 条记录")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_transaction_details_fingerprint", table_name="transaction_details")
+    with op.batch_alter_table("transaction_details") as batch_op:
+        batch_op.drop_column("fingerprint")
@@ -0,0 +1,33 @@
+"""交易明细全文索引
+
+创建交易明细的 FTS5 trigram 全文索引及同步触发器；
+SQLite 不支持 FTS5/trigram 时跳过，关键词搜索回退到 LIKE。
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 00:00:00
+"""
+
+from alembic import op
+
+from app.database.fts import drop_transaction_fts, try_create_transaction_fts
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    if connection.dialect.name != "sqlite":
+        return
+
+    if try_create_transaction_fts(connection, legacy=True):
+        print("🔎 交易明细全文索引创建完成")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    drop_transaction_fts(op.get_bind())
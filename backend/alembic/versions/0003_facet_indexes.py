@@ -0,0 +1,35 @@
+"""支付方式和交易对方索引
+
+为支付方式和交易对方创建索引，用于筛选项统计和交易对方前缀搜索。
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+FACET_INDEXES = {
+    "ix_transaction_details_payment_method": ["payment_method"],
+    "ix_transaction_details_counterparty": ["counterparty"],
+}
+
+
+def upgrade() -> None:
+    existing_indexes = {
+        index["name"] for index in sa.inspect(op.get_bind()).get_indexes("transaction_details")
+    }
+    for name, columns in FACET_INDEXES.items():
+        if name not in existing_indexes:
+            op.create_index(name, "transaction_details", columns)
+
+
+def downgrade() -> None:
+    for name in FACET_INDEXES:
+        op.drop_index(name, table_name="transaction_details")
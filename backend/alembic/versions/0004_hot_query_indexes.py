@@ -0,0 +1,65 @@
+"""交易明细热点查询索引
+
+按实际热点查询创建组合索引和覆盖索引，并更新 SQLite 的统计信息供查询规划器选择索引：
+- 分类 + 收支类型 + 时间范围：交易查询、汇总统计
+- 时间范围 + 分类 + 收支类型：月度聚合 (覆盖 amount，不回表)
+- 金额排序：按金额排序的交易查询
+- 去重键：导入时按交易时间查找已有记录的去重字段 (覆盖索引，不回表)
+
+索引定义与 app/models/base.py 中 TransactionDetail.__table_args__ 保持一致，
+查询计划由 tests/test_query_plans.py 检查。
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+HOT_QUERY_INDEXES = {
+    "ix_transaction_details_category_type_time": [
+        "category",
+        "income_expense_type",
+        "transaction_time",
+        "amount",
+    ],
+    "ix_transaction_details_time_category_type": [
+        "transaction_time",
+        "category",
+        "income_expense_type",
+        "amount",
+    ],
+    "ix_transaction_details_amount": ["amount"],
+    "ix_transaction_details_dedup_key": [
+        "transaction_time",
+        "amount",
+        "counterparty",
+        "item_name",
+        "fingerprint",
+    ],
+}
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    existing_indexes = {
+        index["name"] for index in sa.inspect(connection).get_indexes("transaction_details")
+    }
+    for name, columns in HOT_QUERY_INDEXES.items():
+        if name not in existing_indexes:
+            op.create_index(name, "transaction_details", columns)
+
+    # 没有统计信息时 SQLite 无法区分选择性不同的索引
+    if connection.dialect.name == "sqlite":
+        op.execute("ANALYZE transaction_details")
+
+
+def downgrade() -> None:
+    for name in HOT_QUERY_INDEXES:
+        op.drop_index(name, table_name="transaction_details")
@@ -0,0 +1,138 @@
+"""交易明细整数金额列
+
+添加整数分金额 amount_cents 和带符号的收支流向 signed_amount_cents，按 amount 和收支类型回填，
+并重建热点查询的覆盖索引，使汇总统计和月度聚合直接对整数列求和而不回表。
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.amounts import derive_amount_columns
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+AMOUNT_COLUMNS = ("amount_cents", "signed_amount_cents")
+
+# 覆盖整数金额列的热点查询索引，0004 中的版本覆盖的是 amount
+COVERING_INDEXES = {
+    "ix_transaction_details_category_type_time": [
+        "category",
+        "income_expense_type",
+        "transaction_time",
+        "amount_cents",
+        "signed_amount_cents",
+    ],
+    "ix_transaction_details_time_category_type": [
+        "transaction_time",
+        "category",
+        "income_expense_type",
+        "amount_cents",
+        "signed_amount_cents",
+    ],
+}
+
+PREVIOUS_COVERING_INDEXES = {
+    "ix_transaction_details_category_type_time": [
+        "category",
+        "income_expense_type",
+        "transaction_time",
+        "amount",
+    ],
+    "ix_transaction_details_time_category_type": [
+        "transaction_time",
+        "category",
+        "income_expense_type",
+        "amount",
+    ],
+}
+
+transaction_details = sa.table(
+    "transaction_details",
+    sa.column("id", sa.Integer),
+    sa.column("amount", sa.Float),
+    sa.column("income_expense_type", sa.String),
+    sa.column("amount_cents", sa.Integer),
+    sa.column("signed_amount_cents", sa.Integer),
+)
+
+
+def _replace_indexes(indexes):
+    """按名称重建列定义不一致的索引"""
+    existing_indexes = {
+        index["name"]: index["column_names"]
+        for index in sa.inspect(op.get_bind()).get_indexes("transaction_details")
+    }
+    for name, columns in indexes.items():
+        if existing_indexes.get(name) == columns:
+            continue
+        if name in existing_indexes:
+            op.drop_index(name, table_name="transaction_details")
+        op.create_index(name, "transaction_details", columns)
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    columns = {column["name"] for column in sa.inspect(connection).get_columns("transaction_details")}
+    for name in AMOUNT_COLUMNS:
+        if name not in columns:
+            op.add_column(
+                "transaction_details",
+                sa.Column(name, sa.Integer, nullable=False, server_default="0"),
+            )
+
+    # 按 id 分批回填，每批只在内存中保留 BACKFILL_BATCH_SIZE 行
+    table = transaction_details
+    update_statement = (
+        sa.update(table)
+        .where(table.c.id == sa.bindparam("row_id"))
+        .values(
+            amount_cents=sa.bindparam("cents"),
+            signed_amount_cents=sa.bindparam("signed_cents"),
+        )
+    )
+    last_id = 0
+    updated = 0
+    while True:
+        rows = connection.execute(
+            sa.select(table.c.id, table.c.amount, table.c.income_expense_type)
+            .where(table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        updates = []
+        for row in rows:
+            derived = derive_amount_columns(row.amount, row.income_expense_type)
+            updates.append(
+                {
+                    "row_id": row.id,
+                    "cents": derived["amount_cents"],
+                    "signed_cents": derived["signed_amount_cents"],
+                }
+            )
+        connection.execute(update_statement, updates)
+        updated += len(updates)
+        last_id = rows[-1].id
+
+    _replace_indexes(COVERING_INDEXES)
+    if connection.dialect.name == "sqlite":
+        op.execute("ANALYZE transaction_details")
+
+    print(f"💰 整数金额列回填完成: {updated} 条记录")
+
+
+def downgrade() -> None:
+    _replace_indexes(PREVIOUS_COVERING_INDEXES)
+    # 不使用 batch_alter_table：重建表会丢失全文索引触发器 (需要 SQLite 3.35+)
+    for name in AMOUNT_COLUMNS:
+        op.drop_column("transaction_details", name)
@@ -0,0 +1,123 @@
+"""交易明细时间分桶列
+
+添加年月 year_month (YYYYMM) 和交易日期 local_date 并按交易时间回填，
+月度聚合改为按 (year_month, category) 覆盖索引分组，替换按交易时间范围的覆盖索引。
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.time_buckets import to_year_month
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+TIME_BUCKET_COLUMNS = {
+    "year_month": sa.Integer,
+    "local_date": sa.Date,
+}
+
+NEW_INDEXES = {
+    "ix_transaction_details_local_date": ["local_date"],
+    "ix_transaction_details_month_category": [
+        "year_month",
+        "category",
+        "amount_cents",
+        "signed_amount_cents",
+    ],
+}
+
+# 月度聚合不再按交易时间范围筛选，该索引由 ix_transaction_details_month_category 取代
+REPLACED_INDEXES = {
+    "ix_transaction_details_time_category_type": [
+        "transaction_time",
+        "category",
+        "income_expense_type",
+        "amount_cents",
+        "signed_amount_cents",
+    ],
+}
+
+transaction_details = sa.table(
+    "transaction_details",
+    sa.column("id", sa.Integer),
+    sa.column("transaction_time", sa.DateTime),
+    sa.column("year_month", sa.Integer),
+    sa.column("local_date", sa.Date),
+)
+
+
+def _existing_indexes():
+    return {index["name"] for index in sa.inspect(op.get_bind()).get_indexes("transaction_details")}
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    columns = {column["name"] for column in sa.inspect(connection).get_columns("transaction_details")}
+    for name, column_type in TIME_BUCKET_COLUMNS.items():
+        if name not in columns:
+            op.add_column("transaction_details", sa.Column(name, column_type, nullable=True))
+
+    # 按 id 分批回填，每批只在内存中保留 BACKFILL_BATCH_SIZE 行
+    table = transaction_details
+    update_statement = (
+        sa.update(table)
+        .where(table.c.id == sa.bindparam("row_id"))
+        .values(
+            year_month=sa.bindparam("bucket_month"),
+            local_date=sa.bindparam("bucket_date"),
+        )
+    )
+    last_id = 0
+    updated = 0
+    while True:
+        rows = connection.execute(
+            sa.select(table.c.id, table.c.transaction_time)
+            .where(table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        # local_date 已在 0011 删除，不再由 derive_time_bucket_columns 计算
+        updates = [
+            {
+                "row_id": row.id,
+                "bucket_month": to_year_month(row.transaction_time),
+                "bucket_date": row.transaction_time.date(),
+            }
+            for row in rows
+        ]
+        connection.execute(update_statement, updates)
+        updated += len(updates)
+        last_id = rows[-1].id
+
+    existing_indexes = _existing_indexes()
+    for name, index_columns in NEW_INDEXES.items():
+        if name not in existing_indexes:
+            op.create_index(name, "transaction_details", index_columns)
+    for name in REPLACED_INDEXES:
+        if name in existing_indexes:
+            op.drop_index(name, table_name="transaction_details")
+    if connection.dialect.name == "sqlite":
+        op.execute("ANALYZE transaction_details")
+
+    print(f"📅 时间分桶列回填完成: {updated} 条记录")
+
+
+def downgrade() -> None:
+    for name, index_columns in REPLACED_INDEXES.items():
+        op.create_index(name, "transaction_details", index_columns)
+    for name in NEW_INDEXES:
+        op.drop_index(name, table_name="transaction_details")
+    # 不使用 batch_alter_table：重建表会丢失全文索引触发器 (需要 SQLite 3.35+)
+    for name in TIME_BUCKET_COLUMNS:
+        op.drop_column("transaction_details", name)
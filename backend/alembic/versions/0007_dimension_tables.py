@@ -0,0 +1,149 @@
+"""交易明细维度表
+
+为交易类型、支付方式、交易对方创建维度表，交易明细添加引用维度表的整数 id 列并回填，
+热点查询的覆盖索引改为按 category_id 组织，并为时间范围内的筛选项统计添加覆盖维度 id 的索引。
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+# 交易明细字符串列 -> (维度表, id 列, 取值最大长度)
+DIMENSIONS = {
+    "category": ("dim_categories", "category_id", 15),
+    "payment_method": ("dim_payment_methods", "payment_method_id", 13),
+    "counterparty": ("dim_counterparties", "counterparty_id", 200),
+}
+
+COVERING_INDEXES = {
+    "ix_transaction_details_category_type_time": [
+        "category_id",
+        "income_expense_type",
+        "transaction_time",
+        "amount_cents",
+        "signed_amount_cents",
+    ],
+    "ix_transaction_details_month_category": [
+        "year_month",
+        "category_id",
+        "amount_cents",
+        "signed_amount_cents",
+    ],
+    "ix_transaction_details_time_dimensions": [
+        "transaction_time",
+        "category_id",
+        "income_expense_type",
+        "payment_method_id",
+        "counterparty_id",
+    ],
+}
+
+PREVIOUS_COVERING_INDEXES = {
+    "ix_transaction_details_category_type_time": [
+        "category",
+        "income_expense_type",
+        "transaction_time",
+        "amount_cents",
+        "signed_amount_cents",
+    ],
+    "ix_transaction_details_month_category": [
+        "year_month",
+        "category",
+        "amount_cents",
+        "signed_amount_cents",
+    ],
+}
+
+
+def _replace_indexes(indexes):
+    """按名称重建列定义不一致的索引"""
+    existing_indexes = {
+        index["name"]: index["column_names"]
+        for index in sa.inspect(op.get_bind()).get_indexes("transaction_details")
+    }
+    for name, columns in indexes.items():
+        if existing_indexes.get(name) == columns:
+            continue
+        if name in existing_indexes:
+            op.drop_index(name, table_name="transaction_details")
+        op.create_index(name, "transaction_details", columns)
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+    columns = {column["name"] for column in inspector.get_columns("transaction_details")}
+    existing_indexes = {index["name"] for index in inspector.get_indexes("transaction_details")}
+    transaction_details = sa.table("transaction_details", sa.column("id", sa.Integer))
+
+    for value_column, (table_name, id_column, length) in DIMENSIONS.items():
+        # 新数据库的维度表已由 create_all 创建
+        if not inspector.has_table(table_name):
+            op.create_table(
+                table_name,
+                sa.Column("id", sa.Integer, primary_key=True),
+                sa.Column("name", sa.String(length), nullable=False, unique=True),
+            )
+        if id_column not in columns:
+            op.add_column(
+                "transaction_details",
+                sa.Column(id_column, sa.Integer, nullable=True),
+            )
+
+        dimension = sa.table(table_name, sa.column("id", sa.Integer), sa.column("name", sa.String))
+        value = sa.column(value_column, sa.String)
+        id_value = sa.column(id_column, sa.Integer)
+        transaction_details.append_column(value)
+        transaction_details.append_column(id_value)
+
+        # 写入维度表中还没有的取值
+        existing_names = sa.select(dimension.c.name)
+        connection.execute(
+            dimension.insert().from_select(
+                ["name"],
+                sa.select(value)
+                .select_from(transaction_details)
+                .where(value.is_not(None), value.not_in(existing_names))
+                .distinct(),
+            )
+        )
+        # 按取值回填 id，维度表的 name 唯一索引保证每行一次索引查找
+        connection.execute(
+            transaction_details.update()
+            .where(id_value.is_(None), value.is_not(None))
+            .values(
+                {
+                    id_column: sa.select(dimension.c.id)
+                    .where(dimension.c.name == value)
+                    .scalar_subquery()
+                }
+            )
+        )
+
+        index_name = f"ix_transaction_details_{id_column}"
+        if index_name not in existing_indexes:
+            op.create_index(index_name, "transaction_details", [id_column])
+
+    _replace_indexes(COVERING_INDEXES)
+    if connection.dialect.name == "sqlite":
+        op.execute("ANALYZE")
+
+    print("🗂️ 交易明细维度表回填完成")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_transaction_details_time_dimensions", table_name="transaction_details")
+    _replace_indexes(PREVIOUS_COVERING_INDEXES)
+    # 不使用 batch_alter_table：重建表会丢失全文索引触发器 (需要 SQLite 3.35+)
+    for table_name, id_column, _ in DIMENSIONS.values():
+        op.drop_index(f"ix_transaction_details_{id_column}", table_name="transaction_details")
+        op.drop_column("transaction_details", id_column)
+        op.drop_table(table_name)
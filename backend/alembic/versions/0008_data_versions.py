@@ -0,0 +1,36 @@
+"""数据版本表
+
+创建 data_versions 表及触发器，交易明细、月度聚合、资产负债表每次写入时递增对应数据域的版本号，
+查询缓存和 ETag 据此判断数据是否变化，不再依赖进程内计数器。
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.data_version import create_data_version_triggers, data_version_trigger_names
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    if not sa.inspect(connection).has_table("data_versions"):
+        op.create_table(
+            "data_versions",
+            sa.Column("domain", sa.String(20), primary_key=True),
+            sa.Column("version", sa.Integer(), nullable=False, server_default="0"),
+        )
+    create_data_version_triggers(connection)
+
+
+def downgrade() -> None:
+    for trigger in data_version_trigger_names():
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    op.drop_table("data_versions")
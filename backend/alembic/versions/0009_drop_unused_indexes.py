@@ -0,0 +1,52 @@
+"""删除交易明细的冗余索引
+
+以下索引没有热点查询使用，却在每次写入时都要维护：
+- 去重键：导入去重按交易时间范围查找，由交易时间索引和唯一的 fingerprint 索引完成，
+  复制 counterparty、item_name 长字符串的覆盖索引只增加写入和存储开销
+- 金额：按金额排序的分页查询只取前 N 行，SQLite 扫描时按 LIMIT 保留前 N 行即可
+- 支付方式、交易对方：筛选和筛选项统计已改为按维度 id 进行
+- 交易日期：没有按 local_date 筛选的查询
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+UNUSED_INDEXES = {
+    "ix_transaction_details_dedup_key": [
+        "transaction_time",
+        "amount",
+        "counterparty",
+        "item_name",
+        "fingerprint",
+    ],
+    "ix_transaction_details_amount": ["amount"],
+    "ix_transaction_details_payment_method": ["payment_method"],
+    "ix_transaction_details_counterparty": ["counterparty"],
+    "ix_transaction_details_local_date": ["local_date"],
+}
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    existing_indexes = {
+        index["name"] for index in sa.inspect(connection).get_indexes("transaction_details")
+    }
+    for name in UNUSED_INDEXES:
+        if name in existing_indexes:
+            op.drop_index(name, table_name="transaction_details")
+    if connection.dialect.name == "sqlite":
+        op.execute("ANALYZE transaction_details")
+
+
+def downgrade() -> None:
+    for name, columns in UNUSED_INDEXES.items():
+        op.create_index(name, "transaction_details", columns)
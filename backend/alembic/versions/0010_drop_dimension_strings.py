@@ -0,0 +1,142 @@
+"""删除交易明细的维度字符串列
+
+交易明细只保留 category_id、payment_method_id、counterparty_id，删除 category、payment_method、
+counterparty 字符串列并将 category_id 改为非空；删除列需要重建表，重建前补齐缺失的维度 id，
+重建后创建按原有列名展示交易明细的兼容视图 transaction_records，全文索引改为以该视图为内容表，
+并重新创建数据版本触发器。
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.database.dimensions import TRANSACTION_RECORDS_VIEW, create_transaction_records_view
+from app.database.fts import TRANSACTION_FTS_TABLE, drop_transaction_fts, try_create_transaction_fts
+from app.utils.data_version import create_data_version_triggers
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+# 交易明细字符串列 -> (维度表, id 列, 取值最大长度, 是否非空)
+DIMENSIONS = {
+    "category": ("dim_categories", "category_id", 15, True),
+    "payment_method": ("dim_payment_methods", "payment_method_id", 13, False),
+    "counterparty": ("dim_counterparties", "counterparty_id", 200, False),
+}
+
+# category_type_time 索引以 category_id 开头，单列索引是冗余的
+REDUNDANT_INDEXES = {
+    "ix_transaction_details_category_id": ["category_id"],
+}
+
+# 字符串列上的索引，随列一起删除
+STRING_INDEXES = {
+    "ix_transaction_details_category": ["category"],
+}
+
+
+def _has_fts(connection) -> bool:
+    return sa.inspect(connection).has_table(TRANSACTION_FTS_TABLE)
+
+
+def _backfill_dimension_ids(connection):
+    """为维度 id 为空但存储了字符串取值的记录补齐 id (如绕过应用直接写入的记录)"""
+    for value_column, (table_name, id_column, _, _) in DIMENSIONS.items():
+        dimension = sa.table(table_name, sa.column("id", sa.Integer), sa.column("name", sa.String))
+        value = sa.column(value_column, sa.String)
+        id_value = sa.column(id_column, sa.Integer)
+        transaction_details = sa.table("transaction_details", value, id_value)
+        missing = sa.and_(id_value.is_(None), value.is_not(None))
+
+        connection.execute(
+            dimension.insert().from_select(
+                ["name"],
+                sa.select(value)
+                .select_from(transaction_details)
+                .where(missing, value.not_in(sa.select(dimension.c.name)))
+                .distinct(),
+            )
+        )
+        connection.execute(
+            transaction_details.update()
+            .where(missing)
+            .values(
+                {
+                    id_column: sa.select(dimension.c.id)
+                    .where(dimension.c.name == value)
+                    .scalar_subquery()
+                }
+            )
+        )
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+    columns = {column["name"] for column in inspector.get_columns("transaction_details")}
+    if not columns & set(DIMENSIONS):
+        return
+
+    _backfill_dimension_ids(connection)
+
+    # 重建表会删除表上的触发器，全文索引表引用的内容表也会变化，先删除再重新创建
+    has_fts = _has_fts(connection)
+    drop_transaction_fts(connection)
+    op.execute(f"DROP VIEW IF EXISTS {TRANSACTION_RECORDS_VIEW}")
+
+    existing_indexes = {index["name"] for index in inspector.get_indexes("transaction_details")}
+    for name in {**STRING_INDEXES, **REDUNDANT_INDEXES}:
+        if name in existing_indexes:
+            op.drop_index(name, table_name="transaction_details")
+
+    with op.batch_alter_table("transaction_details", recreate="always") as batch_op:
+        for value_column in DIMENSIONS:
+            batch_op.drop_column(value_column)
+        batch_op.alter_column("category_id", existing_type=sa.Integer, nullable=False)
+
+    create_transaction_records_view(connection)
+    if has_fts:
+        try_create_transaction_fts(connection)
+    create_data_version_triggers(connection)
+    if connection.dialect.name == "sqlite":
+        op.execute("ANALYZE")
+
+    print("🗂️ 交易明细维度字符串列已删除，可通过 transaction_records 视图按原有列名查询")
+    print("💡 重建表释放的空间留在数据库文件中供后续写入复用，执行 VACUUM 可缩小数据库文件")
+
+
+def downgrade() -> None:
+    connection = op.get_bind()
+    has_fts = _has_fts(connection)
+    drop_transaction_fts(connection)
+    op.execute(f"DROP VIEW IF EXISTS {TRANSACTION_RECORDS_VIEW}")
+
+    # 先以可空列添加并按维度 id 回填，再将 category 改为非空
+    with op.batch_alter_table("transaction_details", recreate="always") as batch_op:
+        for value_column, (_, _, length, _) in DIMENSIONS.items():
+            batch_op.add_column(sa.Column(value_column, sa.String(length), nullable=True))
+        batch_op.alter_column("category_id", existing_type=sa.Integer, nullable=True)
+
+    for value_column, (table_name, id_column, _, _) in DIMENSIONS.items():
+        op.execute(
+            f"UPDATE transaction_details SET {value_column} = "
+            f"(SELECT name FROM {table_name} WHERE {table_name}.id = transaction_details.{id_column})"
+        )
+
+    with op.batch_alter_table("transaction_details", recreate="always") as batch_op:
+        for value_column, (_, _, length, not_null) in DIMENSIONS.items():
+            if not_null:
+                batch_op.alter_column(
+                    value_column, existing_type=sa.String(length), nullable=False
+                )
+
+    for name, index_columns in {**STRING_INDEXES, **REDUNDANT_INDEXES}.items():
+        op.create_index(name, "transaction_details", index_columns)
+    if has_fts:
+        try_create_transaction_fts(connection, legacy=True)
+    create_data_version_triggers(connection)
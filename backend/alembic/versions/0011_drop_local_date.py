@@ -0,0 +1,39 @@
+"""删除交易明细的交易日期列
+
+local_date 没有查询使用 (其索引已在 0009 删除)，却在每次写入时都要计算和存储，删除该列；
+兼容视图 transaction_records 引用了该列，删除前先删除视图，删除后按当前字段重新创建。
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-17 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.database.dimensions import TRANSACTION_RECORDS_VIEW, create_transaction_records_view
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    columns = {column["name"] for column in sa.inspect(connection).get_columns("transaction_details")}
+    if "local_date" not in columns:
+        return
+
+    # 不使用 batch_alter_table：重建表会丢失全文索引和数据版本触发器 (需要 SQLite 3.35+)
+    op.execute(f"DROP VIEW IF EXISTS {TRANSACTION_RECORDS_VIEW}")
+    op.drop_column("transaction_details", "local_date")
+    create_transaction_records_view(connection)
+
+    print("📅 交易明细交易日期列已删除")
+
+
+def downgrade() -> None:
+    op.add_column("transaction_details", sa.Column("local_date", sa.Date, nullable=True))
+    # 交易时间以 "YYYY-MM-DD HH:MM:SS.ffffff" 文本存储，date() 取出的日期与 Date 列的存储格式一致
+    op.execute("UPDATE transaction_details SET local_date = date(transaction_time)")
@@ -1,18 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Request
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Literal, Optional
 import tempfile
 import os
 import io
 import json
 
 from app.database.connection import get_db
+from app.services.analyze.analytics_service import AnalyticsService
 from app.services.analyze.financial_service import FinancialService
+from app.services.analyze.transaction_filter import InvalidFilterError, TransactionFilter
 from app.services.analyze.transaction_service import TransactionService
 from app.services.balance_sheet_service import BalanceSheetService
 from app.services.transaction_import_export_service import TransactionImportExportService
 from app.services.bill_parser_service import BillParser, BillParserError
+from app.utils.cursor import InvalidCursorError
+from app.utils.data_version import BALANCE_SHEET, FINANCIAL, TRANSACTIONS
+from app.utils.fast_json import FastJSONResponse, rows_to_dicts
+from app.utils.query_cache import cached_response
+from app.utils.record_export import EXPORT_FORMATS
+from app.utils.record_stream import (
+    STREAM_MEDIA_TYPES,
+    StreamFormatUnavailableError,
+    ensure_arrow_available,
+    iter_arrow_ipc,
+    iter_ndjson,
+    negotiate_stream_format,
+)
 from app import schemas
 
 router = APIRouter()
@@ -21,36 +36,152 @@ router = APIRouter()
 # 交易记录查询API
 @router.post("/transactions/search", response_model=schemas.TransactionFilterResult)
 def search_transactions(
-    filter_query: schemas.TransactionFilterQuery, db: Session = Depends(get_db)
+    filter_query: schemas.TransactionFilterQuery,
+    request: Request,
+    format: Optional[Literal["json", "ndjson", "arrow"]] = Query(
+        default=None, description="响应格式，未指定时根据 Accept 请求头选择"
+    ),
+    db: Session = Depends(get_db),
 ):
     """
     根据多种条件筛选交易记录
+
+    format 为 ndjson/arrow，或 Accept 为 application/x-ndjson /
+    application/vnd.apache.arrow.stream 时，按 skip/limit 流式返回记录，不包含总数和分页信息
     """
-    try:
+    transaction_filter = TransactionFilter.from_query(filter_query)
+    stream_format = negotiate_stream_format(format, request.headers.get("accept"))
+    if stream_format:
+        try:
+            if stream_format == "arrow":
+                ensure_arrow_available()
+            rows = TransactionService.stream_records(
+                db=db,
+                transaction_filter=transaction_filter,
+                skip=filter_query.skip,
+                limit=filter_query.limit,
+                order_by=filter_query.order_by,
+                order_direction=filter_query.order_direction,
+            )
+        except StreamFormatUnavailableError as e:
+            raise HTTPException(status_code=406, detail=str(e))
+        except InvalidFilterError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"筛选交易记录失败: {str(e)}")
+
+        encoder = iter_arrow_ipc if stream_format == "arrow" else iter_ndjson
+        return StreamingResponse(
+            encoder(rows, TransactionService.RECORD_COLUMNS),
+            media_type=STREAM_MEDIA_TYPES[stream_format],
+        )
+
+    def compute():
         result = TransactionService.get_records(
             db=db,
-            start_date=filter_query.start_date,
-            end_date=filter_query.end_date,
-            categories=filter_query.categories,
-            income_expense_types=filter_query.income_expense_types,
-            payment_methods=filter_query.payment_methods,
-            counterparties=filter_query.counterparties,
-            min_amount=filter_query.min_amount,
-            max_amount=filter_query.max_amount,
-            keyword=filter_query.keyword,
+            transaction_filter=transaction_filter,
             skip=filter_query.skip,
             limit=filter_query.limit,
             order_by=filter_query.order_by,
             order_direction=filter_query.order_direction,
+            pagination_mode=filter_query.pagination_mode,
+            cursor=filter_query.cursor,
+            include_total=filter_query.include_total,
         )
-        return result
+        result["records"] = rows_to_dicts(
+            result["records"], TransactionService.RECORD_FIELDS
+        )
+        return FastJSONResponse(result)
+
+    try:
+        return cached_response(
+            request,
+            db,
+            "transactions.search",
+            {**filter_query.model_dump(), **transaction_filter.as_params()},
+            [TRANSACTIONS],
+            compute,
+        )
+    except (InvalidCursorError, InvalidFilterError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"筛选交易记录失败: {str(e)}")
 
 
+# 交易筛选项统计API
+@router.post("/transactions/facets", response_model=schemas.TransactionFacetResult)
+def get_transaction_facets(
+    facet_query: schemas.TransactionFacetQuery,
+    request: Request,
+    db: Session = Depends(get_db),
+):
+    """
+    统计筛选条件下交易类型、收支类型、支付方式和交易对方的取值及记录数
+    """
+    transaction_filter = TransactionFilter.from_query(facet_query)
+
+    def compute():
+        return FastJSONResponse(
+            TransactionService.get_facets(
+                db=db,
+                transaction_filter=transaction_filter,
+                fields=facet_query.fields,
+                facet_limit=facet_query.facet_limit,
+                counterparty_prefix=facet_query.counterparty_prefix,
+            )
+        )
+
+    try:
+        return cached_response(
+            request,
+            db,
+            "transactions.facets",
+            {**facet_query.model_dump(), **transaction_filter.as_params()},
+            [TRANSACTIONS],
+            compute,
+        )
+    except InvalidFilterError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"统计筛选项失败: {str(e)}")
+
+
+# 交易汇总统计API
+@router.post("/transactions/summary", response_model=schemas.TransactionSummaryResult)
+def get_transaction_summary(
+    filter_query: schemas.TransactionFilterBase,
+    request: Request,
+    db: Session = Depends(get_db),
+):
+    """
+    统计筛选条件下的记录数、收支合计及各交易类型的合计
+    """
+    transaction_filter = TransactionFilter.from_query(filter_query)
+
+    def compute():
+        return FastJSONResponse(
+            TransactionService.get_summary(db=db, transaction_filter=transaction_filter)
+        )
+
+    try:
+        return cached_response(
+            request,
+            db,
+            "transactions.summary",
+            transaction_filter.as_params(),
+            [TRANSACTIONS],
+            compute,
+        )
+    except InvalidFilterError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"统计交易汇总失败: {str(e)}")
+
+
 # 财务记录查询API
 @router.get("/financial/records", response_model=List[schemas.FinancialAggregation])
 def get_financial_records(
+    request: Request,
     skip: int = Query(default=0, ge=0),
     limit: int = Query(default=100, ge=1, le=10000),
     order_by: str = Query(default="month_date"),
@@ -61,32 +192,154 @@ def get_financial_records(
 ):
     """
     获取财务聚合记录
+
+    过滤后的总记录数通过响应头 X-Total-Count 返回
     """
-    try:
-        result = FinancialService.get_records(
-            db=db,
-            skip=skip,
-            limit=limit,
-            order_by=order_by,
-            order_direction=order_direction,
-            start_date=start_date,
-            end_date=end_date,
+    params = {
+        "skip": skip,
+        "limit": limit,
+        "order_by": order_by,
+        "order_direction": order_direction,
+        "start_date": start_date,
+        "end_date": end_date,
+    }
+
+    def compute():
+        result = FinancialService.get_records(db=db, **params)
+        return FastJSONResponse(
+            rows_to_dicts(result["records"], FinancialService.RECORD_FIELDS),
+            headers={"X-Total-Count": str(result["total"])},
         )
-        return result
+
+    try:
+        return cached_response(request, db, "financial.records", params, [FINANCIAL], compute)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取财务记录失败: {str(e)}")
 
+# =================================
+# 现金流看板图表 API
+# =================================
+
+@router.get("/analytics/category-breakdown", response_model=schemas.CategoryBreakdownResult)
+def get_category_breakdown(
+    request: Request,
+    start_date: Optional[str] = Query(default=None, description="开始日期，格式：YYYY-MM-DD"),
+    end_date: Optional[str] = Query(default=None, description="结束日期，格式：YYYY-MM-DD"),
+    db: Session = Depends(get_db)
+):
+    """
+    获取日期范围内各消费类别的支出总额
+    """
+    try:
+        return cached_response(
+            request,
+            db,
+            "analytics.category-breakdown",
+            {"start_date": start_date, "end_date": end_date},
+            [FINANCIAL],
+            lambda: FastJSONResponse(
+                AnalyticsService.get_category_breakdown(db=db, start_date=start_date, end_date=end_date)
+            ),
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取消费类别占比失败: {str(e)}")
+
+
+@router.get("/analytics/monthly-expenses", response_model=schemas.MonthlyExpenseSeries)
+def get_monthly_expenses(
+    request: Request,
+    start_date: Optional[str] = Query(default=None, description="开始日期，格式：YYYY-MM-DD"),
+    end_date: Optional[str] = Query(default=None, description="结束日期，格式：YYYY-MM-DD"),
+    db: Session = Depends(get_db)
+):
+    """
+    获取按月份、消费类别拆分的支出序列
+    """
+    try:
+        return cached_response(
+            request,
+            db,
+            "analytics.monthly-expenses",
+            {"start_date": start_date, "end_date": end_date},
+            [FINANCIAL],
+            lambda: FastJSONResponse(
+                AnalyticsService.get_monthly_expenses(db=db, start_date=start_date, end_date=end_date)
+            ),
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取月度支出序列失败: {str(e)}")
+
+
+@router.get("/analytics/income-expense", response_model=schemas.IncomeExpenseSeries)
+def get_income_expense(
+    request: Request,
+    start_date: Optional[str] = Query(default=None, description="开始日期，格式：YYYY-MM-DD"),
+    end_date: Optional[str] = Query(default=None, description="结束日期，格式：YYYY-MM-DD"),
+    db: Session = Depends(get_db)
+):
+    """
+    获取每月收入、支出和结余序列
+    """
+    try:
+        return cached_response(
+            request,
+            db,
+            "analytics.income-expense",
+            {"start_date": start_date, "end_date": end_date},
+            [FINANCIAL],
+            lambda: FastJSONResponse(
+                AnalyticsService.get_income_expense(db=db, start_date=start_date, end_date=end_date)
+            ),
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取收支序列失败: {str(e)}")
+
+
+@router.get("/analytics/overview", response_model=schemas.AnalyticsOverview)
+def get_analytics_overview(
+    request: Request,
+    start_date: Optional[str] = Query(default=None, description="开始日期，格式：YYYY-MM-DD"),
+    end_date: Optional[str] = Query(default=None, description="结束日期，格式：YYYY-MM-DD"),
+    db: Session = Depends(get_db)
+):
+    """
+    获取日期范围内的收支总览
+    """
+    try:
+        return cached_response(
+            request,
+            db,
+            "analytics.overview",
+            {"start_date": start_date, "end_date": end_date},
+            [FINANCIAL],
+            lambda: FastJSONResponse(
+                AnalyticsService.get_overview(db=db, start_date=start_date, end_date=end_date)
+            ),
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取收支总览失败: {str(e)}")
+
+
 # =================================
 # 资产负债表 API
 # =================================
 
 # 获取所有资产
 @router.get("/balance-sheet/assets", response_model=List[schemas.Asset])
-def get_assets(db: Session = Depends(get_db)):
+def get_assets(request: Request, db: Session = Depends(get_db)):
     """获取所有资产"""
     try:
         service = BalanceSheetService(db)
-        return service.get_assets()
+        return cached_response(
+            request,
+            db,
+            "balance_sheet.assets",
+            None,
+            [BALANCE_SHEET],
+            lambda: FastJSONResponse(
+                rows_to_dicts(service.get_assets(), BalanceSheetService.RECORD_FIELDS)
+            ),
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取资产失败: {str(e)}")
 
@@ -140,11 +393,20 @@ def delete_asset(asset_id: int, db: Session = Depends(get_db)):
 
 # 获取所有负债
 @router.get("/balance-sheet/liabilities", response_model=List[schemas.Liability])
-def get_liabilities(db: Session = Depends(get_db)):
+def get_liabilities(request: Request, db: Session = Depends(get_db)):
     """获取所有负债"""
     try:
         service = BalanceSheetService(db)
-        return service.get_liabilities()
+        return cached_response(
+            request,
+            db,
+            "balance_sheet.liabilities",
+            None,
+            [BALANCE_SHEET],
+            lambda: FastJSONResponse(
+                rows_to_dicts(service.get_liabilities(), BalanceSheetService.RECORD_FIELDS)
+            ),
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取负债失败: {str(e)}")
 
@@ -198,11 +460,21 @@ def delete_liability(liability_id: int, db: Session = Depends(get_db)):
 
 # 获取完整的资产负债表数据
 @router.get("/balance-sheet/data", response_model=schemas.BalanceSheetData)
-def get_balance_sheet_data(db: Session = Depends(get_db)):
+def get_balance_sheet_data(request: Request, db: Session = Depends(get_db)):
     """获取完整的资产负债表数据"""
     try:
         service = BalanceSheetService(db)
-        return service.get_balance_sheet_data()
+
+        def compute():
+            data = service.get_balance_sheet_data()
+            return FastJSONResponse(
+                {
+                    key: rows_to_dicts(rows, BalanceSheetService.RECORD_FIELDS)
+                    for key, rows in data.items()
+                }
+            )
+
+        return cached_response(request, db, "balance_sheet.data", None, [BALANCE_SHEET], compute)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取资产负债表数据失败: {str(e)}")
 
@@ -220,23 +492,60 @@ def health_check():
 # 交易明细导入导出 API
 # =================================
 
-@router.get("/transactions/export")
-def export_transactions_csv(
+def transaction_filter_params(
     start_date: Optional[str] = Query(default=None, description="开始日期，格式：YYYY-MM-DD"),
     end_date: Optional[str] = Query(default=None, description="结束日期，格式：YYYY-MM-DD"),
+    categories: Optional[List[str]] = Query(default=None, description="交易类型，可重复传入"),
+    income_expense_types: Optional[List[str]] = Query(default=None, description="收支类型，可重复传入"),
+    payment_methods: Optional[List[str]] = Query(default=None, description="支付方式，可重复传入"),
+    counterparties: Optional[List[str]] = Query(default=None, description="交易对方，可重复传入"),
+    min_amount: Optional[float] = Query(default=None, description="最小金额"),
+    max_amount: Optional[float] = Query(default=None, description="最大金额"),
+    keyword: Optional[str] = Query(default=None, description="关键词"),
+) -> TransactionFilter:
+    """以查询参数形式接收与 TransactionFilterBase 相同的筛选条件"""
+    return TransactionFilter.create(
+        start_date=start_date,
+        end_date=end_date,
+        categories=categories,
+        income_expense_types=income_expense_types,
+        payment_methods=payment_methods,
+        counterparties=counterparties,
+        min_amount=min_amount,
+        max_amount=max_amount,
+        keyword=keyword,
+    )
+
+
+@router.get("/transactions/export")
+def export_transactions(
+    transaction_filter: TransactionFilter = Depends(transaction_filter_params),
+    format: Literal["csv", "xlsx", "parquet", "arrow"] = Query(
+        default="csv", description="导出格式，parquet/arrow 保留列类型"
+    ),
+    order_by: Literal["transaction_time", "category", "amount", "income_expense_type", "payment_method", "counterparty", "item_name", "remarks", "relevance"] = Query(default="transaction_time"),
+    order_direction: Literal["asc", "desc"] = Query(default="desc"),
     db: Session = Depends(get_db)
 ):
     """
-    导出交易明细为CSV文件
+    导出交易明细文件
+
+    支持与交易查询接口相同的筛选和排序条件；记录分批从数据库游标读取并逐块输出，
+    导出大量数据时内存占用保持不变
     """
     try:
-        csv_content = TransactionImportExportService.export_to_csv(
+        chunks = TransactionImportExportService.stream_export(
             db=db,
-            start_date=start_date,
-            end_date=end_date
+            format=format,
+            transaction_filter=transaction_filter,
+            order_by=order_by,
+            order_direction=order_direction,
         )
+        export_format = EXPORT_FORMATS[format]
         
         # 生成文件名
+        start_date = transaction_filter.start_date
+        end_date = transaction_filter.end_date
         filename = "transactions"
         if start_date and end_date:
             filename += f"_{start_date}_to_{end_date}"
@@ -244,15 +553,19 @@ def export_transactions_csv(
             filename += f"_from_{start_date}"
         elif end_date:
             filename += f"_to_{end_date}"
-        filename += ".csv"
+        filename += f".{export_format.extension}"
         
-        # 返回CSV文件
+        # 返回导出文件
         return StreamingResponse(
-            io.StringIO(csv_content),
-            media_type="text/csv",
+            chunks,
+            media_type=export_format.media_type,
             headers={"Content-Disposition": f"attachment; filename={filename}"}
         )
         
+    except StreamFormatUnavailableError as e:
+        raise HTTPException(status_code=406, detail=str(e))
+    except InvalidFilterError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"导出交易明细失败: {str(e)}")
 
@@ -271,13 +584,10 @@ def import_transactions_csv(
         if not file.filename.endswith('.csv'):
             raise HTTPException(status_code=400, detail="只支持CSV文件格式")
         
-        # 读取文件内容
-        csv_content = file.file.read().decode('utf-8')
-        
-        # 导入数据
+        # 直接从上传的临时文件流式导入，避免整体解码到内存
         result = TransactionImportExportService.import_from_csv(
             db=db,
-            csv_content=csv_content,
+            csv_file=file.file,
             enable_deduplication=enable_deduplication
         )
         
@@ -1,7 +1,11 @@
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.pool import QueuePool, StaticPool
 from sqlalchemy.orm import sessionmaker
-from app.models.base import Base
+from app.models.base import Base, TransactionDetail
+from app.database.migrations import initialize_new_database, run_migrations
+# 注册交易明细维度 id 的 ORM 同步
+import app.database.dimensions  # noqa: F401
 
 # 获取项目根目录，然后构建数据库路径
 # 当前文件: backend/app/database/connection.py
@@ -29,18 +33,104 @@ print(f"数据库路径: {DATABASE_URL}")  # 调试用
 
 print(f"数据库路径: {DATABASE_URL}")  # 调试用
 
-# 创建数据库引擎
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
+# SQLite 连接配置，每个新连接建立时执行，可通过环境变量覆盖
+# busy_timeout 放在最前面，切换 journal_mode 时遇到锁会等待而不是立即失败
+SQLITE_PRAGMAS = (
+    ("busy_timeout", int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))),
+    # WAL 模式下读不阻塞写、写不阻塞读，导入期间看板查询不再等待写锁
+    ("journal_mode", os.getenv("SQLITE_JOURNAL_MODE", "WAL").upper()),
+    # WAL 模式下 NORMAL 只在检查点时 fsync，断电最多丢失最近提交的事务，不会损坏数据库
+    ("synchronous", os.getenv("SQLITE_SYNCHRONOUS", "NORMAL").upper()),
+    ("mmap_size", int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))),
+    # 负数表示以 KiB 为单位，默认每个连接 64 MiB 页缓存
+    ("cache_size", int(os.getenv("SQLITE_CACHE_SIZE", -64 * 1024))),
+    ("temp_store", os.getenv("SQLITE_TEMP_STORE", "MEMORY").upper()),
 )
 
+# 取值为字符串的 PRAGMA 允许的值，避免拼写错误的配置被 SQLite 静默忽略
+SQLITE_PRAGMA_CHOICES = {
+    "journal_mode": {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"},
+    "synchronous": {"OFF", "NORMAL", "FULL", "EXTRA"},
+    "temp_store": {"DEFAULT", "FILE", "MEMORY"},
+}
+
+for pragma_name, pragma_value in SQLITE_PRAGMAS:
+    choices = SQLITE_PRAGMA_CHOICES.get(pragma_name)
+    if choices and pragma_value not in choices:
+        raise ValueError(
+            f"无效的 SQLite {pragma_name} 配置: {pragma_value}，可选值: {', '.join(sorted(choices))}"
+        )
+
+# 连接池配置
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+
+is_sqlite = DATABASE_URL.startswith("sqlite")
+is_sqlite_memory = is_sqlite and (DATABASE_URL in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in DATABASE_URL)
+
+# 创建数据库引擎：内存数据库只能共享同一个连接，文件数据库使用固定大小的连接池
+if is_sqlite_memory:
+    engine = create_engine(
+        DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+else:
+    engine = create_engine(
+        DATABASE_URL,
+        connect_args={"check_same_thread": False} if is_sqlite else {},
+        poolclass=QueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+    )
+
+
+if is_sqlite:
+
+    @event.listens_for(engine, "connect")
+    def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+        """为每个新建的 SQLite 连接应用 SQLITE_PRAGMAS"""
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in SQLITE_PRAGMAS:
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
+
+
+def get_engine_settings() -> dict:
+    """查询数据库连接实际生效的配置及连接池信息"""
+    settings = {"pool": type(engine.pool).__name__}
+    if isinstance(engine.pool, QueuePool):
+        settings["pool_size"] = engine.pool.size()
+        settings["max_overflow"] = DB_MAX_OVERFLOW
+    if is_sqlite:
+        with engine.connect() as connection:
+            for name, _ in SQLITE_PRAGMAS:
+                settings[name] = connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+    return settings
+
+
+def report_engine_settings():
+    """打印数据库连接实际生效的配置"""
+    settings = get_engine_settings()
+    print("⚙️ 数据库连接配置: " + ", ".join(f"{name}={value}" for name, value in settings.items()))
+
+
 # 创建会话工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def create_tables():
-    """创建所有表"""
+    """创建所有表并执行数据库迁移"""
+    is_new_database = not inspect(engine).has_table(TransactionDetail.__tablename__)
     Base.metadata.create_all(bind=engine)
+    if is_new_database:
+        initialize_new_database(engine)
+    else:
+        run_migrations(engine)
+    report_engine_settings()
 
 def get_db():
     """获取数据库会话"""
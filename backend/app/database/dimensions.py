@@ -0,0 +1,203 @@
+"""
+交易明细维度表
+交易类型、支付方式、交易对方的取值分别存储在 dim_categories、dim_payment_methods、
+dim_counterparties 中，交易明细只存储 category_id、payment_method_id、counterparty_id。
+筛选、分组和筛选项统计按整数 id 进行；查询结果、导出和全文索引通过外连接维度表取得取值，
+数据库中的 transaction_records 视图按原有列名提供同样的结果，供外部查询使用。
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import Table, event, inspect, select, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.models.base import (
+    CategoryDimension,
+    CounterpartyDimension,
+    PaymentMethodDimension,
+    TransactionDetail,
+)
+
+# 按名称批量查询维度 id 时每条语句的取值数量
+DIMENSION_LOOKUP_SIZE = 500
+
+# 按原有列名展示交易明细的兼容视图
+TRANSACTION_RECORDS_VIEW = "transaction_records"
+
+transaction_table = TransactionDetail.__table__
+
+
+@dataclass(frozen=True)
+class Dimension:
+    """维度表及其在交易明细中对应的 id 列"""
+
+    table: Table
+    id_column: str
+
+
+# 交易明细字段 -> 维度
+DIMENSIONS: Dict[str, Dimension] = {
+    "category": Dimension(CategoryDimension.__table__, "category_id"),
+    "payment_method": Dimension(PaymentMethodDimension.__table__, "payment_method_id"),
+    "counterparty": Dimension(CounterpartyDimension.__table__, "counterparty_id"),
+}
+
+# 兼容视图的列，与删除字符串列之前的交易明细表一致
+TRANSACTION_RECORD_FIELDS = (
+    "id",
+    "transaction_time",
+    "year_month",
+    "category",
+    "amount",
+    "amount_cents",
+    "signed_amount_cents",
+    "income_expense_type",
+    "payment_method",
+    "counterparty",
+    "item_name",
+    "remarks",
+    "fingerprint",
+    "category_id",
+    "payment_method_id",
+    "counterparty_id",
+    "created_at",
+    "updated_at",
+)
+
+
+def _join_dimensions():
+    """交易明细外连接各维度表；支付方式、交易对方可以为空，外连接保留全部交易明细"""
+    joined = transaction_table
+    for dimension in DIMENSIONS.values():
+        joined = joined.outerjoin(
+            dimension.table, dimension.table.c.id == transaction_table.c[dimension.id_column]
+        )
+    return joined
+
+
+# 查询交易明细取值列时使用的 FROM 子句
+TRANSACTION_RECORDS_FROM = _join_dimensions()
+
+
+def record_column(field: str):
+    """
+    交易明细字段对应的查询列
+
+    维度字段返回维度表的取值列 (以字段名为标签)，查询需 select_from(TRANSACTION_RECORDS_FROM)；
+    其余字段返回交易明细表的列
+    """
+    dimension = DIMENSIONS.get(field)
+    if dimension is None:
+        return transaction_table.c[field]
+    return dimension.table.c.name.label(field)
+
+
+def create_transaction_records_view(connection):
+    """创建兼容视图 transaction_records"""
+    query = select(*[record_column(field) for field in TRANSACTION_RECORD_FIELDS]).select_from(
+        TRANSACTION_RECORDS_FROM
+    )
+    connection.execute(
+        text(
+            f"CREATE VIEW IF NOT EXISTS {TRANSACTION_RECORDS_VIEW} AS "
+            f"{query.compile(dialect=connection.dialect)}"
+        )
+    )
+
+
+class DimensionInterner:
+    """
+    维度取值驻留缓存
+
+    将取值映射为维度 id，缓存中没有的取值先按名称查询，维度表中也没有时插入。
+    缓存只在一个事务内有效 (如一次导入)，事务回滚后新插入的 id 失效，不应跨事务复用。
+    """
+
+    def __init__(self, connection: Any):
+        """
+        Args:
+            connection: 数据库会话或连接
+        """
+        self.connection = connection
+        self._ids: Dict[str, Dict[str, int]] = {field: {} for field in DIMENSIONS}
+
+    def _lookup(self, table: Table, names: List[str]) -> Dict[str, int]:
+        ids = {}
+        for start in range(0, len(names), DIMENSION_LOOKUP_SIZE):
+            ids.update(
+                self.connection.execute(
+                    select(table.c.name, table.c.id).where(
+                        table.c.name.in_(names[start : start + DIMENSION_LOOKUP_SIZE])
+                    )
+                ).all()
+            )
+        return ids
+
+    def intern(self, field: str, names: Iterable[Optional[str]]) -> Dict[str, int]:
+        """
+        返回包含全部取值的 {取值: id} 映射，空值忽略
+
+        Args:
+            field: 维度字段 (category、payment_method、counterparty)
+            names: 取值
+        """
+        cache = self._ids[field]
+        missing = sorted({name for name in names if name is not None and name not in cache})
+        if not missing:
+            return cache
+
+        table = DIMENSIONS[field].table
+        cache.update(self._lookup(table, missing))
+        new_names = [name for name in missing if name not in cache]
+        if new_names:
+            # 并发写入时可能已被其他事务插入，冲突时忽略后重新查询
+            self.connection.execute(
+                sqlite_insert(table).on_conflict_do_nothing(index_elements=[table.c.name]),
+                [{"name": name} for name in new_names],
+            )
+            cache.update(self._lookup(table, new_names))
+        return cache
+
+    def assign_ids(self, records: List[Dict[str, Any]]):
+        """将 Core insert 参数中的各维度取值替换为维度 id 列"""
+        for field, dimension in DIMENSIONS.items():
+            ids = self.intern(field, [record[field] for record in records])
+            for record in records:
+                name = record.pop(field)
+                record[dimension.id_column] = ids[name] if name is not None else None
+
+
+def load_dimension_names(db: Any, field: str) -> Dict[int, str]:
+    """读取维度表的 {id: 取值} 映射，用于将按 id 分组的结果转换为取值"""
+    table = DIMENSIONS[field].table
+    return dict(db.execute(select(table.c.id, table.c.name)).all())
+
+
+def dimension_ids(field: str, names: Iterable[str]):
+    """返回按取值查询维度 id 的子查询，用于 WHERE <id 列> IN (...)"""
+    table = DIMENSIONS[field].table
+    return select(table.c.id).where(table.c.name.in_(list(names)))
+
+
+def dimension_ids_like(field: str, pattern: str):
+    """返回取值匹配 LIKE 模式的维度 id 子查询"""
+    table = DIMENSIONS[field].table
+    return select(table.c.id).where(table.c.name.like(pattern))
+
+
+@event.listens_for(TransactionDetail, "before_insert")
+@event.listens_for(TransactionDetail, "before_update")
+def _sync_dimension_ids(mapper, connection, target):
+    """
+    通过 ORM 写入交易明细时把赋值的取值转换为维度 id，更新时只处理发生变化的字段；
+    批量 Core 写入需自行调用 DimensionInterner.assign_ids
+    """
+    state = inspect(target)
+    interner = DimensionInterner(connection)
+    for field, dimension in DIMENSIONS.items():
+        if state.persistent and not state.attrs[field].history.has_changes():
+            continue
+        name = getattr(target, field)
+        ids = interner.intern(field, [name])
+        setattr(target, dimension.id_column, ids[name] if name is not None else None)
@@ -0,0 +1,154 @@
+"""
+交易明细全文索引
+transaction_details_fts 是基于 trigram 分词的 SQLite FTS5 外部内容表，内容来自兼容视图
+transaction_records，由迁移创建并通过 transaction_details 上的触发器保持同步。
+"""
+
+from sqlalchemy import column, literal_column, table, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.database.dimensions import DIMENSIONS, TRANSACTION_RECORDS_VIEW
+
+TRANSACTION_FTS_TABLE = "transaction_details_fts"
+
+# 全文索引覆盖的列
+TRANSACTION_FTS_COLUMNS = ("item_name", "remarks", "counterparty")
+
+# 全文索引列 -> 交易明细中的来源列，维度字段在触发器中按 id 查询维度表取得取值
+TRANSACTION_FTS_SOURCES = {
+    name: DIMENSIONS[name].id_column if name in DIMENSIONS else name
+    for name in TRANSACTION_FTS_COLUMNS
+}
+
+TRANSACTION_FTS_TRIGGERS = (
+    "transaction_details_fts_ai",
+    "transaction_details_fts_ad",
+    "transaction_details_fts_au",
+)
+
+# trigram 分词只能匹配不少于3个字符的关键词
+MIN_FTS_KEYWORD_LENGTH = 3
+
+transaction_fts = table(TRANSACTION_FTS_TABLE, column("rowid"), column("rank"))
+
+_fts_available = {}
+
+
+def is_fts_available(db: Session) -> bool:
+    """检查当前数据库是否已创建全文索引表（按数据库地址缓存结果）"""
+    bind = db.get_bind()
+    cache_key = str(bind.url)
+    if cache_key not in _fts_available:
+        if bind.dialect.name != "sqlite":
+            _fts_available[cache_key] = False
+        else:
+            _fts_available[cache_key] = (
+                db.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                    {"name": TRANSACTION_FTS_TABLE},
+                ).first()
+                is not None
+            )
+    return _fts_available[cache_key]
+
+
+def can_use_fts(db: Session, keyword: str) -> bool:
+    """关键词是否可以走全文索引"""
+    return len(keyword) >= MIN_FTS_KEYWORD_LENGTH and is_fts_available(db)
+
+
+def fts_match_condition(keyword: str):
+    """
+    构建全文索引匹配条件
+    关键词作为 FTS5 短语整体匹配，trigram 分词下等价于任一列包含该子串
+    """
+    phrase = '"' + keyword.replace('"', '""') + '"'
+    return literal_column(TRANSACTION_FTS_TABLE).op("MATCH")(phrase)
+
+
+def _source_value(row: str, name: str, legacy: bool) -> str:
+    """触发器中全文索引列的取值表达式 (row 为 new 或 old)"""
+    if legacy or name not in DIMENSIONS:
+        return f"{row}.{name}"
+    dimension_table = DIMENSIONS[name].table.name
+    return f"(SELECT name FROM {dimension_table} WHERE id = {row}.{TRANSACTION_FTS_SOURCES[name]})"
+
+
+def create_transaction_fts(connection, legacy: bool = False):
+    """
+    创建全文索引表、同步触发器，并根据现有数据重建索引
+
+    Args:
+        connection: 数据库连接
+        legacy: 按交易明细仍存储交易对方字符串时的结构创建 (供 0010 之前的迁移使用)
+    """
+    columns = ", ".join(TRANSACTION_FTS_COLUMNS)
+    content = "transaction_details" if legacy else TRANSACTION_RECORDS_VIEW
+    update_columns = ", ".join(
+        TRANSACTION_FTS_COLUMNS if legacy else TRANSACTION_FTS_SOURCES.values()
+    )
+    new_values = ", ".join(_source_value("new", name, legacy) for name in TRANSACTION_FTS_COLUMNS)
+    old_values = ", ".join(_source_value("old", name, legacy) for name in TRANSACTION_FTS_COLUMNS)
+
+    connection.execute(
+        text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {TRANSACTION_FTS_TABLE} USING fts5("
+            f"{columns}, content='{content}', content_rowid='id', tokenize='trigram')"
+        )
+    )
+    connection.execute(
+        text(
+            f"CREATE TRIGGER IF NOT EXISTS transaction_details_fts_ai "
+            f"AFTER INSERT ON transaction_details BEGIN "
+            f"INSERT INTO {TRANSACTION_FTS_TABLE}(rowid, {columns}) VALUES (new.id, {new_values}); "
+            f"END"
+        )
+    )
+    connection.execute(
+        text(
+            f"CREATE TRIGGER IF NOT EXISTS transaction_details_fts_ad "
+            f"AFTER DELETE ON transaction_details BEGIN "
+            f"INSERT INTO {TRANSACTION_FTS_TABLE}({TRANSACTION_FTS_TABLE}, rowid, {columns}) "
+            f"VALUES ('delete', old.id, {old_values}); "
+            f"END"
+        )
+    )
+    connection.execute(
+        text(
+            f"CREATE TRIGGER IF NOT EXISTS transaction_details_fts_au "
+            f"AFTER UPDATE OF {update_columns} ON transaction_details BEGIN "
+            f"INSERT INTO {TRANSACTION_FTS_TABLE}({TRANSACTION_FTS_TABLE}, rowid, {columns}) "
+            f"VALUES ('delete', old.id, {old_values}); "
+            f"INSERT INTO {TRANSACTION_FTS_TABLE}(rowid, {columns}) VALUES (new.id, {new_values}); "
+            f"END"
+        )
+    )
+    connection.execute(
+        text(f"INSERT INTO {TRANSACTION_FTS_TABLE}({TRANSACTION_FTS_TABLE}) VALUES ('rebuild')")
+    )
+
+
+def try_create_transaction_fts(connection, legacy: bool = False) -> bool:
+    """
+    在保存点中创建全文索引，SQLite 不支持 FTS5/trigram 时回滚并跳过，关键词搜索回退到 LIKE
+
+    Returns:
+        bool: 是否创建成功
+    """
+    savepoint = connection.begin_nested()
+    try:
+        create_transaction_fts(connection, legacy=legacy)
+    except OperationalError as e:
+        savepoint.rollback()
+        print(f"⚠️ 当前SQLite不支持FTS5 trigram全文索引，关键词搜索将使用LIKE: {str(e)}")
+        return False
+    savepoint.commit()
+    return True
+
+
+def drop_transaction_fts(connection):
+    """删除全文索引表及同步触发器"""
+    for trigger in TRANSACTION_FTS_TRIGGERS:
+        connection.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+    connection.execute(text(f"DROP TABLE IF EXISTS {TRANSACTION_FTS_TABLE}"))
@@ -0,0 +1,75 @@
+"""
+数据库迁移
+create_all 只能创建缺失的表，已有数据库的新增列、索引和数据回填由 Alembic 迁移完成，
+迁移脚本位于 backend/alembic/versions，应用启动时自动升级到最新版本。
+
+新数据库由 create_all 建好全部表和索引，再创建由迁移维护的视图、全文索引和触发器后
+直接标记为最新版本；早期迁移按当时的表结构编写，不能在最新结构上执行。
+早期版本把迁移版本号记录在 SQLite 的 PRAGMA user_version 中，
+首次升级时按 LEGACY_REVISIONS 写入对应的 Alembic 版本，不会重复回填。
+"""
+
+import os
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.database.dimensions import create_transaction_records_view
+from app.database.fts import try_create_transaction_fts
+from app.utils.data_version import create_data_version_triggers
+
+backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ALEMBIC_INI_PATH = os.path.join(backend_dir, "alembic.ini")
+ALEMBIC_SCRIPT_LOCATION = os.path.join(backend_dir, "alembic")
+
+# PRAGMA user_version -> 对应的 Alembic 版本
+LEGACY_REVISIONS = {
+    1: "0001",
+    2: "0002",
+    3: "0003",
+}
+
+
+def get_alembic_config(connection: Connection = None) -> Config:
+    """创建 Alembic 配置，传入连接时迁移在该连接上执行"""
+    config = Config(ALEMBIC_INI_PATH)
+    config.set_main_option("script_location", ALEMBIC_SCRIPT_LOCATION)
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def _stamp_legacy_version(engine: Engine):
+    """把 PRAGMA user_version 记录的旧迁移版本转换为 Alembic 版本"""
+    if engine.dialect.name != "sqlite":
+        return
+
+    with engine.begin() as connection:
+        if inspect(connection).has_table("alembic_version"):
+            return
+        legacy_version = connection.execute(text("PRAGMA user_version")).scalar() or 0
+        revision = LEGACY_REVISIONS.get(min(legacy_version, max(LEGACY_REVISIONS)))
+        if revision is None:
+            return
+        print(f"🛠️ 数据库迁移版本 v{legacy_version} 转换为 Alembic 版本 {revision}")
+        command.stamp(get_alembic_config(connection), revision)
+
+
+def run_migrations(engine: Engine):
+    """执行尚未应用的迁移，升级到最新版本"""
+    _stamp_legacy_version(engine)
+    with engine.connect() as connection:
+        command.upgrade(get_alembic_config(connection), "head")
+        connection.commit()
+
+
+def initialize_new_database(engine: Engine):
+    """为 create_all 新建的数据库创建迁移维护的对象，并标记为最新版本"""
+    with engine.begin() as connection:
+        create_transaction_records_view(connection)
+        create_data_version_triggers(connection)
+        if engine.dialect.name == "sqlite":
+            try_create_transaction_fts(connection)
+        command.stamp(get_alembic_config(connection), "head")
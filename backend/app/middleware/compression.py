@@ -0,0 +1,203 @@
+"""
+响应压缩中间件
+根据 Accept-Encoding 协商 brotli 或 gzip 压缩，小于阈值的响应不压缩。
+StreamingResponse 按块压缩并立即刷新，保持流式输出。brotli 由 requirements.txt 安装，缺少时只使用 gzip。
+"""
+
+import zlib
+from typing import List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:  # 未安装 brotli 时只使用 gzip
+    import brotli
+except ImportError:
+    brotli = None
+
+# 可压缩的媒体类型；图片、zip、xlsx、parquet 等本身已压缩的格式不再压缩
+COMPRESSIBLE_MEDIA_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/vnd.apache.arrow.stream",
+    "application/javascript",
+    "application/xml",
+)
+
+
+class _GzipCompressor:
+    def __init__(self, level: int):
+        # wbits=31 输出带 gzip 头的数据流
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliCompressor:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+def parse_accept_encoding(accept_encoding: str) -> List[Tuple[str, float]]:
+    """解析 Accept-Encoding，返回 (编码, q 值) 列表"""
+    encodings = []
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        encodings.append((name.strip().lower(), quality))
+    return encodings
+
+
+class CompressionMiddleware:
+    """
+    gzip / brotli 响应压缩中间件
+
+    Args:
+        app: ASGI 应用
+        minimum_size: 小于该字节数的非流式响应不压缩
+        gzip_level: gzip 压缩级别 (1-9)
+        brotli_quality: brotli 压缩质量 (0-11)
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def select_encoding(self, accept_encoding: str) -> Optional[str]:
+        """按 q 值选择编码，q 值相同时优先 brotli"""
+        supported = ["br", "gzip"] if brotli is not None else ["gzip"]
+        accepted = dict(parse_accept_encoding(accept_encoding))
+        candidates = [
+            (accepted.get(encoding, accepted.get("*", 0.0)), -index, encoding)
+            for index, encoding in enumerate(supported)
+        ]
+        quality, _, encoding = max(candidates)
+        return encoding if quality > 0 else None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            headers = Headers(scope=scope)
+            encoding = self.select_encoding(headers.get("accept-encoding", ""))
+            if encoding:
+                responder = _CompressionResponder(self.app, self, encoding)
+                await responder(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+class _CompressionResponder:
+    def __init__(self, app: ASGIApp, middleware: CompressionMiddleware, encoding: str):
+        self.app = app
+        self.minimum_size = middleware.minimum_size
+        self.encoding = encoding
+        if encoding == "br":
+            self.compressor = _BrotliCompressor(middleware.brotli_quality)
+        else:
+            self.compressor = _GzipCompressor(middleware.gzip_level)
+        self.send: Send = None
+        self.initial_message: Message = {}
+        self.started = False
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    def _should_skip(self) -> bool:
+        headers = Headers(raw=self.initial_message["headers"])
+        if "content-encoding" in headers:
+            return True
+        if self.initial_message["status"] in (204, 304):
+            return True
+        media_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        return not media_type.startswith(COMPRESSIBLE_MEDIA_TYPES)
+
+    def _set_variant_headers(self, headers: MutableHeaders):
+        headers.add_vary_header("Accept-Encoding")
+        # 压缩后的表示与原始字节不同，强 ETag 降级为弱 ETag
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+
+    def _set_encoding_headers(self, content_length: Optional[int]):
+        headers = MutableHeaders(raw=self.initial_message["headers"])
+        headers["Content-Encoding"] = self.encoding
+        if content_length is None:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(content_length)
+        self._set_variant_headers(headers)
+
+    async def send_compressed(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # 等到第一块响应体再决定是否压缩
+            self.initial_message = message
+            return
+        if message_type != "http.response.body":
+            await self.send(message)
+            return
+
+        if self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self.started:
+            self.started = True
+            if self._should_skip() or (len(body) < self.minimum_size and not more_body):
+                self.passthrough = True
+                if self.initial_message["status"] == 304:
+                    # 304 的 ETag 需与压缩后的 200 响应一致
+                    self._set_variant_headers(MutableHeaders(raw=self.initial_message["headers"]))
+                await self.send(self.initial_message)
+                await self.send(message)
+                return
+
+            if not more_body:
+                # 完整响应：一次性压缩
+                compressed = self.compressor.compress(body) + self.compressor.finish()
+                self._set_encoding_headers(len(compressed))
+                await self.send(self.initial_message)
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+
+            # 流式响应：去掉 Content-Length，逐块压缩并刷新
+            self._set_encoding_headers(None)
+            await self.send(self.initial_message)
+
+        compressed = self.compressor.compress(body)
+        if not more_body:
+            compressed += self.compressor.finish()
+        await self.send(
+            {"type": "http.response.body", "body": compressed, "more_body": more_body}
+        )
@@ -1,28 +1,147 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Index, event, inspect, select
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import column_property
 from datetime import datetime
 
+from app.utils.amounts import derive_amount_columns
+from app.utils.fingerprint import compute_transaction_fingerprint
+from app.utils.time_buckets import derive_time_bucket_columns
+
 
 Base = declarative_base()
 
 
+class CategoryDimension(Base):
+    """交易类型维度表"""
+
+    __tablename__ = "dim_categories"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(15), nullable=False, unique=True)  # 交易类型
+
+
+class PaymentMethodDimension(Base):
+    """支付方式维度表"""
+
+    __tablename__ = "dim_payment_methods"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(13), nullable=False, unique=True)  # 支付方式
+
+
+class CounterpartyDimension(Base):
+    """交易对方维度表"""
+
+    __tablename__ = "dim_counterparties"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(200), nullable=False, unique=True)  # 交易对方
+
+
 class TransactionDetail(Base):
     """交易明细模型"""
 
     __tablename__ = "transaction_details"
+    # 热点查询的组合索引和覆盖索引，已有数据库由 alembic/versions 中的迁移创建
+    __table_args__ = (
+        # 分类 + 收支类型 + 时间范围：交易查询、汇总统计
+        Index(
+            "ix_transaction_details_category_type_time",
+            "category_id",
+            "income_expense_type",
+            "transaction_time",
+            "amount_cents",
+            "signed_amount_cents",
+        ),
+        # 月份 + 分类：月度聚合按该顺序分组，覆盖整数金额列不回表也不需要临时排序
+        Index(
+            "ix_transaction_details_month_category",
+            "year_month",
+            "category_id",
+            "amount_cents",
+            "signed_amount_cents",
+        ),
+        # 时间范围 + 维度 id：时间范围内的筛选项统计按 id 分组，不回表
+        Index(
+            "ix_transaction_details_time_dimensions",
+            "transaction_time",
+            "category_id",
+            "income_expense_type",
+            "payment_method_id",
+            "counterparty_id",
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     transaction_time = Column(DateTime, nullable=False, index=True)  # 交易时间
-    category = Column(String(15), nullable=False, index=True)  # 类型 (住房、餐饮等)
+    # 由 transaction_time 派生 (app/utils/time_buckets.py)，供按月分组和筛选
+    year_month = Column(Integer, nullable=True)  # 年月 (YYYYMM)
     amount = Column(Float, nullable=False)  # 金额
+    # 以下两列由 amount 和 income_expense_type 派生 (app/utils/amounts.py)，供 SQL 聚合精确求和
+    amount_cents = Column(Integer, nullable=False, server_default="0")  # 金额 (分)
+    signed_amount_cents = Column(
+        Integer, nullable=False, server_default="0"
+    )  # 收支流向 (分)：收入为正、支出为负、其他为 0
     income_expense_type = Column(String(7), nullable=False, index=True)  # 收/支
-    payment_method = Column(String(13), nullable=True)  # 支付方式
-    counterparty = Column(String(200), nullable=True)  # 交易对方
     item_name = Column(String(500), nullable=True)  # 商品名称
     remarks = Column(Text, nullable=True)  # 备注
+    fingerprint = Column(
+        String(64), nullable=True, unique=True, index=True
+    )  # 去重指纹 (时间、金额、交易对方、商品名称)
+    # 类型、支付方式、交易对方只存储维度表中的 id (app/database/dimensions.py)，
+    # 筛选、分组和筛选项统计按整数 id 进行；不声明外键约束，SQLite 修改外键需要重建整张表
+    category_id = Column(Integer, nullable=False)  # dim_categories.id
+    payment_method_id = Column(Integer, nullable=True, index=True)  # dim_payment_methods.id
+    counterparty_id = Column(Integer, nullable=True, index=True)  # dim_counterparties.id
     created_at = Column(DateTime, default=datetime.now)
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
 
+    # 以下三个属性通过关联子查询读取维度表中的取值；ORM 写入时赋值的取值
+    # 由 app/database/dimensions.py 的监听器转换为维度 id，本身不写入交易明细表
+    category = column_property(
+        select(CategoryDimension.name).where(CategoryDimension.id == category_id).scalar_subquery()
+    )  # 类型 (住房、餐饮等)
+    payment_method = column_property(
+        select(PaymentMethodDimension.name)
+        .where(PaymentMethodDimension.id == payment_method_id)
+        .scalar_subquery()
+    )  # 支付方式
+    counterparty = column_property(
+        select(CounterpartyDimension.name)
+        .where(CounterpartyDimension.id == counterparty_id)
+        .scalar_subquery()
+    )  # 交易对方
+
+
+# 参与计算去重指纹的字段
+FINGERPRINT_FIELDS = ("transaction_time", "amount", "counterparty", "item_name")
+
+
+@event.listens_for(TransactionDetail, "before_insert")
+@event.listens_for(TransactionDetail, "before_update")
+def _sync_derived_columns(mapper, connection, target):
+    """
+    通过 ORM 写入交易明细时同步派生列和去重指纹 (维度 id 由 app/database/dimensions.py 同步)；
+    批量 Core 写入需自行调用 derive_amount_columns、derive_time_bucket_columns
+    和 compute_transaction_fingerprint
+    """
+    derived = {}
+    if target.amount is not None:
+        derived.update(derive_amount_columns(target.amount, target.income_expense_type))
+    if target.transaction_time is not None:
+        derived.update(derive_time_bucket_columns(target.transaction_time))
+    # 更新时只在去重字段变化后重新计算，关闭去重导入的重复记录指纹保持为空
+    state = inspect(target)
+    fingerprint_changed = not state.persistent or any(
+        state.attrs[name].history.has_changes() for name in FINGERPRINT_FIELDS
+    )
+    if fingerprint_changed and target.transaction_time is not None and target.amount is not None:
+        derived["fingerprint"] = compute_transaction_fingerprint(
+            target.transaction_time, target.amount, target.counterparty, target.item_name
+        )
+    for name, value in derived.items():
+        setattr(target, name, value)
+
 
 class FinancialAggregation(Base):
     """财务记录模型"""
@@ -76,3 +195,12 @@ class Liability(Base):
     )  # 负债类别: current/non-current
     created_at = Column(DateTime, default=datetime.now)
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+
+class DataVersion(Base):
+    """数据版本模型，由触发器在数据写入时递增 (app/utils/data_version.py)"""
+
+    __tablename__ = "data_versions"
+
+    domain = Column(String(20), primary_key=True)  # 数据域
+    version = Column(Integer, nullable=False, server_default="0")  # 版本号
@@ -1,6 +1,6 @@
 import enum
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, Field
+from typing import Dict, Optional, List
 from datetime import datetime
 from typing import Literal
 
@@ -62,8 +62,8 @@ class TransactionDetail(TransactionDetailBase):
 
 
 # 筛选查询模型
-class TransactionFilterQuery(BaseModel):
-    """交易记录筛选查询模型"""
+class TransactionFilterBase(BaseModel):
+    """交易记录筛选条件模型"""
 
     start_date: Optional[str] = None
     end_date: Optional[str] = None
@@ -74,10 +74,18 @@ class TransactionFilterQuery(BaseModel):
     min_amount: Optional[float] = None
     max_amount: Optional[float] = None
     keyword: Optional[str] = None
+
+
+class TransactionFilterQuery(TransactionFilterBase):
+    """交易记录筛选查询模型"""
+
     skip: int = 0
     limit: int = 100
-    order_by: Literal["transaction_time", "category", "amount", "income_expense_type", "payment_method", "counterparty", "item_name", "remarks"] = "transaction_time"
+    order_by: Literal["transaction_time", "category", "amount", "income_expense_type", "payment_method", "counterparty", "item_name", "remarks", "relevance"] = "transaction_time"
     order_direction: Literal["asc", "desc"] = "desc"
+    pagination_mode: Literal["offset", "cursor"] = "offset"  # cursor 模式按游标分页
+    cursor: Optional[str] = None  # 上一页返回的 next_cursor
+    include_total: Optional[bool] = None  # 默认 offset 模式返回总数，cursor 模式不返回
 
 
 # 分页信息模型
@@ -94,9 +102,60 @@ class TransactionFilterResult(BaseModel):
     """交易筛选结果模型"""
 
     records: List[TransactionDetail]
-    total: int
+    total: Optional[int] = None
     filters_applied: List[str]
     pagination: PaginationInfo
+    next_cursor: Optional[str] = None
+
+
+class TransactionFacetQuery(TransactionFilterBase):
+    """交易筛选项统计查询模型"""
+
+    fields: Optional[
+        List[Literal["category", "income_expense_type", "payment_method", "counterparty"]]
+    ] = None
+    facet_limit: int = Field(default=50, ge=1, le=1000)
+    counterparty_prefix: Optional[str] = None
+
+
+class FacetValue(BaseModel):
+    """筛选项取值及记录数"""
+
+    value: str
+    count: int
+
+
+class FacetResult(BaseModel):
+    """单个字段的筛选项统计结果"""
+
+    values: List[FacetValue]
+    has_more: bool
+
+
+class TransactionFacetResult(BaseModel):
+    """交易筛选项统计结果模型"""
+
+    facets: Dict[str, FacetResult]
+    filters_applied: List[str]
+
+
+class TransactionSummaryCategory(BaseModel):
+    """单个交易类型、收支类型的合计"""
+
+    category: Optional[str]  # 维度表中不存在对应取值时为空
+    income_expense_type: str
+    count: int
+    amount: float
+
+
+class TransactionSummaryResult(BaseModel):
+    """交易汇总统计结果模型"""
+
+    count: int
+    income: float
+    expense: float
+    categories: List[TransactionSummaryCategory]
+    filters_applied: List[str]
 
 
 class TransactionImportRecord(BaseModel):
@@ -160,6 +219,48 @@ class FinancialQuery(BaseModel):
     order_direction: Literal["asc", "desc"] = "desc"
 
 
+# 现金流看板图表数据模型
+class CategoryBreakdownItem(BaseModel):
+    """消费类别支出"""
+
+    key: str
+    value: float
+
+
+class CategoryBreakdownResult(BaseModel):
+    """消费类别支出占比数据"""
+
+    categories: List[CategoryBreakdownItem]
+    total: float
+
+
+class MonthlyExpenseSeries(BaseModel):
+    """按月份、消费类别拆分的支出序列"""
+
+    months: List[str]
+    series: Dict[str, List[float]]
+
+
+class IncomeExpenseSeries(BaseModel):
+    """每月收入、支出和结余序列"""
+
+    months: List[str]
+    income: List[float]
+    expense: List[float]
+    balance: List[float]
+
+
+class AnalyticsOverview(BaseModel):
+    """收支总览数据"""
+
+    month_count: int
+    total_income: float
+    total_expense: float
+    total_balance: float
+    avg_monthly_expense: float
+    avg_expense_change: float  # 平均月支出变化百分比
+
+
 # 资产负债表相关模型
 class AssetCategory(enum.Enum):
     """资产类别枚举"""
@@ -3,18 +3,32 @@
 用于将交易明细数据聚合为月度财务记录
 """
 
+import pandas as pd
 from sqlalchemy.orm import Session
-from sqlalchemy import func, extract
-from typing import Dict
+from sqlalchemy import func, case
+from typing import Dict, Iterable, Optional, Set, Tuple
 from datetime import datetime
 
 from app.schemas import TransactionType
+from app.database.dimensions import load_dimension_names
 from app.models.base import TransactionDetail, FinancialAggregation
+from app.utils.amounts import from_cents
+from app.utils.time_buckets import to_year_month, year_month_start
 
 
 class AggregationService:
     """数据聚合服务"""
 
+    # avg_consumption 统计的支出类别（不含住房和人情，住房按全局平均值均摊）
+    AVG_CONSUMPTION_CATEGORIES = (
+        "dining",
+        "living",
+        "entertainment",
+        "transportation",
+        "travel",
+        "gifts",
+    )
+
     # 动态生成类别映射：从中文值映射到英文字段名
     @classmethod
     def _get_category_mapping(cls) -> Dict[str, str]:
@@ -47,6 +61,26 @@ class AggregationService:
             if column.name not in excluded_fields
         }
 
+    @staticmethod
+    def _month_start(value: datetime) -> datetime:
+        """将任意时间归一化为所在月份的1号零点"""
+        return datetime(value.year, value.month, 1)
+
+    @staticmethod
+    def _shift_month(month_date: datetime, months: int) -> datetime:
+        """
+        按月偏移月度日期
+
+        Args:
+            month_date: 月度日期(每月1号)
+            months: 偏移的月数，可为负数
+
+        Returns:
+            偏移后的月度日期
+        """
+        month_index = month_date.year * 12 + (month_date.month - 1) + months
+        return datetime(month_index // 12, month_index % 12 + 1, 1)
+
     @classmethod
     def aggregate_monthly_data(
         cls, db: Session, year: int = None, month: int = None
@@ -72,77 +106,16 @@ class AggregationService:
             print(f"📋 类别映射: {category_mapping}")
             print(f"📋 可用字段: {financial_fields}")
 
-            # 构建查询条件
-            query = db.query(TransactionDetail)
-            if year:
-                query = query.filter(
-                    extract("year", TransactionDetail.transaction_time) == year
-                )
-            if month:
-                query = query.filter(
-                    extract("month", TransactionDetail.transaction_time) == month
-                )
-
-            # 获取所有需要聚合的月份
-            months_query = db.query(
-                extract("year", TransactionDetail.transaction_time).label("year"),
-                extract("month", TransactionDetail.transaction_time).label("month"),
-            ).distinct()
-
-            if year:
-                months_query = months_query.filter(
-                    extract("year", TransactionDetail.transaction_time) == year
-                )
-            if month:
-                months_query = months_query.filter(
-                    extract("month", TransactionDetail.transaction_time) == month
-                )
-
-            months = months_query.all()
-            print(f"📅 找到 {len(months)} 个月份需要处理")
-
-            processed_months = 0
-            updated_records = 0
-            created_records = 0
-
-            for year_month in months:
-                year_val = int(year_month.year)
-                month_val = int(year_month.month)
-
-                print(f"📅 处理 {year_val}年{month_val}月...")
-
-                # 计算该月的聚合数据
-                month_data = cls._calculate_month_aggregation(
-                    db, year_val, month_val, category_mapping, financial_fields
-                )
-
-                # 构建月度日期DateTime对象 (每月1号)
-                month_date = datetime(year_val, month_val, 1)
-
-                # 查找是否已存在该月的记录
-                existing_record = (
-                    db.query(FinancialAggregation)
-                    .filter(FinancialAggregation.month_date == month_date)
-                    .first()
-                )
+            # 第一阶段：一次 GROUP BY 计算所有 (月份, 类别, 收支) 的金额合计
+            monthly_data = cls._calculate_grouped_aggregation(
+                db, category_mapping, financial_fields, year, month
+            )
+            print(f"📅 找到 {len(monthly_data)} 个月份需要处理")
 
-                if existing_record:
-                    # 更新现有记录
-                    cls._update_financial_record(
-                        existing_record, month_data, financial_fields
-                    )
-                    updated_records += 1
-                    print(f"✅ 更新 {year_val}年{month_val}月 记录")
-                else:
-                    # 创建新记录
-                    new_record = cls._create_financial_record(
-                        month_date, month_data, financial_fields
-                    )
-                    db.add(new_record)
-                    created_records += 1
-                    print(f"✅ 创建 {year_val}年{month_val}月 记录")
-
-                processed_months += 1
+            created_records, updated_records = cls._bulk_upsert_monthly_records(
+                db, monthly_data, financial_fields
+            )
+            processed_months = len(monthly_data)
 
             # 提交第一阶段的更改
             db.commit()
@@ -185,102 +158,266 @@ class AggregationService:
             }
 
     @classmethod
-    def _calculate_month_aggregation(
+    def aggregate_months(cls, db: Session, months: Iterable[datetime]) -> Dict:
+        """
+        增量聚合：只重新计算指定月份及依赖这些月份的派生字段
+
+        依赖关系:
+            - recent_avg_consumption 是 n, n-1, n-2 三个月的窗口，
+              因此月份 m 变化会影响 m+1、m+2 的派生字段
+            - avg_consumption 依赖全局住房支出平均值，
+              平均值变化时需要更新所有月份的派生字段
+
+        Args:
+            db: 数据库会话
+            months: 受影响的月份（任意时间，会被归一化到当月1号）
+
+        Returns:
+            聚合结果统计
+        """
+        try:
+            target_months = {cls._month_start(value) for value in months}
+            if not target_months:
+                return {
+                    "success": True,
+                    "message": "没有需要聚合的月份",
+                    "processed_months": 0,
+                    "created_records": 0,
+                    "updated_records": 0,
+                    "recent_updated_records": 0,
+                }
+
+            print(f"🔄 开始增量聚合 {len(target_months)} 个月份...")
+
+            category_mapping = cls._get_category_mapping()
+            financial_fields = cls._get_financial_fields()
+
+            housing_average_before = cls._calculate_housing_average_from_aggregated_data(db)
+
+            monthly_data = cls._calculate_grouped_aggregation(
+                db, category_mapping, financial_fields, months=target_months
+            )
+            created_records, updated_records = cls._bulk_upsert_monthly_records(
+                db, monthly_data, financial_fields
+            )
+
+            # 已不再有交易的月份删除对应的聚合记录
+            empty_months = target_months - set(monthly_data.keys())
+            if empty_months:
+                db.query(FinancialAggregation).filter(
+                    FinancialAggregation.month_date.in_(list(empty_months))
+                ).delete(synchronize_session=False)
+
+            db.commit()
+
+            housing_average_after = cls._calculate_housing_average_from_aggregated_data(db)
+            if abs(housing_average_after - housing_average_before) > 1e-9:
+                print("🏠 住房支出平均值发生变化，更新所有月份的派生字段")
+                derived_months = None
+            else:
+                derived_months = {
+                    cls._shift_month(month_date, offset)
+                    for month_date in target_months
+                    for offset in range(3)
+                }
+
+            second_stage_updated_records = cls._update_derived_consumption_fields(
+                db, target_months=derived_months
+            )
+            db.commit()
+
+            result = {
+                "success": True,
+                "message": "增量聚合完成",
+                "processed_months": len(monthly_data),
+                "created_records": created_records,
+                "updated_records": updated_records,
+                "deleted_records": len(empty_months),
+                "recent_updated_records": second_stage_updated_records,
+            }
+
+            print(f"🎉 增量聚合完成: {result}")
+            return result
+
+        except Exception as e:
+            db.rollback()
+            error_msg = f"增量聚合失败: {str(e)}"
+            print(f"❌ {error_msg}")
+            import traceback
+
+            print(f"🔍 详细错误信息:\n{traceback.format_exc()}")
+            return {
+                "success": False,
+                "message": error_msg,
+                "processed_months": 0,
+                "created_records": 0,
+                "updated_records": 0,
+            }
+
+    @classmethod
+    def _calculate_grouped_aggregation(
         cls,
         db: Session,
-        year: int,
-        month: int,
         category_mapping: Dict[str, str],
         financial_fields: set,
-    ) -> Dict:
+        year: int = None,
+        month: int = None,
+        months: Optional[Iterable[datetime]] = None,
+    ) -> Dict[datetime, Dict]:
         """
-        计算指定月份的聚合数据
+        使用单条 GROUP BY 查询计算所有月份的聚合数据
 
         Args:
             db: 数据库会话
-            year: 年份
-            month: 月份
             category_mapping: 类别映射字典
             financial_fields: 可用的财务字段集合
+            year: 指定年份，None表示所有年份
+            month: 指定月份，None表示所有月份
+            months: 指定月份集合(每月1号)
 
         Returns:
-            月度聚合数据
-        """
-        # 使用原生SQL查询来避免枚举转换问题
-        from sqlalchemy import text
-
-        query = text(
-            """
-            SELECT category, amount, income_expense_type
-            FROM transaction_details
-            WHERE strftime('%Y', transaction_time) = :year
-            AND strftime('%m', transaction_time) = :month
+            Dict[datetime, Dict]: {月度日期(每月1号): 月度聚合数据}
         """
+        year_month = TransactionDetail.year_month
+        signed_cents = TransactionDetail.signed_amount_cents
+
+        # 收支流向已带符号，各项合计都是整数列上的 SUM，不需要按收支类型判断符号
+        query = db.query(
+            year_month,
+            TransactionDetail.category_id,
+            func.sum(signed_cents).label("flow_cents"),
+            # 不计收支等其他收支类型的流向为 0，按原始金额计入类别
+            func.sum(
+                case((signed_cents == 0, TransactionDetail.amount_cents), else_=0)
+            ).label("neutral_cents"),
+            func.sum(case((signed_cents > 0, signed_cents), else_=0)).label("income_cents"),
+            func.sum(case((signed_cents < 0, -signed_cents), else_=0)).label("expense_cents"),
+            func.count(TransactionDetail.id).label("transaction_count"),
         )
-
-        result = db.execute(query, {"year": str(year), "month": f"{month:02d}"})
-        transactions = result.fetchall()
-
-        print(f"🔍 找到 {len(transactions)} 笔交易记录")
-
-        # 动态初始化聚合数据，只包含实际存在的字段
-        aggregated_data = {field: 0.0 for field in financial_fields}
-        total_income = 0.0
-        total_expense = 0.0
-
-        # 按类别聚合
-        for transaction in transactions:
-            category = transaction[0]  # category
-            amount = transaction[1]  # amount
-            income_expense_type = transaction[2]  # income_expense_type
-
-            # 根据收支类型调整金额符号
-            if income_expense_type == "支出":
-                amount = -abs(amount)  # 支出为负值
-                total_expense += abs(amount)
-            elif income_expense_type == "收入":
-                amount = abs(amount)  # 收入为正值
-                total_income += amount
-
-            # 动态映射到对应字段
-            if category in category_mapping:
-                field_name = category_mapping[category]
-                # 检查字段是否在数据库模型中存在
-                if field_name in financial_fields:
-                    aggregated_data[field_name] += amount
-                else:
-                    print(f"⚠️ 字段 {field_name} 不存在于数据库模型中")
-            else:
+        # 按存储的 year_month 列筛选月份，走 (year_month, category) 覆盖索引的范围扫描
+        if year and month:
+            query = query.filter(year_month == year * 100 + month)
+        elif year:
+            query = query.filter(year_month.between(year * 100 + 1, year * 100 + 12))
+        elif month:
+            query = query.filter(year_month % 100 == month)
+        if months is not None:
+            query = query.filter(year_month.in_(sorted({to_year_month(value) for value in months})))
+
+        grouped_rows = query.group_by(year_month, TransactionDetail.category_id).all()
+        category_names = load_dimension_names(db, "category")
+
+        # 按整数分累加，写入前再换算为元
+        monthly_cents: Dict[datetime, Dict[str, int]] = {}
+        monthly_totals: Dict[datetime, Dict[str, int]] = {}
+
+        for row in grouped_rows:
+            month_date = year_month_start(row.year_month)
+            if month_date not in monthly_cents:
+                # 动态初始化聚合数据，只包含实际存在的字段
+                # avg_consumption和recent_avg_consumption都在第二阶段计算
+                monthly_cents[month_date] = {field: 0 for field in financial_fields}
+                monthly_totals[month_date] = {"income": 0, "expense": 0, "count": 0}
+
+            totals = monthly_totals[month_date]
+            totals["count"] += row.transaction_count
+            totals["income"] += row.income_cents or 0
+            totals["expense"] += row.expense_cents or 0
+
+            # 动态映射到对应字段：收入为正值、支出为负值
+            category = category_names.get(row.category_id)
+            field_name = category_mapping.get(category)
+            if field_name is None:
                 print(f"⚠️ 未找到类别 '{category}' 的映射")
+            elif field_name in financial_fields:
+                monthly_cents[month_date][field_name] += (row.flow_cents or 0) + (
+                    row.neutral_cents or 0
+                )
+            else:
+                print(f"⚠️ 字段 {field_name} 不存在于数据库模型中")
+
+        monthly_data: Dict[datetime, Dict] = {}
+        for month_date, totals in monthly_totals.items():
+            # 计算结余
+            if "balance" in financial_fields:
+                monthly_cents[month_date]["balance"] = totals["income"] - totals["expense"]
+            monthly_data[month_date] = {
+                field: from_cents(cents) for field, cents in monthly_cents[month_date].items()
+            }
 
-        # 计算结余
-        if "balance" in financial_fields:
-            aggregated_data["balance"] = total_income - total_expense
+            print(
+                f"💰 {month_date.year}年{month_date.month}月汇总 - 交易: {totals['count']} 笔, "
+                f"收入: {from_cents(totals['income'])}, 支出: {from_cents(totals['expense'])}"
+            )
 
-        # 第一阶段只计算基础聚合数据，avg_consumption和recent_avg_consumption都在第二阶段计算
-        if "avg_consumption" in financial_fields:
-            aggregated_data["avg_consumption"] = 0.0  # 临时设为0，第二阶段更新
+        return dict(sorted(monthly_data.items()))
 
-        if "recent_avg_consumption" in financial_fields:
-            aggregated_data["recent_avg_consumption"] = 0.0  # 临时设为0，第二阶段更新
+    @classmethod
+    def _bulk_upsert_monthly_records(
+        cls, db: Session, monthly_data: Dict[datetime, Dict], financial_fields: set
+    ) -> Tuple[int, int]:
+        """
+        批量写入月度聚合记录：已存在的月份批量更新，缺失的月份批量插入
 
-        print(f"💰 月度汇总 - 收入: {total_income}, 支出: {total_expense}")
-        # print(f"📊 聚合结果: {aggregated_data}")
+        Args:
+            db: 数据库会话
+            monthly_data: {月度日期: 月度聚合数据}
+            financial_fields: 可用的财务字段集合
 
-        return aggregated_data
+        Returns:
+            Tuple[int, int]: (新建记录数, 更新记录数)
+        """
+        if not monthly_data:
+            return 0, 0
+
+        existing_ids = dict(
+            db.query(FinancialAggregation.month_date, FinancialAggregation.id)
+            .filter(FinancialAggregation.month_date.in_(list(monthly_data.keys())))
+            .all()
+        )
+
+        now = datetime.now()
+        insert_mappings = []
+        update_mappings = []
+
+        for month_date, month_data in monthly_data.items():
+            values = {field: month_data.get(field, 0.0) for field in financial_fields}
+            record_id = existing_ids.get(month_date)
+            if record_id is None:
+                insert_mappings.append(
+                    {"month_date": month_date, "created_at": now, "updated_at": now, **values}
+                )
+            else:
+                update_mappings.append({"id": record_id, "updated_at": now, **values})
+
+        if insert_mappings:
+            db.bulk_insert_mappings(FinancialAggregation, insert_mappings)
+        if update_mappings:
+            db.bulk_update_mappings(FinancialAggregation, update_mappings)
+
+        print(f"✅ 新建 {len(insert_mappings)} 条、更新 {len(update_mappings)} 条月度记录")
+        return len(insert_mappings), len(update_mappings)
 
     @classmethod
     def _update_derived_consumption_fields(
-        cls, db: Session, year: int = None, month: int = None
+        cls,
+        db: Session,
+        year: int = None,
+        month: int = None,
+        target_months: Optional[Set[datetime]] = None,
     ) -> int:
         """
         第二阶段：更新所有记录的avg_consumption和recent_avg_consumption字段
         基于已聚合完成的基础数据计算这两个派生字段
 
+        一次性读取全部月度记录，在内存中按有序月份序列做向量化的滚动窗口计算，
+        再通过一次批量更新写回。本阶段不提交事务，由调用方统一提交。
+
         Args:
             db: 数据库会话
             year: 指定年份，None表示所有年份
             month: 指定月份，None表示所有月份
+            target_months: 指定月份集合(每月1号)，None表示不按集合过滤
 
         Returns:
             更新的记录数
@@ -288,84 +425,83 @@ class AggregationService:
         try:
             print("🔄 开始第二阶段：更新派生的消费字段...")
 
-            # 构建查询条件
-            query = db.query(FinancialAggregation)
+            columns = ["id", "month_date", "housing", "avg_consumption"] + list(
+                cls.AVG_CONSUMPTION_CATEGORIES
+            )
+            rows = db.query(
+                *[getattr(FinancialAggregation, column) for column in columns]
+            ).all()
+            if not rows:
+                print("📊 未找到任何聚合记录")
+                return 0
 
-            if year and month:
-                # 如果指定了年月，只更新特定月份
-                from datetime import datetime
+            frame = pd.DataFrame.from_records(rows, columns=columns)
+            frame["month"] = pd.to_datetime(frame["month_date"]).dt.to_period("M")
+            frame = frame.sort_values("month").reset_index(drop=True)
 
-                month_date = datetime(year, month, 1)
-                query = query.filter(FinancialAggregation.month_date == month_date)
+            # 需要写回的记录
+            target_mask = pd.Series(True, index=frame.index)
+            if year and month:
+                target_mask &= frame["month"] == pd.Period(year=year, month=month, freq="M")
             elif year:
-                # 如果只指定年份，更新该年份的所有月份
-                from sqlalchemy import extract
-
-                query = query.filter(
-                    extract("year", FinancialAggregation.month_date) == year
-                )
-
-            records = query.order_by(FinancialAggregation.month_date).all()
-
-            # 第一步：计算住房支出平均值（基于已聚合的数据）
-            avg_housing_expense = cls._calculate_housing_average_from_aggregated_data(
-                db
-            )
+                target_mask &= frame["month"].dt.year == year
+            if target_months is not None:
+                target_periods = {pd.Period(value, freq="M") for value in target_months}
+                target_mask &= frame["month"].isin(target_periods)
+
+            # 第一步：计算住房支出平均值（只取负值，用所有月份数平均）
+            housing = frame["housing"].fillna(0.0)
+            avg_housing_expense = float(-housing[housing < 0].sum()) / len(frame)
             print(f"🏠 从聚合数据计算住房支出平均值: {avg_housing_expense}")
 
-            updated_count = 0
-
-            # 第二步：更新每条记录的avg_consumption
-            for record in records:
-                try:
-                    # month_date 现在是 DateTime 对象
-                    record_year = record.month_date.year
-                    record_month = record.month_date.month
-
-                    # 计算该记录的avg_consumption
-                    avg_consumption = cls._calculate_avg_consumption_from_record(
-                        record, avg_housing_expense
-                    )
-
-                    # 更新记录
-                    record.avg_consumption = avg_consumption
-                    print(
-                        f"✅ 更新 {record_year}/{record_month} 的avg_consumption: {avg_consumption}"
-                    )
+            # 第二步：avg_consumption = 当月除住房和人情外的所有支出 + 住房支出平均值
+            current_month_consumption = pd.Series(0.0, index=frame.index)
+            for category in cls.AVG_CONSUMPTION_CATEGORIES:
+                values = frame[category].fillna(0.0)
+                current_month_consumption += (-values).clip(lower=0.0)
+            new_avg_consumption = current_month_consumption + avg_housing_expense
 
-                except Exception as e:
-                    print(f"⚠️ 处理记录失败: {record.month_date}, 错误: {e}")
-                    continue
-
-            # 先提交avg_consumption的更新
-            db.commit()
-
-            # 第三步：更新每条记录的recent_avg_consumption
-            for record in records:
-                try:
-                    # month_date 现在是 DateTime 对象
-                    record_year = record.month_date.year
-                    record_month = record.month_date.month
-
-                    # 计算该记录的recent_avg_consumption
-                    recent_avg = cls._calculate_recent_avg_consumption(
-                        db, record_year, record_month, record.avg_consumption
-                    )
-
-                    # 更新记录
-                    record.recent_avg_consumption = recent_avg
-                    updated_count += 1
-
-                    print(
-                        f"✅ 更新 {record_year}/{record_month} 的recent_avg_consumption: {recent_avg}"
-                    )
+            # 非目标月份沿用已存储的值，与逐月更新时读取数据库的语义一致
+            avg_consumption = frame["avg_consumption"].astype(float).where(
+                ~target_mask, new_avg_consumption
+            )
 
-                except Exception as e:
-                    print(f"⚠️ 处理记录失败: {record.month_date}, 错误: {e}")
-                    continue
+            # 第三步：recent_avg_consumption = n, n-1, n-2 三个月的平均值
+            # 先补齐缺失月份（显式的空值），再按月偏移；历史月份只计入正值
+            monthly_series = pd.Series(avg_consumption.values, index=frame["month"])
+            full_range = pd.period_range(
+                frame["month"].iloc[0], frame["month"].iloc[-1], freq="M"
+            )
+            monthly_series = monthly_series.reindex(full_range)
+
+            window_sum = monthly_series.copy()
+            window_count = pd.Series(1, index=full_range)
+            for offset in (1, 2):
+                past_values = monthly_series.shift(offset)
+                is_valid = past_values > 0
+                window_sum += past_values.where(is_valid, 0.0)
+                window_count += is_valid.astype(int)
+            recent_avg_consumption = (window_sum / window_count).reindex(frame["month"])
+
+            updates = [
+                {
+                    "id": int(record_id),
+                    "avg_consumption": float(avg_value),
+                    "recent_avg_consumption": float(recent_value),
+                }
+                for record_id, avg_value, recent_value, is_target in zip(
+                    frame["id"],
+                    avg_consumption,
+                    recent_avg_consumption.values,
+                    target_mask,
+                )
+                if is_target
+            ]
+            if updates:
+                db.bulk_update_mappings(FinancialAggregation, updates)
 
-            print(f"📊 完成派生字段更新，共更新 {updated_count} 条记录")
-            return updated_count
+            print(f"📊 完成派生字段更新，共更新 {len(updates)} 条记录")
+            return len(updates)
 
         except Exception as e:
             print(f"❌ 更新派生字段失败: {str(e)}")
@@ -421,164 +557,6 @@ class AggregationService:
             print(f"❌ 从聚合数据计算住房平均值失败: {str(e)}")
             return 0.0
 
-    @classmethod
-    def _calculate_avg_consumption_from_record(
-        cls, record: FinancialAggregation, avg_housing_expense: float
-    ) -> float:
-        """
-        根据聚合记录计算avg_consumption
-        avg_consumption = 当月除住房和人情外的所有支出 + 住房支出平均值
-
-        Args:
-            record: 财务聚合记录
-            avg_housing_expense: 住房支出平均值
-
-        Returns:
-            平均消费金额
-        """
-        try:
-            # 计算当月除住房和人情外的所有支出
-            current_month_consumption = 0.0
-
-            # 包含的支出类别
-            included_categories = [
-                "dining",
-                "living",
-                "entertainment",
-                "transportation",
-                "travel",
-                "gifts",
-            ]
-
-            for category in included_categories:
-                if hasattr(record, category):
-                    field_value = getattr(record, category, 0.0)
-                    if field_value is not None and field_value < 0:  # 支出为负值
-                        current_month_consumption += abs(field_value)
-
-            # 最终的avg_consumption = 当月消费 + 住房平均值
-            avg_consumption = current_month_consumption + avg_housing_expense
-
-            return avg_consumption
-
-        except Exception as e:
-            print(f"❌ 计算avg_consumption失败: {str(e)}")
-            return 0.0
-
-    @classmethod
-    def _calculate_recent_avg_consumption(
-        cls, db: Session, year: int, month: int, current_month_avg: float
-    ) -> float:
-        """
-        基于已聚合的数据计算最近三个月的平均消费
-        取最近三个月（包括当前月份 n, n-1, n-2）的avg_consumption的平均值
-
-        Args:
-            db: 数据库会话
-            year: 当前年份
-            month: 当前月份
-            current_month_avg: 当前月份的avg_consumption
-
-        Returns:
-            最近平均消费金额
-        """
-        try:
-            from datetime import datetime
-            from dateutil.relativedelta import relativedelta
-
-            # 构建当前月份的日期
-            current_date = datetime(year, month, 1)
-
-            # 收集最近三个月的avg_consumption（包括当前月份）
-            recent_avg_consumptions = [current_month_avg]  # 当前月份 (n)
-
-            print(f"📊 计算 {year}/{month} 的recent_avg_consumption")
-            print(f"📊 当前月份avg_consumption: {current_month_avg}")
-
-            # 查询过去两个月的记录 (n-1, n-2)
-            for i in range(1, 3):  # 查询过去2个月
-                past_date = current_date - relativedelta(months=i)
-                past_month_date = datetime(past_date.year, past_date.month, 1)
-
-                record = (
-                    db.query(FinancialAggregation)
-                    .filter(FinancialAggregation.month_date == past_month_date)
-                    .first()
-                )
-
-                if (
-                    record
-                    and record.avg_consumption is not None
-                    and record.avg_consumption > 0
-                ):
-                    recent_avg_consumptions.append(record.avg_consumption)
-                    print(
-                        f"📊 找到 {past_date.year}/{past_date.month} 的avg_consumption: {record.avg_consumption}"
-                    )
-                else:
-                    print(
-                        f"📊 未找到 {past_date.year}/{past_date.month} 的有效avg_consumption数据"
-                    )
-
-            # 计算平均值
-            if len(recent_avg_consumptions) > 0:
-                recent_avg = sum(recent_avg_consumptions) / len(recent_avg_consumptions)
-            else:
-                recent_avg = current_month_avg  # 如果没有历史数据，使用当前月份的值
-
-            print(
-                f"📊 使用 {len(recent_avg_consumptions)} 个月的数据: {recent_avg_consumptions}"
-            )
-            print(f"📊 计算结果recent_avg_consumption: {recent_avg}")
-
-            return recent_avg
-
-        except Exception as e:
-            print(f"❌ 计算recent_avg_consumption失败: {str(e)}")
-            import traceback
-
-            print(f"🔍 详细错误信息:\n{traceback.format_exc()}")
-            return current_month_avg  # 出错时返回当前月份的值
-
-    @classmethod
-    def _create_financial_record(
-        cls, month_date: datetime, month_data: Dict, financial_fields: set
-    ) -> FinancialAggregation:
-        """
-        动态创建财务记录
-
-        Args:
-            month_date: 月份日期DateTime对象
-            month_data: 月度数据
-            financial_fields: 可用的财务字段集合
-        """
-        # 动态构建参数字典，只包含存在的字段
-        record_data = {"month_date": month_date}
-
-        for field in financial_fields:
-            record_data[field] = month_data.get(field, 0.0)
-
-        return FinancialAggregation(**record_data)
-
-    @classmethod
-    def _update_financial_record(
-        cls, record: FinancialAggregation, month_data: Dict, financial_fields: set
-    ):
-        """
-        动态更新财务记录
-
-        Args:
-            record: 要更新的记录
-            month_data: 月度数据
-            financial_fields: 可用的财务字段集合
-        """
-        # 动态更新所有字段
-        for field in financial_fields:
-            if hasattr(record, field):
-                setattr(record, field, month_data.get(field, 0.0))
-
-        record.updated_at = datetime.utcnow()
-
     @classmethod
     def get_aggregation_stats(cls, db: Session) -> Dict:
         """获取聚合统计信息"""
@@ -0,0 +1,185 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from app.models.base import FinancialAggregation
+
+
+class AnalyticsService:
+    """现金流看板图表数据服务，基于月度聚合表在SQL中完成计算"""
+
+    # 计入消费支出的类别
+    EXPENSE_CATEGORIES = (
+        "housing",
+        "dining",
+        "living",
+        "entertainment",
+        "transportation",
+        "travel",
+        "gifts",
+    )
+    # 图表展示的类别 (与前端 expenseCategories 顺序一致，额外包含交易类)
+    CHART_CATEGORIES = EXPENSE_CATEGORIES + ("transactions",)
+
+    @staticmethod
+    def _monthly_expense():
+        """单月消费支出总额 (各消费类别之和的绝对值)"""
+        columns = [
+            getattr(FinancialAggregation, category)
+            for category in AnalyticsService.EXPENSE_CATEGORIES
+        ]
+        return func.abs(sum(columns[1:], columns[0]))
+
+    @staticmethod
+    def _filter_range(query, start_date: Optional[str], end_date: Optional[str]):
+        """按 month_date 过滤日期范围，与 FinancialService.get_records 保持一致"""
+        if start_date:
+            start_dt = datetime.strptime(start_date, "%Y-%m-%d")
+            query = query.where(FinancialAggregation.month_date >= start_dt)
+        if end_date:
+            end_dt = datetime.strptime(end_date, "%Y-%m-%d")
+            query = query.where(FinancialAggregation.month_date <= end_dt)
+        return query
+
+    @staticmethod
+    def _round_amounts(values) -> List[float]:
+        """金额保留两位小数，去掉浮点累加误差并缩小响应体积"""
+        return [round(value or 0.0, 2) for value in values]
+
+    @staticmethod
+    def _month_labels(month_dates: List[datetime]) -> List[str]:
+        return [month_date.strftime("%Y-%m") for month_date in month_dates]
+
+    @staticmethod
+    def get_category_breakdown(
+        db: Session, start_date: Optional[str] = None, end_date: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        获取日期范围内各消费类别的支出总额
+
+        Returns:
+            Dict: {"categories": [{"key", "value"}], "total"}，只包含支出不为 0 的类别
+        """
+        query = select(
+            *[
+                func.coalesce(func.sum(getattr(FinancialAggregation, category)), 0.0)
+                for category in AnalyticsService.CHART_CATEGORIES
+            ]
+        )
+        sums = db.execute(AnalyticsService._filter_range(query, start_date, end_date)).one()
+
+        categories = [
+            {"key": category, "value": round(abs(value), 2)}
+            for category, value in zip(AnalyticsService.CHART_CATEGORIES, sums)
+            if value
+        ]
+        return {
+            "categories": categories,
+            "total": round(sum(item["value"] for item in categories), 2),
+        }
+
+    @staticmethod
+    def get_monthly_expenses(
+        db: Session, start_date: Optional[str] = None, end_date: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        获取按月份、消费类别拆分的支出序列
+
+        Returns:
+            Dict: {"months": ["YYYY-MM"], "series": {类别: [每月金额]}}
+        """
+        columns = [
+            getattr(FinancialAggregation, category)
+            for category in AnalyticsService.CHART_CATEGORIES
+        ]
+        query = select(FinancialAggregation.month_date, *columns)
+        rows = db.execute(
+            AnalyticsService._filter_range(query, start_date, end_date).order_by(
+                FinancialAggregation.month_date
+            )
+        ).all()
+
+        return {
+            "months": AnalyticsService._month_labels([row[0] for row in rows]),
+            "series": {
+                category: AnalyticsService._round_amounts(row[index + 1] for row in rows)
+                for index, category in enumerate(AnalyticsService.CHART_CATEGORIES)
+            },
+        }
+
+    @staticmethod
+    def get_income_expense(
+        db: Session, start_date: Optional[str] = None, end_date: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        获取每月收入、消费支出和结余序列
+
+        Returns:
+            Dict: {"months": ["YYYY-MM"], "income": [...], "expense": [...], "balance": [...]}
+        """
+        query = select(
+            FinancialAggregation.month_date,
+            FinancialAggregation.salary,
+            AnalyticsService._monthly_expense(),
+            FinancialAggregation.balance,
+        )
+        rows = db.execute(
+            AnalyticsService._filter_range(query, start_date, end_date).order_by(
+                FinancialAggregation.month_date
+            )
+        ).all()
+
+        return {
+            "months": AnalyticsService._month_labels([row[0] for row in rows]),
+            "income": AnalyticsService._round_amounts(row[1] for row in rows),
+            "expense": AnalyticsService._round_amounts(row[2] for row in rows),
+            "balance": AnalyticsService._round_amounts(row[3] for row in rows),
+        }
+
+    @staticmethod
+    def get_overview(
+        db: Session, start_date: Optional[str] = None, end_date: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        获取日期范围内的收支总览
+
+        平均月支出的环比变化 = 全部月份平均支出相对于去掉最后一个月后平均支出的变化百分比
+
+        Returns:
+            Dict: 总收入、总支出、总结余、月份数、平均月支出及其变化百分比
+        """
+        monthly_expense = AnalyticsService._monthly_expense()
+        query = select(
+            func.count(FinancialAggregation.id),
+            func.coalesce(func.sum(FinancialAggregation.salary), 0.0),
+            func.coalesce(func.sum(monthly_expense), 0.0),
+        )
+        month_count, total_income, total_expense = db.execute(
+            AnalyticsService._filter_range(query, start_date, end_date)
+        ).one()
+
+        avg_monthly_expense = total_expense / month_count if month_count else 0.0
+        avg_expense_change = 0.0
+        if month_count > 1:
+            last_month_expense = (
+                db.execute(
+                    AnalyticsService._filter_range(select(monthly_expense), start_date, end_date)
+                    .order_by(FinancialAggregation.month_date.desc())
+                    .limit(1)
+                ).scalar()
+                or 0.0
+            )
+            previous_avg = (total_expense - last_month_expense) / (month_count - 1)
+            if previous_avg > 0:
+                avg_expense_change = (
+                    (avg_monthly_expense - previous_avg) / previous_avg * 100
+                )
+
+        return {
+            "month_count": month_count,
+            "total_income": round(total_income, 2),
+            "total_expense": round(total_expense, 2),
+            "total_balance": round(total_income - total_expense, 2),
+            "avg_monthly_expense": round(avg_monthly_expense, 2),
+            "avg_expense_change": round(avg_expense_change, 1),
+        }
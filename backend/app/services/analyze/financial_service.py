@@ -1,6 +1,6 @@
-from typing import List, Optional
+from typing import Any, Dict, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc, asc, text
+from sqlalchemy import func, desc, asc, select
 from app.models.base import FinancialAggregation
 from datetime import datetime
 
@@ -8,6 +8,13 @@ from datetime import datetime
 class FinancialService:
     """财务聚合数据分析服务"""
 
+    # 允许排序的字段白名单
+    ORDERABLE_COLUMNS = {
+        column.name: column for column in FinancialAggregation.__table__.columns
+    }
+    # 只读查询返回的字段
+    RECORD_FIELDS = tuple(ORDERABLE_COLUMNS)
+
     @staticmethod
     def get_records(
         db: Session,
@@ -17,74 +24,49 @@ class FinancialService:
         order_direction: str = "asc",
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
-    ) -> List[FinancialAggregation]:
+    ) -> Dict[str, Any]:
         """
         获取财务聚合记录
 
+        日期范围、排序和分页均在SQL中完成，日期过滤可以利用 month_date 索引。
+        使用 Core 查询，返回按 RECORD_FIELDS 顺序排列的只读行，不构造 ORM 实例
+
         Args:
             db: 数据库会话
             skip: 跳过记录数
             limit: 限制记录数
-            order_by: 排序字段 (month_date, balance, salary, etc.)
+            order_by: 排序字段 (month_date, balance, salary, etc.)，不在白名单中时按 month_date 排序
             order_direction: 排序方向 (asc, desc)
             start_date: 开始日期，格式：YYYY-MM-DD
             end_date: 结束日期，格式：YYYY-MM-DD
 
         Returns:
-            List[FinancialAggregation]: 财务聚合记录列表
+            Dict: 包含 records (当前页记录) 和 total (过滤后的总数)
         """
-        query = db.query(FinancialAggregation)
-
-        # 日期范围过滤 - 先获取所有数据，然后在Python中进行过滤
-        all_records = query.all()
+        query = select(*FinancialAggregation.__table__.columns)
 
-        # 如果有日期过滤条件，在Python中进行过滤
-        if start_date or end_date:
-            filtered_records = []
-            for record in all_records:
-                try:
-                    # record.month_date 现在是 DateTime 对象
-                    record_date = record.month_date
-                except Exception:
-                    continue
+        # 日期范围过滤
+        if start_date:
+            start_dt = datetime.strptime(start_date, "%Y-%m-%d")
+            query = query.where(FinancialAggregation.month_date >= start_dt)
 
-                # 检查日期范围
-                include_record = True
-                if start_date:
-                    start_dt = datetime.strptime(start_date, "%Y-%m-%d")
-                    if record_date < start_dt:
-                        include_record = False
+        if end_date:
+            end_dt = datetime.strptime(end_date, "%Y-%m-%d")
+            query = query.where(FinancialAggregation.month_date <= end_dt)
 
-                if end_date and include_record:
-                    end_dt = datetime.strptime(end_date, "%Y-%m-%d")
-                    if record_date > end_dt:
-                        include_record = False
-
-                if include_record:
-                    filtered_records.append(record)
-
-            all_records = filtered_records
+        # 获取总数
+        total = db.execute(
+            query.with_only_columns(func.count(FinancialAggregation.id))
+        ).scalar_one()
 
         # 排序处理
-        if order_by == "month_date":
-            # 按日期排序 - month_date 现在是 DateTime 对象
-            if order_direction.lower() == "desc":
-                all_records.sort(
-                    key=lambda x: x.month_date,
-                    reverse=True,
-                )
-            else:
-                all_records.sort(
-                    key=lambda x: x.month_date
-                )
-        else:
-            # 其他字段排序
-            reverse_order = order_direction.lower() == "desc"
-            all_records.sort(
-                key=lambda x: getattr(x, order_by, 0), reverse=reverse_order
-            )
+        order_column = FinancialService.ORDERABLE_COLUMNS.get(
+            order_by, FinancialAggregation.month_date
+        )
+        direction = desc if order_direction.lower() == "desc" else asc
+        query = query.order_by(direction(order_column), direction(FinancialAggregation.id))
 
         # 分页处理
-        start_index = skip
-        end_index = skip + limit
-        return all_records[start_index:end_index]
+        records = db.execute(query.offset(skip).limit(limit)).all()
+
+        return {"records": records, "total": total}
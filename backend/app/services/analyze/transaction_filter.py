@@ -0,0 +1,216 @@
+"""
+交易明细筛选条件
+将 TransactionFilterQuery 的筛选字段规范化为不可变的 TransactionFilter，并编译为可复用的 SQL WHERE 条件，
+供交易查询、流式读取、导出、筛选项统计和汇总统计共用。
+相同筛选条件的编译结果会被缓存，规范化后的条件同时用作查询缓存键。
+"""
+
+from dataclasses import asdict, dataclass, fields, replace
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.database.dimensions import dimension_ids, dimension_ids_like
+from app.database.fts import can_use_fts, fts_match_condition, transaction_fts
+from app.models.base import TransactionDetail
+
+transaction_table = TransactionDetail.__table__
+
+# 编译结果缓存的条目数
+COMPILED_FILTER_CACHE_SIZE = 256
+
+
+class InvalidFilterError(ValueError):
+    """筛选条件无效 (如日期格式错误)"""
+
+
+def _normalize_values(values: Optional[Iterable[Optional[str]]]) -> Tuple[str, ...]:
+    """去掉 None 和重复值并排序，取值顺序不同的相同条件得到相同结果"""
+    if not values:
+        return ()
+    return tuple(sorted({value for value in values if value is not None}))
+
+
+def _parse_date(value: str, name: str) -> datetime:
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError as e:
+        raise InvalidFilterError(f"{name}格式错误: {value}，应为 YYYY-MM-DD") from e
+
+
+@dataclass(frozen=True)
+class TransactionFilter:
+    """
+    规范化的交易筛选条件
+
+    列表条件保存为排序后的元组，空列表、空字符串与未指定等价，因此实例可哈希，
+    可直接作为编译缓存和查询缓存的键。
+    """
+
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    categories: Tuple[str, ...] = ()
+    income_expense_types: Tuple[str, ...] = ()
+    payment_methods: Tuple[str, ...] = ()
+    counterparties: Tuple[str, ...] = ()
+    min_amount: Optional[float] = None
+    max_amount: Optional[float] = None
+    keyword: Optional[str] = None
+
+    @classmethod
+    def create(
+        cls,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        categories: Optional[Iterable[str]] = None,
+        income_expense_types: Optional[Iterable[str]] = None,
+        payment_methods: Optional[Iterable[str]] = None,
+        counterparties: Optional[Iterable[str]] = None,
+        min_amount: Optional[float] = None,
+        max_amount: Optional[float] = None,
+        keyword: Optional[str] = None,
+    ) -> "TransactionFilter":
+        """由原始筛选参数创建规范化的筛选条件"""
+        return cls(
+            start_date=start_date or None,
+            end_date=end_date or None,
+            categories=_normalize_values(categories),
+            income_expense_types=_normalize_values(income_expense_types),
+            payment_methods=_normalize_values(payment_methods),
+            counterparties=_normalize_values(counterparties),
+            min_amount=min_amount,
+            max_amount=max_amount,
+            keyword=keyword or None,
+        )
+
+    @classmethod
+    def from_query(cls, query: Any) -> "TransactionFilter":
+        """由 TransactionFilterBase 及其子类 (查询、筛选项统计请求) 创建筛选条件"""
+        return cls.create(**{field.name: getattr(query, field.name) for field in fields(cls)})
+
+    def without(self, *names: str) -> "TransactionFilter":
+        """返回去掉指定筛选条件后的副本，用于统计某字段取值时排除该字段自身的条件"""
+        return replace(self, **{name: self.__dataclass_fields__[name].default for name in names})
+
+    def as_params(self) -> Dict[str, Any]:
+        """返回规范化后的参数字典，用作查询缓存键"""
+        return asdict(self)
+
+    def describe(self) -> List[str]:
+        """返回已应用筛选条件的描述"""
+        descriptions = []
+        if self.start_date:
+            descriptions.append(f"开始日期: {self.start_date}")
+        if self.end_date:
+            descriptions.append(f"结束日期: {self.end_date}")
+        if self.categories:
+            descriptions.append(f"交易类型: {', '.join(self.categories)}")
+        if self.income_expense_types:
+            descriptions.append(f"收支类型: {', '.join(self.income_expense_types)}")
+        if self.payment_methods:
+            descriptions.append(f"支付方式: {', '.join(self.payment_methods)}")
+        if self.counterparties:
+            descriptions.append(f"交易对方: {', '.join(self.counterparties)}")
+        if self.min_amount is not None:
+            descriptions.append(f"最小金额: {self.min_amount}")
+        if self.max_amount is not None:
+            descriptions.append(f"最大金额: {self.max_amount}")
+        if self.keyword:
+            descriptions.append(f"关键词: {self.keyword}")
+        return descriptions
+
+
+EMPTY_FILTER = TransactionFilter()
+
+
+@dataclass(frozen=True)
+class CompiledFilter:
+    """编译后的筛选条件：WHERE 条件列表及是否需要关联全文索引表"""
+
+    conditions: Tuple[Any, ...]
+    use_fts: bool
+
+    def apply(self, query):
+        """将筛选条件应用到 Core select 或 ORM 查询上"""
+        if self.use_fts:
+            query = query.join(transaction_fts, transaction_fts.c.rowid == transaction_table.c.id)
+        if self.conditions:
+            query = query.where(*self.conditions)
+        return query
+
+
+def compile_filter(db: Session, transaction_filter: Optional[TransactionFilter]) -> CompiledFilter:
+    """
+    编译筛选条件
+
+    关键词优先通过全文索引匹配，关键词过短或索引不可用时回退到 LIKE；
+    是否可用全文索引取决于数据库，因此作为编译缓存键的一部分。
+
+    Raises:
+        InvalidFilterError: 日期格式错误
+    """
+    transaction_filter = transaction_filter or EMPTY_FILTER
+    keyword = transaction_filter.keyword
+    use_fts = bool(keyword) and can_use_fts(db, keyword)
+    return _compile(transaction_filter, use_fts)
+
+
+@lru_cache(maxsize=COMPILED_FILTER_CACHE_SIZE)
+def _compile(transaction_filter: TransactionFilter, use_fts: bool) -> CompiledFilter:
+    columns = transaction_table.c
+    conditions = []
+
+    # 日期范围筛选：只有日期时结束日期包含当天全部记录
+    if transaction_filter.start_date:
+        start = _parse_date(transaction_filter.start_date, "开始日期")
+        conditions.append(columns.transaction_time >= start)
+    if transaction_filter.end_date:
+        end = _parse_date(transaction_filter.end_date, "结束日期")
+        if len(transaction_filter.end_date) <= len("YYYY-MM-DD"):
+            conditions.append(columns.transaction_time < end + timedelta(days=1))
+        else:
+            conditions.append(columns.transaction_time <= end)
+
+    # 取值列表筛选：维度字段先在维度表中查出 id，再按整数 id 列筛选
+    if transaction_filter.categories:
+        conditions.append(
+            columns.category_id.in_(dimension_ids("category", transaction_filter.categories))
+        )
+    if transaction_filter.income_expense_types:
+        conditions.append(columns.income_expense_type.in_(transaction_filter.income_expense_types))
+    if transaction_filter.payment_methods:
+        conditions.append(
+            columns.payment_method_id.in_(
+                dimension_ids("payment_method", transaction_filter.payment_methods)
+            )
+        )
+    if transaction_filter.counterparties:
+        conditions.append(
+            columns.counterparty_id.in_(
+                dimension_ids("counterparty", transaction_filter.counterparties)
+            )
+        )
+
+    # 金额范围筛选
+    if transaction_filter.min_amount is not None:
+        conditions.append(columns.amount >= transaction_filter.min_amount)
+    if transaction_filter.max_amount is not None:
+        conditions.append(columns.amount <= transaction_filter.max_amount)
+
+    # 关键词搜索
+    keyword = transaction_filter.keyword
+    if use_fts:
+        conditions.append(fts_match_condition(keyword))
+    elif keyword:
+        conditions.append(
+            or_(
+                columns.item_name.like(f"%{keyword}%"),
+                columns.remarks.like(f"%{keyword}%"),
+                columns.counterparty_id.in_(dimension_ids_like("counterparty", f"%{keyword}%")),
+            )
+        )
+
+    return CompiledFilter(conditions=tuple(conditions), use_fts=use_fts)
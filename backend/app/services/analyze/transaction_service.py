@@ -1,140 +1,421 @@
-from typing import List, Optional, Dict, Any
+from datetime import datetime
+from typing import List, Optional, Dict, Any, Iterator, Sequence, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import func, extract, desc, asc, and_, or_
+from sqlalchemy import func, extract, desc, asc, and_, or_, select, tuple_
+from sqlalchemy.engine import Row
 from app.models.base import TransactionDetail
+from app.database.dimensions import DIMENSIONS, TRANSACTION_RECORDS_FROM, record_column
+from app.database.fts import transaction_fts
+from app.services.analyze.transaction_filter import (
+    EMPTY_FILTER,
+    TransactionFilter,
+    compile_filter,
+)
+from app.utils.amounts import from_cents
+from app.utils.cursor import InvalidCursorError, decode_cursor, encode_cursor
+
+STREAM_BATCH_SIZE = 1000
 
 
 class TransactionService:
     """消费流水分析服务"""
 
+    # 允许排序的字段白名单 (relevance 另行处理)
+    ORDERABLE_COLUMNS = {
+        "transaction_time",
+        "category",
+        "amount",
+        "income_expense_type",
+        "payment_method",
+        "counterparty",
+        "item_name",
+        "remarks",
+    }
+
+    # 只读查询返回的列，与 schemas.TransactionDetail 字段一致；
+    # 维度字段取自维度表，查询需 select_from(TRANSACTION_RECORDS_FROM)
+    RECORD_COLUMNS = tuple(
+        record_column(name)
+        for name in (
+            "id",
+            "transaction_time",
+            "category",
+            "amount",
+            "income_expense_type",
+            "payment_method",
+            "counterparty",
+            "item_name",
+            "remarks",
+            "created_at",
+            "updated_at",
+        )
+    )
+    RECORD_FIELDS = tuple(column.name for column in RECORD_COLUMNS)
+
+    # 支持统计取值的字段 -> 对应的筛选参数名
+    FACET_FIELDS = {
+        "category": "categories",
+        "income_expense_type": "income_expense_types",
+        "payment_method": "payment_methods",
+        "counterparty": "counterparties",
+    }
+
     @staticmethod
     def get_records(
         db: Session,
-        start_date: Optional[str] = None,
-        end_date: Optional[str] = None,
-        categories: Optional[List[str]] = None,
-        income_expense_types: Optional[List[str]] = None,
-        payment_methods: Optional[List[str]] = None,
-        counterparties: Optional[List[str]] = None,
-        min_amount: Optional[float] = None,
-        max_amount: Optional[float] = None,
-        keyword: Optional[str] = None,
+        transaction_filter: Optional[TransactionFilter] = None,
         skip: int = 0,
         limit: int = 100,
         order_by: str = "transaction_time",
         order_direction: str = "desc",
+        pagination_mode: str = "offset",
+        cursor: Optional[str] = None,
+        include_total: Optional[bool] = None,
     ) -> Dict[str, Any]:
         """
         根据多种条件筛选交易记录
 
         Args:
             db: 数据库会话
-            start_date: 开始日期 (格式: YYYY-MM-DD)
-            end_date: 结束日期 (格式: YYYY-MM-DD)
-            categories: 交易类型列表 (如: ["住房", "餐饮"])
-            income_expense_types: 收支类型列表 (如: ["收入", "支出"])
-            payment_methods: 支付方式列表 (如: ["支付宝", "微信"])
-            counterparties: 交易对方列表
-            min_amount: 最小金额
-            max_amount: 最大金额
-            keyword: 关键词搜索 (在商品名称、备注中搜索)
+            transaction_filter: 筛选条件 (日期范围、交易类型、收支类型、支付方式、交易对方、金额范围、关键词)
             skip: 跳过记录数
             limit: 限制记录数
-            order_by: 排序字段 (transaction_time, amount, category)
+            order_by: 排序字段 (transaction_time, amount, category, relevance)
             order_direction: 排序方向 (asc, desc)
+            pagination_mode: 分页模式 (offset 按 skip 分页, cursor 按游标分页)
+            cursor: 上一页返回的 next_cursor，仅 cursor 模式使用
+            include_total: 是否计算总数，默认 offset 模式计算、cursor 模式不计算
 
         Returns:
-            Dict: 包含 records, total, filters_applied 等信息
+            Dict: 包含 records, total, filters_applied, next_cursor 等信息；
+            records 为按 RECORD_COLUMNS 顺序排列的只读行 (cursor 模式下末尾附加排序值)
+
+        Raises:
+            InvalidCursorError: 游标无效或与当前排序方式不匹配
+            InvalidFilterError: 筛选条件无效
         """
-        query = db.query(TransactionDetail)
-        filters_applied = []
-
-        # 日期范围筛选
-        if start_date:
-            query = query.filter(TransactionDetail.transaction_time >= start_date)
-            filters_applied.append(f"开始日期: {start_date}")
-
-        if end_date:
-            query = query.filter(TransactionDetail.transaction_time <= end_date)
-            filters_applied.append(f"结束日期: {end_date}")
-
-        # 交易类型筛选
-        if categories:
-            query = query.filter(TransactionDetail.category.in_(categories))
-            filters_applied.append(f"交易类型: {', '.join(categories)}")
-
-        # 收支类型筛选
-        if income_expense_types:
-            query = query.filter(
-                TransactionDetail.income_expense_type.in_(income_expense_types)
-            )
-            filters_applied.append(f"收支类型: {', '.join(income_expense_types)}")
-
-        # 支付方式筛选
-        if payment_methods:
-            # 过滤掉 None 值
-            non_null_methods = [
-                method for method in payment_methods if method is not None
-            ]
-            if non_null_methods:
-                query = query.filter(
-                    TransactionDetail.payment_method.in_(non_null_methods)
-                )
-                filters_applied.append(f"支付方式: {', '.join(non_null_methods)}")
+        transaction_filter = transaction_filter or EMPTY_FILTER
+        compiled = compile_filter(db, transaction_filter)
+        query = compiled.apply(
+            select(*TransactionService.RECORD_COLUMNS).select_from(TRANSACTION_RECORDS_FROM)
+        )
+
+        # 获取总数：offset 模式默认返回，cursor 模式仅在显式请求时计算；计数不需要关联维度表
+        if include_total is None:
+            include_total = pagination_mode != "cursor"
+        total = (
+            db.execute(
+                compiled.apply(select(func.count()).select_from(TransactionDetail.__table__))
+            ).scalar_one()
+            if include_total
+            else None
+        )
+
+        query, sort_key, sort_column, descending = TransactionService._apply_order(
+            query, order_by, order_direction, compiled.use_fts
+        )
 
-        # 交易对方筛选
-        if counterparties:
-            # 过滤掉 None 值
-            non_null_counterparties = [cp for cp in counterparties if cp is not None]
-            if non_null_counterparties:
+        # 分页：多取一条用于判断是否还有下一页
+        next_cursor = None
+        if pagination_mode == "cursor":
+            if cursor:
+                value, last_id = _decode_position(cursor, sort_key, descending)
                 query = query.filter(
-                    TransactionDetail.counterparty.in_(non_null_counterparties)
+                    _keyset_condition(sort_key, sort_column, descending, value, last_id)
                 )
-                filters_applied.append(
-                    f"交易对方: {', '.join(non_null_counterparties)}"
+            # 附加排序值作为最后一列，用于生成下一页游标
+            records = db.execute(query.add_columns(sort_column).limit(limit + 1)).all()
+            has_more = len(records) > limit
+            records = records[:limit]
+            if has_more:
+                last_record = records[-1]
+                next_cursor = _encode_position(
+                    sort_key, descending, last_record[-1], last_record.id
                 )
-
-        # 金额范围筛选
-        if min_amount is not None:
-            query = query.filter(TransactionDetail.amount >= min_amount)
-            filters_applied.append(f"最小金额: {min_amount}")
-
-        if max_amount is not None:
-            query = query.filter(TransactionDetail.amount <= max_amount)
-            filters_applied.append(f"最大金额: {max_amount}")
-
-        # 关键词搜索
-        if keyword:
-            keyword_filter = or_(
-                TransactionDetail.item_name.like(f"%{keyword}%"),
-                TransactionDetail.remarks.like(f"%{keyword}%"),
-                TransactionDetail.counterparty.like(f"%{keyword}%"),
-            )
-            query = query.filter(keyword_filter)
-            filters_applied.append(f"关键词: {keyword}")
-
-        # 获取总数
-        total = query.count()
-
-        # 排序
-        order_column = getattr(
-            TransactionDetail, order_by, TransactionDetail.transaction_time
-        )
-        if order_direction.lower() == "desc":
-            query = query.order_by(desc(order_column))
         else:
-            query = query.order_by(asc(order_column))
-
-        # 分页
-        records = query.offset(skip).limit(limit).all()
+            records = db.execute(query.offset(skip).limit(limit + 1)).all()
+            has_more = len(records) > limit
+            records = records[:limit]
 
         return {
             "records": records,
             "total": total,
-            "filters_applied": filters_applied,
+            "filters_applied": transaction_filter.describe(),
             "pagination": {
                 "skip": skip,
                 "limit": limit,
-                "has_more": total > (skip + limit),
+                "has_more": has_more,
             },
+            "next_cursor": next_cursor,
+        }
+
+    @staticmethod
+    def stream_records(
+        db: Session,
+        transaction_filter: Optional[TransactionFilter] = None,
+        skip: int = 0,
+        limit: Optional[int] = None,
+        order_by: str = "transaction_time",
+        order_direction: str = "desc",
+        columns: Sequence = RECORD_COLUMNS,
+        batch_size: int = STREAM_BATCH_SIZE,
+    ) -> Iterator[Row]:
+        """
+        以流式方式读取筛选后的交易记录
+
+        只查询 columns 中的列 (默认 RECORD_COLUMNS)，并通过 yield_per 分批从数据库游标读取，
+        内存占用与结果集大小无关。筛选和排序参数与 get_records 相同。
+
+        Returns:
+            Iterator[Row]: 按 columns 顺序排列的记录元组
+        """
+        compiled = compile_filter(db, transaction_filter)
+        query, _, _, _ = TransactionService._apply_order(
+            compiled.apply(select(*columns).select_from(TRANSACTION_RECORDS_FROM)),
+            order_by,
+            order_direction,
+            compiled.use_fts,
+        )
+        if skip:
+            query = query.offset(skip)
+        if limit is not None:
+            query = query.limit(limit)
+        return iter(db.execute(query.execution_options(yield_per=batch_size)))
+
+    @staticmethod
+    def get_facets(
+        db: Session,
+        transaction_filter: Optional[TransactionFilter] = None,
+        fields: Optional[List[str]] = None,
+        facet_limit: int = 50,
+        counterparty_prefix: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        统计筛选条件下各字段的取值及其记录数，用于生成筛选下拉选项
+
+        每个字段统计时不应用该字段自身的筛选条件，这样已选中一个值后仍能看到其他可选值。
+
+        Args:
+            db: 数据库会话
+            transaction_filter: 与 get_records 相同的筛选条件
+            fields: 需要统计的字段，默认全部 (category, income_expense_type, payment_method, counterparty)
+            facet_limit: 每个字段最多返回的取值数量，按记录数降序
+            counterparty_prefix: 交易对方前缀，仅返回以此开头的交易对方
+
+        Returns:
+            Dict: {"facets": {字段: {"values": [{"value", "count"}], "has_more"}}, "filters_applied": [...]}
+        """
+        transaction_filter = transaction_filter or EMPTY_FILTER
+        table = TransactionDetail.__table__
+        facets: Dict[str, Any] = {}
+
+        for field in fields or TransactionService.FACET_FIELDS:
+            facet_filter = transaction_filter.without(TransactionService.FACET_FIELDS[field])
+            count = func.count(table.c.id).label("count")
+            dimension = DIMENSIONS.get(field)
+            if dimension is None:
+                column = table.c[field]
+                query = compile_filter(db, facet_filter).apply(select(column, count))
+                query = query.where(column.isnot(None)).group_by(column)
+                value = column
+            else:
+                # 按整数 id 分组计数，再关联维度表取得取值
+                id_column = table.c[dimension.id_column]
+                query = compile_filter(db, facet_filter).apply(
+                    select(id_column.label("dimension_id"), count)
+                )
+                query = query.where(id_column.isnot(None))
+                if field == "counterparty" and counterparty_prefix:
+                    # 在维度表上用范围条件匹配前缀，能走 name 唯一索引
+                    names = dimension.table.c.name
+                    query = query.where(
+                        id_column.in_(
+                            select(dimension.table.c.id).where(
+                                names >= counterparty_prefix,
+                                names < counterparty_prefix + "\U0010ffff",
+                            )
+                        )
+                    )
+                counts = query.group_by(id_column).subquery()
+                value = dimension.table.c.name
+                query = select(value, counts.c.count).join_from(
+                    counts, dimension.table, dimension.table.c.id == counts.c.dimension_id
+                )
+            rows = db.execute(
+                query.order_by(desc("count"), asc(value)).limit(facet_limit + 1)
+            ).all()
+            facets[field] = {
+                "values": [
+                    {"value": value, "count": value_count}
+                    for value, value_count in rows[:facet_limit]
+                ],
+                "has_more": len(rows) > facet_limit,
+            }
+
+        return {"facets": facets, "filters_applied": transaction_filter.describe()}
+
+    @staticmethod
+    def get_summary(
+        db: Session, transaction_filter: Optional[TransactionFilter] = None
+    ) -> Dict[str, Any]:
+        """
+        统计筛选条件下的记录数、收支合计及各交易类型的合计
+
+        Args:
+            db: 数据库会话
+            transaction_filter: 与 get_records 相同的筛选条件
+
+        Returns:
+            Dict: {"count", "income", "expense", "categories": [{"category", "income_expense_type", "count", "amount"}], "filters_applied"}
+        """
+        transaction_filter = transaction_filter or EMPTY_FILTER
+        table = TransactionDetail.__table__
+        categories_table = DIMENSIONS["category"].table
+        # 按整数 category_id 分组，再外连接维度表取得交易类型名称，维度表中缺失的 id 不丢弃记录
+        totals = (
+            compile_filter(db, transaction_filter)
+            .apply(
+                select(
+                    table.c.category_id,
+                    table.c.income_expense_type,
+                    func.count(table.c.id).label("count"),
+                    func.coalesce(func.sum(table.c.amount_cents), 0).label("amount_cents"),
+                    func.coalesce(func.sum(table.c.signed_amount_cents), 0).label("flow_cents"),
+                )
+            )
+            .group_by(table.c.category_id, table.c.income_expense_type)
+            .subquery()
+        )
+        rows = db.execute(
+            select(
+                categories_table.c.name,
+                totals.c.income_expense_type,
+                totals.c.count,
+                totals.c.amount_cents,
+                totals.c.flow_cents,
+            )
+            .outerjoin_from(totals, categories_table, categories_table.c.id == totals.c.category_id)
+            .order_by(categories_table.c.name, totals.c.income_expense_type)
+        ).all()
+
+        # 按整数分累加收支流向：收入为正，支出为负
+        income_cents = 0
+        expense_cents = 0
+        categories = []
+        for category, income_expense_type, count, amount_cents, flow_cents in rows:
+            if flow_cents > 0:
+                income_cents += flow_cents
+            else:
+                expense_cents -= flow_cents
+            categories.append(
+                {
+                    "category": category,
+                    "income_expense_type": income_expense_type,
+                    "count": count,
+                    "amount": from_cents(amount_cents),
+                }
+            )
+
+        return {
+            "count": sum(item["count"] for item in categories),
+            "income": from_cents(income_cents),
+            "expense": from_cents(expense_cents),
+            "categories": categories,
+            "filters_applied": transaction_filter.describe(),
         }
+
+    @staticmethod
+    def _apply_order(query, order_by: str, order_direction: str, use_fts: bool):
+        """
+        为查询添加排序
+
+        relevance 按全文索引相关度(bm25)排序，没有全文匹配时按交易时间排序；
+        始终以 id 作为次级排序，保证分页结果稳定。
+
+        Returns:
+            Tuple: (排序后的查询, 排序键, 排序列, 是否降序)
+        """
+        if order_by == "relevance" and use_fts:
+            sort_key = "relevance"
+            sort_column = transaction_fts.c.rank
+            descending = False
+        else:
+            sort_key = (
+                order_by
+                if order_by in TransactionService.ORDERABLE_COLUMNS
+                else "transaction_time"
+            )
+            sort_column = _sort_column(sort_key)
+            descending = order_direction.lower() == "desc"
+        direction = desc if descending else asc
+        query = query.order_by(direction(sort_column), direction(TransactionDetail.id))
+        return query, sort_key, sort_column, descending
+
+
+def _sort_column(sort_key: str):
+    """排序字段对应的列，维度字段按维度表中的取值排序"""
+    dimension = DIMENSIONS.get(sort_key)
+    if dimension is not None:
+        return dimension.table.c.name
+    return TransactionDetail.__table__.c[sort_key]
+
+
+def _encode_position(
+    sort_key: str, descending: bool, value: Any, last_id: int
+) -> str:
+    """将最后一条记录的排序键和 id 编码为游标"""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return encode_cursor(
+        {"o": sort_key, "d": "desc" if descending else "asc", "v": value, "id": last_id}
+    )
+
+
+def _decode_position(
+    cursor: str, sort_key: str, descending: bool
+) -> Tuple[Any, int]:
+    """解析游标，并校验其与当前排序方式一致"""
+    payload = decode_cursor(cursor)
+    if payload.get("o") != sort_key or payload.get("d") != (
+        "desc" if descending else "asc"
+    ):
+        raise InvalidCursorError("分页游标与当前排序方式不匹配")
+    last_id = payload.get("id")
+    if not isinstance(last_id, int):
+        raise InvalidCursorError("无效的分页游标")
+    value = payload.get("v")
+    if sort_key == "transaction_time":
+        try:
+            value = datetime.fromisoformat(value)
+        except (TypeError, ValueError) as e:
+            raise InvalidCursorError("无效的分页游标") from e
+    return value, last_id
+
+
+def _keyset_condition(
+    sort_key: str, sort_column, descending: bool, value: Any, last_id: int
+):
+    """
+    构造“位于游标之后”的筛选条件
+
+    SQLite 中 NULL 在升序时排在最前、降序时排在最后，可空字段需要单独处理。
+    """
+    id_column = TransactionDetail.id
+    dimension = DIMENSIONS.get(sort_key)
+    table_column = TransactionDetail.__table__.c.get(
+        dimension.id_column if dimension is not None else sort_key
+    )
+    nullable = table_column is not None and table_column.nullable
+
+    if descending:
+        if value is None:
+            return and_(sort_column.is_(None), id_column < last_id)
+        after = tuple_(sort_column, id_column) < tuple_(value, last_id)
+        return or_(after, sort_column.is_(None)) if nullable else after
+
+    if value is None:
+        return or_(
+            sort_column.is_not(None),
+            and_(sort_column.is_(None), id_column > last_id),
+        )
+    return tuple_(sort_column, id_column) > tuple_(value, last_id)
@@ -2,6 +2,8 @@
 资产负债表服务模块
 """
 
+from sqlalchemy import select
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from ..models.base import Asset, Liability
@@ -11,13 +13,16 @@ from ..schemas import AssetCreate, AssetUpdate, LiabilityCreate, LiabilityUpdate
 class BalanceSheetService:
     """资产负债表服务类"""
 
+    # 只读查询返回的字段，与 schemas.Asset / schemas.Liability 一致
+    RECORD_FIELDS = ("id", "name", "value", "category", "created_at", "updated_at")
+
     def __init__(self, db: Session):
         self.db = db
 
     # 资产相关操作
-    def get_assets(self) -> List[Asset]:
-        """获取所有资产"""
-        return self.db.query(Asset).order_by(Asset.created_at.desc()).all()
+    def get_assets(self) -> List[Row]:
+        """获取所有资产 (只读行，字段顺序见 RECORD_FIELDS)"""
+        return self._select_records(Asset)
 
     def get_asset(self, asset_id: int) -> Optional[Asset]:
         """根据ID获取资产"""
@@ -60,9 +65,9 @@ class BalanceSheetService:
         return True
 
     # 负债相关操作
-    def get_liabilities(self) -> List[Liability]:
-        """获取所有负债"""
-        return self.db.query(Liability).order_by(Liability.created_at.desc()).all()
+    def get_liabilities(self) -> List[Row]:
+        """获取所有负债 (只读行，字段顺序见 RECORD_FIELDS)"""
+        return self._select_records(Liability)
 
     def get_liability(self, liability_id: int) -> Optional[Liability]:
         """根据ID获取负债"""
@@ -104,6 +109,13 @@ class BalanceSheetService:
         self.db.commit()
         return True
 
+    def _select_records(self, model) -> List[Row]:
+        """按创建时间倒序读取资产或负债，不构造 ORM 实例"""
+        columns = [getattr(model, field) for field in self.RECORD_FIELDS]
+        return self.db.execute(
+            select(*columns).order_by(model.created_at.desc())
+        ).all()
+
     # 综合数据
     def get_balance_sheet_data(self):
         """获取完整的资产负债表数据"""
@@ -1,22 +1,48 @@
 """
 交易明细导入导出服务
-支持CSV格式的交易明细数据导入导出
+支持CSV格式的交易明细数据导入，以及 CSV / XLSX / Parquet / Arrow 格式的流式导出
 """
 
+import codecs
+import sqlite3
 import pandas as pd
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from itertools import chain
+from operator import itemgetter
+from typing import Optional, List, Dict, Any, Set, Tuple, Iterable, Iterator, BinaryIO
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import select
 from io import StringIO
 
+from app.database.dimensions import DIMENSIONS, DimensionInterner, record_column
 from app.models.base import TransactionDetail, FinancialAggregation
+from app.services.analyze.transaction_filter import TransactionFilter
+from app.services.analyze.transaction_service import TransactionService
 from app.services.aggregation_service import AggregationService
+from app.utils.amounts import derive_amount_columns
+from app.utils.fingerprint import compute_transaction_fingerprint
+from app.utils.record_export import get_export_format
+from app.utils.time_buckets import derive_time_bucket_columns
 
 
 class TransactionImportExportService:
     """交易明细导入导出服务"""
 
+    # 每次批量写入的行数
+    IMPORT_CHUNK_SIZE = 5000
+
+    # 去重查询时每条 IN 语句包含的交易时间个数 (低于旧版 SQLite 999 个参数的限制)
+    DEDUP_LOOKUP_SIZE = 500
+
+    # 写入时每条 INSERT 语句的参数个数上限 (SQLite 3.32 之前为 999)
+    MAX_INSERT_VARIABLES = 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999
+
+    # 导入结果中最多保留的错误/重复明细条数
+    MAX_DETAIL_ENTRIES = 1000
+
+    # 导出时每批从数据库游标读取的行数
+    EXPORT_BATCH_SIZE = 2000
+
     # CSV文件的标准列名
     CSV_COLUMNS = [
         "交易时间",
@@ -29,6 +55,21 @@ class TransactionImportExportService:
         "备注"
     ]
 
+    # 与 CSV_COLUMNS 一一对应的导出列
+    EXPORT_COLUMNS = tuple(
+        record_column(name)
+        for name in (
+            "transaction_time",
+            "category",
+            "amount",
+            "income_expense_type",
+            "payment_method",
+            "counterparty",
+            "item_name",
+            "remarks",
+        )
+    )
+
     @staticmethod
     def _clean_string_value(value) -> str:
         """
@@ -83,75 +124,111 @@ class TransactionImportExportService:
             CSV文件路径或CSV内容字符串
         """
         try:
-            # 构建查询
-            query = db.query(TransactionDetail)
-            
-            # 添加日期过滤
-            if start_date:
-                query = query.filter(TransactionDetail.transaction_time >= start_date)
-            if end_date:
-                # 结束日期包含当天，所以要加一天
-                end_datetime = datetime.strptime(end_date, "%Y-%m-%d")
-                query = query.filter(TransactionDetail.transaction_time < end_datetime.replace(hour=23, minute=59, second=59))
-            
-            # 按时间倒序排列
-            transactions = query.order_by(TransactionDetail.transaction_time.desc()).all()
-            
-            # 转换为DataFrame
-            data = []
-            for transaction in transactions:
-                data.append({
-                    "交易时间": transaction.transaction_time.strftime("%Y-%m-%d %H:%M:%S"),
-                    "类型": transaction.category,
-                    "金额": transaction.amount,
-                    "收支": transaction.income_expense_type,
-                    "支付方式": transaction.payment_method or "",
-                    "交易对方": transaction.counterparty or "",
-                    "商品名称": transaction.item_name or "",
-                    "备注": transaction.remarks or ""
-                })
-            
-            df = pd.DataFrame(data, columns=TransactionImportExportService.CSV_COLUMNS)
+            chunks = TransactionImportExportService.stream_export(
+                db,
+                "csv",
+                transaction_filter=TransactionFilter.create(start_date=start_date, end_date=end_date),
+            )
             
             if output_path:
-                # 保存到文件
-                df.to_csv(output_path, index=False, encoding='utf-8-sig')
+                # 逐块写入文件，带 BOM 便于 Excel 识别编码
+                with open(output_path, "wb") as output:
+                    output.write(codecs.BOM_UTF8)
+                    output.writelines(chunks)
                 return output_path
             else:
                 # 返回CSV字符串
-                output = StringIO()
-                df.to_csv(output, index=False, encoding='utf-8')
-                return output.getvalue()
+                return b"".join(chunks).decode("utf-8")
                 
         except Exception as e:
             raise Exception(f"导出CSV失败: {str(e)}")
 
+    @staticmethod
+    def stream_export(
+        db: Session,
+        format: str = "csv",
+        transaction_filter: Optional[TransactionFilter] = None,
+        order_by: str = "transaction_time",
+        order_direction: str = "desc",
+        batch_size: int = EXPORT_BATCH_SIZE,
+    ) -> Iterator[bytes]:
+        """
+        以流式方式导出交易明细
+
+        筛选和排序与交易查询接口共用同一套条件，导出结果即当前查看的记录。
+        查询在调用时立即执行，参数、格式或查询错误在开始输出前抛出；之后通过 yield_per
+        分批从数据库游标读取记录并交给对应格式逐块编码，内存占用与导出行数无关。
+        支持的格式见 app.utils.record_export.EXPORT_FORMATS，各格式均使用 CSV_COLUMNS 作为表头。
+
+        Args:
+            db: 数据库会话
+            format: 导出格式 (csv / xlsx / parquet / arrow)
+            transaction_filter: 筛选条件，默认导出全部记录
+            order_by: 排序字段，与交易查询接口相同
+            order_direction: 排序方向 (asc, desc)
+            batch_size: 每次从游标读取的行数
+
+        Returns:
+            Iterator[bytes]: 导出文件内容片段
+
+        Raises:
+            StreamFormatUnavailableError: 格式依赖的库未安装
+            InvalidFilterError: 筛选条件无效
+        """
+        export_format = get_export_format(format)
+        rows = TransactionService.stream_records(
+            db,
+            transaction_filter=transaction_filter,
+            order_by=order_by,
+            order_direction=order_direction,
+            columns=TransactionImportExportService.EXPORT_COLUMNS,
+            batch_size=batch_size,
+        )
+        return export_format.writer(
+            rows,
+            TransactionImportExportService.EXPORT_COLUMNS,
+            TransactionImportExportService.CSV_COLUMNS,
+            batch_size,
+        )
+
     @staticmethod
     def import_from_csv(
         db: Session,
         csv_content: str = None,
         csv_file_path: str = None,
-        enable_deduplication: bool = True
+        enable_deduplication: bool = True,
+        csv_file: Optional[BinaryIO] = None
     ) -> Dict[str, Any]:
         """
         从CSV导入交易明细数据
+        以 IMPORT_CHUNK_SIZE 行为单位流式读取、校验和写入，内存占用与文件大小无关
         
         Args:
             db: 数据库会话
             csv_content: CSV内容字符串
             csv_file_path: CSV文件路径
             enable_deduplication: 是否启用去重
+            csv_file: 已打开的二进制CSV文件对象（如上传文件的临时文件）
             
         Returns:
             导入结果统计
         """
         try:
             if csv_content is not None:
-                df = pd.read_csv(StringIO(csv_content), encoding='utf-8')
+                source = StringIO(csv_content)
+            elif csv_file is not None:
+                source = csv_file
             elif csv_file_path:
-                df = pd.read_csv(csv_file_path, encoding='utf-8')
+                source = csv_file_path
             else:
-                raise ValueError("必须提供csv_content或csv_file_path")
+                raise ValueError("必须提供csv_content、csv_file或csv_file_path")
+
+            reader = pd.read_csv(
+                source,
+                encoding='utf-8',
+                dtype=str,
+                chunksize=TransactionImportExportService.IMPORT_CHUNK_SIZE
+            )
         except Exception as e:
             return {
                 "success": False,
@@ -163,11 +240,12 @@ class TransactionImportExportService:
                 "duplicate_details": []
             }
 
-        return TransactionImportExportService._import_dataframe(
-            db=db,
-            df=df,
-            enable_deduplication=enable_deduplication
-        )
+        with reader:
+            return TransactionImportExportService._import_chunks(
+                db=db,
+                frames=reader,
+                enable_deduplication=enable_deduplication
+            )
 
     @staticmethod
     def import_from_dataframe(
@@ -256,14 +334,69 @@ class TransactionImportExportService:
         df: pd.DataFrame,
         enable_deduplication: bool = True
     ) -> Dict[str, Any]:
-        try:
-            working_df = df.copy()
+        return TransactionImportExportService._import_chunks(
+            db=db,
+            frames=[df.copy()],
+            enable_deduplication=enable_deduplication
+        )
 
-            validation_result = TransactionImportExportService._validate_csv_format(working_df)
-            if not validation_result["valid"]:
+    @staticmethod
+    def _import_chunks(
+        db: Session,
+        frames: Iterable[pd.DataFrame],
+        enable_deduplication: bool = True
+    ) -> Dict[str, Any]:
+        """
+        逐块导入交易明细
+        每块独立完成校验、去重和写入，全部数据块在同一个事务内提交；
+        错误和重复明细最多保留 MAX_DETAIL_ENTRIES 条
+        
+        Args:
+            db: 数据库会话
+            frames: 包含标准列的数据块序列（内存中的DataFrame或流式读取的分块）
+            enable_deduplication: 是否启用去重
+            
+        Returns:
+            导入结果统计
+        """
+        try:
+            progress = {
+                "imported_count": 0,
+                "skipped_count": 0,
+                "duplicate_count": 0,
+                "error_details": [],
+                "duplicate_details": [],
+                "error_details_truncated": False,
+                "duplicate_details_truncated": False,
+                "touched_months": set(),
+            }
+            # 维度取值驻留缓存，与导入共用一个事务
+            dimensions = DimensionInterner(db)
+
+            has_frame = False
+            for frame in frames:
+                if not has_frame:
+                    validation_result = TransactionImportExportService._validate_csv_format(frame)
+                    if not validation_result["valid"]:
+                        return {
+                            "success": False,
+                            "message": validation_result["message"],
+                            "imported_count": 0,
+                            "skipped_count": 0,
+                            "duplicate_count": 0,
+                            "error_details": [],
+                            "duplicate_details": []
+                        }
+                    has_frame = True
+
+                TransactionImportExportService._import_frame(
+                    db, frame, enable_deduplication, progress, dimensions
+                )
+
+            if not has_frame:
                 return {
                     "success": False,
-                    "message": validation_result["message"],
+                    "message": "CSV文件没有数据行",
                     "imported_count": 0,
                     "skipped_count": 0,
                     "duplicate_count": 0,
@@ -271,110 +404,15 @@ class TransactionImportExportService:
                     "duplicate_details": []
                 }
 
-            imported_count = 0
-            skipped_count = 0
-            duplicate_count = 0
-            error_details: List[Dict[str, Any]] = []
-            duplicate_details: List[Dict[str, Any]] = []
-
-            for index, row in working_df.iterrows():
-                try:
-                    required_fields = ["交易时间", "类型", "金额", "收支"]
-                    for field in required_fields:
-                        if TransactionImportExportService._is_empty_value(row[field]):
-                            raise ValueError(f"必需字段 '{field}' 为空")
-
-                    try:
-                        transaction_time = pd.to_datetime(row["交易时间"])
-                    except Exception as e:
-                        raise ValueError(f"交易时间格式错误: {str(e)}")
-
-                    try:
-                        amount = float(row["金额"])
-                        if amount < 0:
-                            raise ValueError("金额不能为负数")
-                    except ValueError as e:
-                        if "could not convert" in str(e) or "invalid literal" in str(e):
-                            raise ValueError("金额格式错误，必须为数字")
-                        raise e
-
-                    category = TransactionImportExportService._clean_string_value(row["类型"])
-                    income_expense_type = TransactionImportExportService._clean_string_value(row["收支"])
-
-                    if not category:
-                        raise ValueError("交易类型不能为空")
-                    if not income_expense_type:
-                        raise ValueError("收支类型不能为空")
-
-                    if enable_deduplication:
-                        counterparty_for_check = TransactionImportExportService._clean_string_value(row["交易对方"])
-                        item_name_for_check = TransactionImportExportService._clean_string_value(row["商品名称"])
-
-                        is_duplicate = TransactionImportExportService._check_duplicate(
-                            db, transaction_time, amount, counterparty_for_check, item_name_for_check
-                        )
-                        if is_duplicate:
-                            duplicate_count += 1
-                            duplicate_details.append({
-                                "row": index + 2,
-                                "transaction_time": str(transaction_time),
-                                "amount": amount,
-                                "counterparty": TransactionImportExportService._clean_string_value(row["交易对方"]),
-                                "item_name": TransactionImportExportService._clean_string_value(row["商品名称"]),
-                                "reason": "数据重复：相同时间、金额、交易对方和商品名称的记录已存在"
-                            })
-                            continue
-
-                    payment_method = TransactionImportExportService._clean_string_value(row["支付方式"])
-                    counterparty = TransactionImportExportService._clean_string_value(row["交易对方"])
-                    item_name = TransactionImportExportService._clean_string_value(row["商品名称"])
-                    remarks = TransactionImportExportService._clean_string_value(row["备注"])
-
-                    transaction = TransactionDetail(
-                        transaction_time=transaction_time,
-                        category=category,
-                        amount=amount,
-                        income_expense_type=income_expense_type,
-                        payment_method=payment_method if payment_method else None,
-                        counterparty=counterparty if counterparty else None,
-                        item_name=item_name if item_name else None,
-                        remarks=remarks if remarks else None
-                    )
-
-                    db.add(transaction)
-                    imported_count += 1
-
-                except Exception as e:
-                    error_message = str(e)
-                    print(f"处理第{index+2}行数据失败: {error_message}")
-                    skipped_count += 1
-                    error_details.append({
-                        "row": index + 2,
-                        "data": {
-                            "交易时间": str(row.get("交易时间", "")),
-                            "类型": str(row.get("类型", "")),
-                            "金额": str(row.get("金额", "")),
-                            "收支": str(row.get("收支", "")),
-                            "支付方式": str(row.get("支付方式", "")),
-                            "交易对方": str(row.get("交易对方", "")),
-                            "商品名称": str(row.get("商品名称", "")),
-                            "备注": str(row.get("备注", ""))
-                        },
-                        "reason": error_message
-                    })
-                    continue
-
             db.commit()
-            TransactionImportExportService._refresh_financial_aggregation(db)
+            TransactionImportExportService._refresh_financial_aggregation(
+                db, progress.pop("touched_months")
+            )
 
             return {
                 "success": True,
                 "message": "数据导入成功",
-                "imported_count": imported_count,
-                "skipped_count": skipped_count,
-                "duplicate_count": duplicate_count,
-                "error_details": error_details,
-                "duplicate_details": duplicate_details
+                **progress
             }
 
         except Exception as e:
@@ -389,6 +427,188 @@ class TransactionImportExportService:
                 "duplicate_details": []
             }
 
+    @staticmethod
+    def _import_frame(
+        db: Session,
+        frame: pd.DataFrame,
+        enable_deduplication: bool,
+        progress: Dict[str, Any],
+        dimensions: DimensionInterner
+    ):
+        """
+        校验、去重并写入一个数据块，结果累加到 progress
+        
+        Args:
+            db: 数据库会话
+            frame: 包含标准列的数据块
+            enable_deduplication: 是否启用去重
+            progress: 导入进度统计
+            dimensions: 维度取值驻留缓存
+        """
+        valid_df, error_details = TransactionImportExportService._validate_rows(frame)
+        progress["skipped_count"] += len(error_details)
+        TransactionImportExportService._append_details(progress, "error_details", error_details)
+
+        chunk_size = TransactionImportExportService.IMPORT_CHUNK_SIZE
+        for start in range(0, len(valid_df), chunk_size):
+            chunk = valid_df.iloc[start:start + chunk_size]
+            records = TransactionImportExportService._build_insert_records(chunk)
+
+            duplicate_flags = TransactionImportExportService._mark_duplicates(
+                db, records, enable_deduplication
+            )
+            new_records = [
+                record for record, is_duplicate in zip(records, duplicate_flags) if not is_duplicate
+            ]
+            # 维度取值替换为维度 id，此后 new_records 不再包含取值字段，明细所需的交易对方先行保存
+            counterparties = [record["counterparty"] for record in records]
+            dimensions.assign_ids(new_records)
+            inserted_fingerprints = TransactionImportExportService._insert_transactions(
+                db, new_records
+            )
+
+            duplicate_details: List[Dict[str, Any]] = []
+            for row_number, record, counterparty, is_duplicate in zip(
+                chunk.index + 2, records, counterparties, duplicate_flags
+            ):
+                # 并发导入写入了相同指纹时，冲突的记录被 ON CONFLICT DO NOTHING 跳过，同样按重复记录报告
+                # (关闭去重时重复记录的指纹为空，不会冲突)
+                if not is_duplicate and (
+                    record["fingerprint"] is None or record["fingerprint"] in inserted_fingerprints
+                ):
+                    progress["imported_count"] += 1
+                    transaction_time = record["transaction_time"]
+                    progress["touched_months"].add(
+                        datetime(transaction_time.year, transaction_time.month, 1)
+                    )
+                    continue
+
+                progress["duplicate_count"] += 1
+                duplicate_details.append({
+                    "row": int(row_number),
+                    "transaction_time": str(record["transaction_time"]),
+                    "amount": record["amount"],
+                    "counterparty": counterparty or "",
+                    "item_name": record["item_name"] or "",
+                    "reason": "数据重复：相同时间、金额、交易对方和商品名称的记录已存在"
+                })
+
+            duplicate_details.sort(key=lambda detail: detail["row"])
+            TransactionImportExportService._append_details(
+                progress, "duplicate_details", duplicate_details
+            )
+
+    @staticmethod
+    def _append_details(progress: Dict[str, Any], key: str, details: List[Dict[str, Any]]):
+        """追加错误/重复明细，超过 MAX_DETAIL_ENTRIES 的部分只计数不保留"""
+        remaining = TransactionImportExportService.MAX_DETAIL_ENTRIES - len(progress[key])
+        if len(details) > remaining:
+            progress[f"{key}_truncated"] = True
+        progress[key].extend(details[:max(remaining, 0)])
+
+    @staticmethod
+    def _validate_rows(df: pd.DataFrame) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+        """
+        向量化校验数据行
+        按与逐行校验相同的优先级（必需字段、交易时间、金额）用布尔掩码标记错误，
+        每行只记录第一个错误
+        
+        Args:
+            df: 包含标准列的原始DataFrame
+            
+        Returns:
+            (通过校验并已清理/转换类型的DataFrame, 错误详情列表)
+        """
+        columns = TransactionImportExportService.CSV_COLUMNS
+        raw_text = df[columns].astype(object).where(df[columns].notna(), "").astype(str)
+        stripped = raw_text.apply(lambda column: column.str.strip())
+        empty = stripped.eq("") | stripped.apply(lambda column: column.str.lower().eq("nan"))
+        cleaned = stripped.where(~empty, "")
+
+        reasons = pd.Series(None, index=df.index, dtype=object)
+
+        def mark(mask: pd.Series, reason):
+            target = mask & reasons.isna()
+            if target.any():
+                reasons[target] = reason if isinstance(reason, str) else reason[target]
+
+        for field in ["交易时间", "类型", "金额", "收支"]:
+            mark(empty[field], f"必需字段 '{field}' 为空")
+
+        transaction_time = pd.to_datetime(cleaned["交易时间"], errors="coerce", format="mixed")
+        mark(
+            transaction_time.isna(),
+            "交易时间格式错误: 无法解析 '" + cleaned["交易时间"] + "'"
+        )
+
+        amount = pd.to_numeric(cleaned["金额"], errors="coerce")
+        mark(amount.isna(), "金额格式错误，必须为数字")
+        mark(amount < 0, "金额不能为负数")
+
+        error_details: List[Dict[str, Any]] = []
+        error_mask = reasons.notna()
+        for index in df.index[error_mask]:
+            error_message = reasons[index]
+            print(f"处理第{index+2}行数据失败: {error_message}")
+            error_details.append({
+                "row": int(index) + 2,
+                "data": {column: str(df.at[index, column]) for column in columns},
+                "reason": error_message
+            })
+
+        valid_df = pd.DataFrame({
+            "transaction_time": transaction_time,
+            "category": cleaned["类型"],
+            "amount": amount.astype(float),
+            "income_expense_type": cleaned["收支"],
+            "payment_method": cleaned["支付方式"],
+            "counterparty": cleaned["交易对方"],
+            "item_name": cleaned["商品名称"],
+            "remarks": cleaned["备注"],
+        })[~error_mask]
+
+        return valid_df, error_details
+
+    @staticmethod
+    def _build_insert_records(chunk: pd.DataFrame) -> List[Dict[str, Any]]:
+        """
+        将校验后的数据块转换为 Core insert 参数，空字符串写入为 NULL
+        
+        Args:
+            chunk: _validate_rows 返回的数据块
+            
+        Returns:
+            插入参数列表（包含整数金额列、时间分桶列和 fingerprint；
+            维度字段仍为取值，写入前由 DimensionInterner.assign_ids 替换为维度 id）
+        """
+        optional_columns = ["payment_method", "counterparty", "item_name", "remarks"]
+        transaction_times = [value.to_pydatetime() for value in chunk["transaction_time"].tolist()]
+        amounts = chunk["amount"].tolist()
+        categories = chunk["category"].tolist()
+        income_expense_types = chunk["income_expense_type"].tolist()
+        optional_values = {
+            column: [value if value else None for value in chunk[column].tolist()]
+            for column in optional_columns
+        }
+
+        records = []
+        for position, transaction_time in enumerate(transaction_times):
+            record = {
+                "transaction_time": transaction_time,
+                "category": categories[position],
+                "amount": amounts[position],
+                "income_expense_type": income_expense_types[position],
+            }
+            record.update(derive_amount_columns(record["amount"], record["income_expense_type"]))
+            record.update(derive_time_bucket_columns(transaction_time))
+            for column in optional_columns:
+                record[column] = optional_values[column][position]
+            record["fingerprint"] = compute_transaction_fingerprint(
+                transaction_time, record["amount"], record["counterparty"], record["item_name"]
+            )
+            records.append(record)
+        return records
+
     @staticmethod
     def _validate_csv_format(df: pd.DataFrame) -> Dict[str, Any]:
         """
@@ -421,86 +641,180 @@ class TransactionImportExportService:
         return {"valid": True, "message": "CSV格式正确"}
 
     @staticmethod
-    def _check_duplicate(
+    def _load_existing_keys(
         db: Session,
-        transaction_time: datetime,
-        amount: float,
-        counterparty: str,
-        item_name: str
-    ) -> bool:
+        transaction_times: Iterable[datetime]
+    ) -> Tuple[Set[str], Set[str]]:
         """
-        检查重复交易
-        根据时间、金额、交易对方、商品名称判断是否为重复交易
+        读取与本批次交易时间相同的已有交易的去重键
+        去重键包含交易时间，因此只需按批次内出现过的时间点做索引查找。
+        不使用批次最早到最晚交易时间的范围查询：流式读取的数据块不保证按时间排序，
+        乱序文件每块的时间窗口可能覆盖整张表 (10 万行乱序文件共读取约 95 万行)；
+        指纹为空的历史记录按原始字段重新计算 (交易对方从维度表取得取值)
         
         Args:
             db: 数据库会话
-            transaction_time: 交易时间
-            amount: 金额
-            counterparty: 交易对方（已清理）
-            item_name: 商品名称（已清理）
+            transaction_times: 本批次的交易时间
             
         Returns:
-            是否为重复交易
+            (匹配记录的去重键集合, 已持久化的指纹集合)
         """
-        # 基础查询条件：时间和金额
-        base_query = db.query(TransactionDetail).filter(
-            and_(
-                TransactionDetail.transaction_time == transaction_time,
-                TransactionDetail.amount == amount
+        table = TransactionDetail.__table__
+        counterparties = DIMENSIONS["counterparty"].table
+        distinct_times = sorted(set(transaction_times))
+        lookup_size = TransactionImportExportService.DEDUP_LOOKUP_SIZE
+
+        existing_keys: Set[str] = set()
+        stored_fingerprints: Set[str] = set()
+        for start in range(0, len(distinct_times), lookup_size):
+            rows = db.execute(
+                select(
+                    table.c.transaction_time,
+                    table.c.amount,
+                    counterparties.c.name,
+                    table.c.item_name,
+                    table.c.fingerprint,
+                )
+                .outerjoin_from(table, counterparties, counterparties.c.id == table.c.counterparty_id)
+                .where(table.c.transaction_time.in_(distinct_times[start:start + lookup_size]))
             )
-        )
-        
-        # 构建交易对方的查询条件
-        counterparty_conditions = []
-        
-        if counterparty:
-            # 精确匹配清理后的值
-            counterparty_conditions.append(TransactionDetail.counterparty == counterparty)
-            # 还要匹配可能存在尾随空格的版本
-            counterparty_conditions.append(TransactionDetail.counterparty.like(f"{counterparty}%"))
-        else:
-            counterparty_conditions.append(TransactionDetail.counterparty.is_(None))
-        
-        # 构建商品名称的查询条件
-        item_name_conditions = []
-        
-        if item_name:
-            # 精确匹配清理后的值
-            item_name_conditions.append(TransactionDetail.item_name == item_name)
-            # 还要匹配可能存在尾随空格的版本
-            item_name_conditions.append(TransactionDetail.item_name.like(f"{item_name}%"))
-        else:
-            item_name_conditions.append(TransactionDetail.item_name.is_(None))
-        
-        # 组合查询条件
-        from sqlalchemy import or_
+            for transaction_time, amount, counterparty, item_name, fingerprint in rows:
+                if fingerprint:
+                    stored_fingerprints.add(fingerprint)
+                    existing_keys.add(fingerprint)
+                else:
+                    existing_keys.add(
+                        compute_transaction_fingerprint(transaction_time, amount, counterparty, item_name)
+                    )
+        return existing_keys, stored_fingerprints
+
+    @staticmethod
+    def _mark_duplicates(
+        db: Session,
+        records: List[Dict[str, Any]],
+        enable_deduplication: bool = True
+    ) -> List[bool]:
+        """
+        批量去重
+        一次性读取本批次时间点上已有记录的去重键构建哈希集合，再与本批次做反连接，
+        同时识别文件内部的重复记录
         
-        final_query = base_query.filter(
-            or_(*counterparty_conditions),
-            or_(*item_name_conditions)
+        Args:
+            db: 数据库会话
+            records: 待写入的记录（包含 fingerprint）
+            enable_deduplication: 是否启用去重；关闭时重复记录保留写入，但清空其指纹以免违反唯一索引
+            
+        Returns:
+            与 records 一一对应的重复标记
+        """
+        if not records:
+            return []
+
+        existing_keys, stored_fingerprints = TransactionImportExportService._load_existing_keys(
+            db, [record["transaction_time"] for record in records]
         )
+
+        claimed_fingerprints: Set[str] = set()
+        duplicate_flags = []
+        for record in records:
+            fingerprint = record["fingerprint"]
+            if enable_deduplication:
+                is_duplicate = fingerprint in existing_keys or fingerprint in claimed_fingerprints
+                if not is_duplicate:
+                    claimed_fingerprints.add(fingerprint)
+                duplicate_flags.append(is_duplicate)
+                continue
+
+            if fingerprint in stored_fingerprints or fingerprint in claimed_fingerprints:
+                record["fingerprint"] = None
+            else:
+                claimed_fingerprints.add(fingerprint)
+            duplicate_flags.append(False)
+
+        return duplicate_flags
+
+    @staticmethod
+    def _insert_transactions(db: Session, records: List[Dict[str, Any]]) -> Set[str]:
+        """
+        批量写入交易明细
+        使用 INSERT ... ON CONFLICT DO NOTHING，fingerprint 唯一索引兜底防止并发导入写入重复记录，
+        通过 RETURNING 取得实际写入记录的指纹。
+        参数预先序列化为驱动可直接绑定的值，以多行 VALUES 语句交给驱动执行，
+        省去 SQLAlchemy 逐行处理参数的开销 (驱动的 executemany 会丢弃 RETURNING 的结果)
         
-        result = final_query.first()
-        return result is not None
+        Args:
+            db: 数据库会话
+            records: 已去重的待写入记录
+            
+        Returns:
+            实际写入记录的指纹集合 (不含空指纹)
+        """
+        if not records:
+            return set()
+
+        table = TransactionDetail.__table__
+        # 日期时间按 SQLAlchemy 在 SQLite 中的存储格式 (YYYY-MM-DD HH:MM:SS.ffffff) 序列化；
+        # 驱动层写入不经过 Core 的列默认值，创建、更新时间由此统一填写
+        now = datetime.now().isoformat(sep=" ", timespec="microseconds")
+        value_columns = [column for column in records[0] if column != "transaction_time"]
+        columns = ["transaction_time", *value_columns, "created_at", "updated_at"]
+        get_values = itemgetter(*value_columns)
+        rows = [
+            (
+                record["transaction_time"].isoformat(sep=" ", timespec="microseconds"),
+                *get_values(record),
+                now,
+                now,
+            )
+            for record in records
+        ]
+
+        rows_per_statement = TransactionImportExportService.MAX_INSERT_VARIABLES // len(columns)
+        row_placeholder = f"({', '.join(['?'] * len(columns))})"
+        connection = db.connection()
+        inserted_fingerprints: Set[str] = set()
+        for start in range(0, len(rows), rows_per_statement):
+            batch = rows[start:start + rows_per_statement]
+            statement = (
+                f"INSERT INTO {table.name} ({', '.join(columns)}) "
+                f"VALUES {', '.join([row_placeholder] * len(batch))} "
+                f"ON CONFLICT (fingerprint) DO NOTHING RETURNING fingerprint"
+            )
+            result = connection.exec_driver_sql(statement, tuple(chain.from_iterable(batch)))
+            inserted_fingerprints.update(result.scalars().all())
+        inserted_fingerprints.discard(None)
+        conflict_count = sum(
+            1
+            for record in records
+            if record["fingerprint"] is not None
+            and record["fingerprint"] not in inserted_fingerprints
+        )
+        if conflict_count:
+            print(f"⚠️ {conflict_count} 条记录因指纹冲突未写入")
+        return inserted_fingerprints
 
     @staticmethod
-    def _refresh_financial_aggregation(db: Session):
+    def _refresh_financial_aggregation(db: Session, touched_months: Set[datetime]):
         """
         刷新财务聚合数据
-        清空现有聚合数据并重新生成
+        只重新聚合本次导入涉及的月份及其依赖月份；聚合表为空时执行全量聚合
         
         Args:
             db: 数据库会话
+            touched_months: 本次导入涉及的月份(每月1号)
         """
         try:
+            if not touched_months:
+                print("ℹ️ 本次导入没有新增记录，跳过财务聚合刷新")
+                return
+
             print("🔄 开始刷新财务聚合数据...")
-            
-            # 清空现有聚合数据
-            db.query(FinancialAggregation).delete()
-            db.commit()
-            
-            # 重新聚合所有数据
-            result = AggregationService.aggregate_monthly_data(db)
+
+            has_aggregation = db.query(FinancialAggregation.id).first() is not None
+            if has_aggregation:
+                result = AggregationService.aggregate_months(db, touched_months)
+            else:
+                result = AggregationService.aggregate_monthly_data(db)
             
             print(f"✅ 财务聚合数据刷新完成: {result}")
             
@@ -0,0 +1,53 @@
+"""
+金额工具
+交易明细的金额以元 (浮点数) 存储在 amount 列，同时冗余存储两个整数列：
+- amount_cents: 金额的整数分
+- signed_amount_cents: 带符号的收支流向 (收入为正、支出为负、其他收支类型为 0)
+聚合查询直接对整数列求和，结果精确且不需要按收支类型字符串判断符号。
+"""
+
+from typing import Dict, Optional
+
+# 每元的分数
+CENTS_PER_UNIT = 100
+
+# 收支类型 -> 收支流向符号 (与 app.schemas.IncomeExpenseType 一致)
+INCOME_EXPENSE_SIGNS = {
+    "收入": 1,
+    "支出": -1,
+}
+
+
+def to_cents(amount: float) -> int:
+    """将金额 (元) 转换为整数分"""
+    return int(round(float(amount) * CENTS_PER_UNIT))
+
+
+def from_cents(cents: Optional[int]) -> float:
+    """将整数分转换为金额 (元)"""
+    return (cents or 0) / CENTS_PER_UNIT
+
+
+def signed_amount_cents(amount_cents: int, income_expense_type: Optional[str]) -> int:
+    """按收支类型计算带符号的收支流向：收入为正，支出为负，其他收支类型为 0"""
+    return INCOME_EXPENSE_SIGNS.get(income_expense_type, 0) * abs(amount_cents)
+
+
+def derive_amount_columns(amount: float, income_expense_type: Optional[str]) -> Dict[str, int]:
+    """
+    计算交易明细的整数金额列
+
+    导入时的批量写入、ORM 写入和迁移回填共用，保证冗余列与 amount、income_expense_type 一致。
+
+    Args:
+        amount: 金额 (元)
+        income_expense_type: 收支类型
+
+    Returns:
+        {"amount_cents": 整数分, "signed_amount_cents": 带符号的收支流向}
+    """
+    amount_cents = to_cents(amount)
+    return {
+        "amount_cents": amount_cents,
+        "signed_amount_cents": signed_amount_cents(amount_cents, income_expense_type),
+    }
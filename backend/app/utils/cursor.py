@@ -0,0 +1,50 @@
+"""
+分页游标工具
+用于在键集(keyset)分页中编码和解码不透明游标
+"""
+
+import base64
+import binascii
+import json
+from typing import Any, Dict
+
+
+class InvalidCursorError(ValueError):
+    """游标格式错误或与当前查询不匹配"""
+
+
+def encode_cursor(payload: Dict[str, Any]) -> str:
+    """
+    将游标内容编码为 URL 安全的不透明字符串
+
+    Args:
+        payload: 可 JSON 序列化的游标内容
+
+    Returns:
+        base64url 编码的游标字符串 (去除末尾填充)
+    """
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    解码由 encode_cursor 生成的游标
+
+    Args:
+        cursor: 游标字符串
+
+    Returns:
+        游标内容
+
+    Raises:
+        InvalidCursorError: 游标无法解析
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise InvalidCursorError("无效的分页游标") from e
+    if not isinstance(payload, dict):
+        raise InvalidCursorError("无效的分页游标")
+    return payload
@@ -0,0 +1,72 @@
+"""
+数据版本
+每类数据的版本号存储在数据库的 data_versions 表中，由 data_versions 迁移创建的触发器
+在相关表每次插入、更新或删除行时递增。查询缓存和 ETag 以版本号判断结果是否仍然有效，
+导入脚本、其他 Web 进程等任何写入方都会使版本号变化。
+"""
+
+import secrets
+from typing import Sequence, Tuple
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from app.models.base import DataVersion
+
+# 数据域
+TRANSACTIONS = "transactions"  # 交易明细
+FINANCIAL = "financial"  # 月度财务聚合
+BALANCE_SHEET = "balance_sheet"  # 资产负债表
+
+# 数据表 -> 所属数据域
+DATA_VERSION_TABLES = {
+    "transaction_details": TRANSACTIONS,
+    "financial_aggregation": FINANCIAL,
+    "assets": BALANCE_SHEET,
+    "liabilities": BALANCE_SHEET,
+}
+
+# 触发版本号递增的写操作: 触发器名称后缀 -> 操作
+DATA_VERSION_EVENTS = {"ai": "INSERT", "au": "UPDATE", "ad": "DELETE"}
+
+
+def load_data_versions(db: Session, domains: Sequence[str]) -> Tuple[int, ...]:
+    """读取多个数据域在数据库中的当前版本号"""
+    versions = dict(
+        db.execute(
+            select(DataVersion.domain, DataVersion.version).where(DataVersion.domain.in_(domains))
+        ).all()
+    )
+    return tuple(versions.get(domain, 0) for domain in domains)
+
+
+def data_version_trigger_names():
+    """全部数据版本触发器的名称"""
+    return [
+        f"{table}_data_version_{suffix}"
+        for table in DATA_VERSION_TABLES
+        for suffix in DATA_VERSION_EVENTS
+    ]
+
+
+def create_data_version_triggers(connection):
+    """
+    初始化各数据域的版本号并创建递增版本号的触发器
+
+    版本号从随机值开始，删除并重建数据库后不会与旧数据库的版本号 (及客户端持有的 ETag) 重复
+    """
+    for domain in sorted(set(DATA_VERSION_TABLES.values())):
+        connection.execute(
+            text("INSERT OR IGNORE INTO data_versions (domain, version) VALUES (:domain, :version)"),
+            {"domain": domain, "version": secrets.randbits(48)},
+        )
+    for table, domain in DATA_VERSION_TABLES.items():
+        for suffix, operation in DATA_VERSION_EVENTS.items():
+            connection.execute(
+                text(
+                    f"CREATE TRIGGER IF NOT EXISTS {table}_data_version_{suffix} "
+                    f"AFTER {operation} ON {table} BEGIN "
+                    f"UPDATE data_versions SET version = version + 1 WHERE domain = '{domain}'; "
+                    f"END"
+                )
+            )
@@ -0,0 +1,48 @@
+"""
+轻量 JSON 响应工具
+只读接口直接把 Core 查询返回的行序列化为 JSON，跳过 ORM 实例构造和 pydantic 逐字段校验
+"""
+
+import json
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Sequence
+
+from fastapi.responses import Response
+
+try:  # orjson 为可选依赖，安装后序列化速度更快
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """序列化为 JSON 字节串，日期时间格式与 pydantic 输出一致 (ISO 8601)"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(
+        content, ensure_ascii=False, separators=(",", ":"), default=_json_default
+    ).encode("utf-8")
+
+
+def rows_to_dicts(rows: Iterable[Sequence], fields: Sequence[str]) -> List[Dict[str, Any]]:
+    """
+    将查询结果行按字段名转换为字典
+
+    行中多于 fields 的尾部列 (如游标分页附加的排序值) 会被忽略。
+    """
+    return [dict(zip(fields, row)) for row in rows]
+
+
+class FastJSONResponse(Response):
+    """直接序列化内容的 JSON 响应，不经过 jsonable_encoder 和响应模型校验"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
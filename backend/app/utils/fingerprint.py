@@ -0,0 +1,38 @@
+"""
+交易指纹工具
+用于生成交易明细的去重指纹
+"""
+
+import hashlib
+from datetime import datetime
+from typing import Optional
+
+
+def compute_transaction_fingerprint(
+    transaction_time: datetime,
+    amount: float,
+    counterparty: Optional[str],
+    item_name: Optional[str],
+) -> str:
+    """
+    计算交易明细的去重指纹
+
+    指纹由交易时间、金额(保留两位小数)、去除首尾空白的交易对方和商品名称组成，
+    空值与空字符串视为相同。
+
+    Args:
+        transaction_time: 交易时间
+        amount: 金额
+        counterparty: 交易对方
+        item_name: 商品名称
+
+    Returns:
+        SHA-256 十六进制指纹
+    """
+    parts = (
+        transaction_time.isoformat(sep=" ", timespec="microseconds"),
+        f"{float(amount):.2f}",
+        (counterparty or "").strip(),
+        (item_name or "").strip(),
+    )
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
@@ -0,0 +1,170 @@
+"""
+查询结果缓存
+进程内 LRU 缓存，按已序列化的响应体字节数限制容量，并支持过期时间。
+缓存键包含规范化后的查询参数和相关数据域的版本号，数据写入后版本号变化，旧结果不会再被命中。
+版本号存储在数据库中 (app/utils/data_version.py)，任何进程写入数据后都会变化。
+同一缓存键同时用于生成 ETag，客户端携带匹配的 If-None-Match 时直接返回 304。
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+from sqlalchemy.orm import Session
+
+from app.utils.data_version import load_data_versions
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 300
+
+# 缓存条目: (响应体, 响应头, 过期时间)
+CacheEntry = Tuple[bytes, Dict[str, str], float]
+
+
+class QueryCache:
+    """按字节数限制容量的 LRU 缓存"""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[bytes, Dict[str, str]]]:
+        """读取缓存，过期条目视为未命中并移除"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            body, headers, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body, headers
+
+    def set(self, key: str, body: bytes, headers: Optional[Dict[str, str]] = None):
+        """写入缓存，超过容量时淘汰最久未使用的条目；单条超过总容量时不缓存"""
+        if self.max_bytes <= 0 or len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (body, headers or {}, time.monotonic() + self.ttl_seconds)
+            self.current_bytes += len(body)
+            while self.current_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _remove(self, key: str):
+        body, _, _ = self._entries.pop(key)
+        self.current_bytes -= len(body)
+
+
+query_cache = QueryCache(
+    max_bytes=int(os.getenv("QUERY_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)),
+    ttl_seconds=float(os.getenv("QUERY_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)),
+)
+
+
+def make_cache_key(namespace: str, params: Any, versions: Tuple[int, ...]) -> str:
+    """
+    生成缓存键：命名空间 + 相关数据域版本号 + 规范化的查询参数
+
+    值为 None 的参数会被忽略，参数按名称排序，因此省略参数和显式传 None 命中同一条缓存。
+    """
+    if isinstance(params, dict):
+        params = {name: value for name, value in params.items() if value is not None}
+    normalized = json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+    return f"{namespace}|{versions}|{normalized}"
+
+
+def make_etag(key: str) -> str:
+    """
+    由缓存键生成 ETag
+
+    生成的是强 ETag，经 CompressionMiddleware 压缩的响应会降级为弱 ETag (W/"...")，
+    etag_matches 按弱比较处理两种形式。
+    """
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """判断请求的 If-None-Match 是否与 ETag 匹配 (按弱比较，忽略 W/ 前缀)"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or any(
+        candidate.removeprefix("W/") == etag for candidate in candidates
+    )
+
+
+def cached_response(
+    request: Request,
+    db: Session,
+    namespace: str,
+    params: Any,
+    domains: Sequence[str],
+    compute: Callable[[], Response],
+) -> Response:
+    """
+    返回带 ETag 的缓存响应
+
+    先从数据库读取相关数据域的版本号，If-None-Match 与当前 ETag 匹配时直接返回 304，
+    不执行业务查询；否则返回缓存的响应体，未命中时调用 compute 生成响应并缓存。
+    只缓存状态码为 200 的响应体及自定义响应头。
+    """
+    key = make_cache_key(namespace, params, load_data_versions(db, domains))
+    etag = make_etag(key)
+    cache_headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=cache_headers)
+
+    cached = query_cache.get(key)
+    if cached is not None:
+        body, headers = cached
+        return Response(
+            content=body,
+            media_type="application/json",
+            headers={**headers, **cache_headers},
+        )
+
+    response = compute()
+    if response.status_code == 200:
+        headers = {
+            name: value
+            for name, value in response.headers.items()
+            if name not in ("content-length", "content-type")
+        }
+        query_cache.set(key, response.body, headers)
+        response.headers.update(cache_headers)
+    return response
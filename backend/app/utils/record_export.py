@@ -0,0 +1,191 @@
+"""
+记录导出格式
+将数据库游标逐批读取的记录编码为 CSV、Parquet、Arrow IPC 文件或 XLSX，
+Parquet 和 Arrow 保留日期时间、浮点数等列类型，便于 pandas / DuckDB 直接读取。
+"""
+
+import csv
+import io
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Iterable, Iterator, Optional, Sequence
+
+from sqlalchemy import Column
+
+from app.utils.record_stream import (
+    StreamFormatUnavailableError,
+    arrow_schema,
+    ensure_arrow_available,
+    iter_record_batches,
+)
+
+# Parquet 每个 row group 的行数，也是写入时在内存中缓冲的最大行数
+PARQUET_ROW_GROUP_SIZE = 65536
+
+# XLSX 文件读出时每块的字节数
+XLSX_READ_CHUNK_SIZE = 64 * 1024
+
+# 导出函数签名: (记录, 列定义, 表头, 每批行数) -> 文件内容片段
+ExportWriter = Callable[[Iterable[Sequence], Sequence[Column], Sequence[str], int], Iterator[bytes]]
+
+
+def _drain(sink: io.BytesIO) -> bytes:
+    data = sink.getvalue()
+    sink.seek(0)
+    sink.truncate(0)
+    return data
+
+
+def iter_csv(
+    rows: Iterable[Sequence], columns: Sequence[Column], names: Sequence[str], batch_size: int
+) -> Iterator[bytes]:
+    """编码为 UTF-8 CSV，日期时间格式为 YYYY-MM-DD HH:MM:SS"""
+    buffer = io.StringIO()
+    # 与原先 DataFrame.to_csv 的输出格式保持一致
+    writer = csv.writer(buffer, lineterminator="\n")
+
+    def drain() -> bytes:
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk.encode("utf-8")
+
+    writer.writerow(names)
+    yield drain()
+
+    pending = 0
+    for row in rows:
+        writer.writerow(
+            [
+                value.strftime("%Y-%m-%d %H:%M:%S") if isinstance(value, datetime) else value
+                for value in row
+            ]
+        )
+        pending += 1
+        if pending >= batch_size:
+            yield drain()
+            pending = 0
+    if pending:
+        yield drain()
+
+
+def iter_parquet(
+    rows: Iterable[Sequence], columns: Sequence[Column], names: Sequence[str], batch_size: int
+) -> Iterator[bytes]:
+    """编码为 Parquet，每 PARQUET_ROW_GROUP_SIZE 行写出一个 row group"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = arrow_schema(columns, names)
+    sink = io.BytesIO()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    yield _drain(sink)
+
+    batches = []
+    buffered_rows = 0
+    for batch in iter_record_batches(rows, schema, batch_size):
+        batches.append(batch)
+        buffered_rows += batch.num_rows
+        if buffered_rows >= PARQUET_ROW_GROUP_SIZE:
+            writer.write_table(pa.Table.from_batches(batches), row_group_size=buffered_rows)
+            batches = []
+            buffered_rows = 0
+            yield _drain(sink)
+    if batches:
+        writer.write_table(pa.Table.from_batches(batches), row_group_size=buffered_rows)
+    writer.close()
+    yield _drain(sink)
+
+
+def iter_arrow_file(
+    rows: Iterable[Sequence], columns: Sequence[Column], names: Sequence[str], batch_size: int
+) -> Iterator[bytes]:
+    """编码为 Arrow IPC 文件 (Feather V2)，每 batch_size 行一个 zstd 压缩的 record batch"""
+    import pyarrow as pa
+
+    schema = arrow_schema(columns, names)
+    sink = io.BytesIO()
+    writer = pa.ipc.new_file(sink, schema, options=pa.ipc.IpcWriteOptions(compression="zstd"))
+    for batch in iter_record_batches(rows, schema, batch_size):
+        writer.write_batch(batch)
+        yield _drain(sink)
+    writer.close()
+    yield _drain(sink)
+
+
+def iter_xlsx(
+    rows: Iterable[Sequence], columns: Sequence[Column], names: Sequence[str], batch_size: int
+) -> Iterator[bytes]:
+    """
+    编码为 XLSX
+
+    使用 openpyxl 只写模式，行数据直接写入临时文件而不在内存中保留单元格对象；
+    XLSX 是 zip 容器，全部行写完后才能生成文件，因此内容在最后分块输出。
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("交易明细")
+    sheet.append(names)
+    # 日期时间单元格由 openpyxl 自动设置日期格式，金额保持数值类型
+    for row in rows:
+        sheet.append(tuple(row))
+
+    with tempfile.TemporaryFile() as output:
+        workbook.save(output)
+        output.seek(0)
+        while chunk := output.read(XLSX_READ_CHUNK_SIZE):
+            yield chunk
+
+
+def ensure_xlsx_available():
+    """
+    检查 openpyxl 是否可用
+
+    Raises:
+        StreamFormatUnavailableError: 未安装 openpyxl
+    """
+    try:
+        import openpyxl  # noqa: F401
+    except ImportError as e:
+        raise StreamFormatUnavailableError("XLSX 导出需要安装 openpyxl") from e
+
+
+@dataclass(frozen=True)
+class ExportFormat:
+    """导出格式：媒体类型、文件扩展名、编码函数及依赖检查"""
+
+    media_type: str
+    extension: str
+    writer: ExportWriter
+    ensure_available: Optional[Callable[[], None]] = None
+
+
+EXPORT_FORMATS = {
+    "csv": ExportFormat("text/csv", "csv", iter_csv),
+    "xlsx": ExportFormat(
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        "xlsx",
+        iter_xlsx,
+        ensure_xlsx_available,
+    ),
+    "parquet": ExportFormat("application/vnd.apache.parquet", "parquet", iter_parquet, ensure_arrow_available),
+    "arrow": ExportFormat("application/vnd.apache.arrow.file", "arrow", iter_arrow_file, ensure_arrow_available),
+}
+
+
+def get_export_format(name: str) -> ExportFormat:
+    """
+    获取导出格式并检查依赖
+
+    Raises:
+        ValueError: 不支持的格式
+        StreamFormatUnavailableError: 格式依赖的库未安装
+    """
+    export_format = EXPORT_FORMATS.get(name)
+    if export_format is None:
+        raise ValueError(f"不支持的导出格式: {name}")
+    if export_format.ensure_available:
+        export_format.ensure_available()
+    return export_format
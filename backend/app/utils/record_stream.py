@@ -0,0 +1,170 @@
+"""
+记录流式序列化工具
+将数据库游标逐批读取的记录编码为 NDJSON 或 Arrow IPC 流，用于大结果集的流式响应
+"""
+
+import io
+import json
+from datetime import date, datetime
+from typing import Iterable, Iterator, Optional, Sequence
+
+from sqlalchemy import Column, DateTime, Float, Integer
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+STREAM_MEDIA_TYPES = {
+    "ndjson": NDJSON_MEDIA_TYPE,
+    "arrow": ARROW_STREAM_MEDIA_TYPE,
+}
+
+
+class StreamFormatUnavailableError(Exception):
+    """请求的流式格式在当前环境中不可用 (如未安装 pyarrow)"""
+
+
+def negotiate_stream_format(
+    format: Optional[str], accept: Optional[str]
+) -> Optional[str]:
+    """
+    根据 format 参数或 Accept 请求头确定流式输出格式
+
+    format 参数优先；未指定时按 Accept 中出现的媒体类型选择。
+
+    Returns:
+        "ndjson"、"arrow"，或 None 表示使用普通 JSON 响应
+    """
+    if format:
+        return format if format in STREAM_MEDIA_TYPES else None
+    if accept:
+        media_types = [part.split(";")[0].strip().lower() for part in accept.split(",")]
+        for stream_format, media_type in STREAM_MEDIA_TYPES.items():
+            if media_type in media_types:
+                return stream_format
+    return None
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def iter_ndjson(
+    rows: Iterable[Sequence], columns: Sequence[Column], batch_size: int = 1000
+) -> Iterator[bytes]:
+    """
+    将记录编码为 NDJSON，每行一个 JSON 对象
+
+    Args:
+        rows: 记录元组，顺序与 columns 一致
+        columns: 列定义，用于生成字段名
+        batch_size: 每次输出的行数
+
+    Yields:
+        bytes: 若干行 NDJSON
+    """
+    names = [column.name for column in columns]
+    lines = []
+    for row in rows:
+        lines.append(
+            json.dumps(dict(zip(names, row)), ensure_ascii=False, default=_json_default)
+        )
+        if len(lines) >= batch_size:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def ensure_arrow_available():
+    """
+    检查 pyarrow 是否可用
+
+    Raises:
+        StreamFormatUnavailableError: 未安装 pyarrow
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as e:
+        raise StreamFormatUnavailableError("Arrow 输出需要安装 pyarrow (pip install -r requirements.txt)") from e
+
+
+def _arrow_type(pa, column: Column):
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us")
+    return pa.string()
+
+
+def arrow_schema(columns: Sequence[Column], names: Optional[Sequence[str]] = None):
+    """
+    根据列定义生成 Arrow schema
+
+    Args:
+        columns: 列定义，用于确定字段类型
+        names: 字段名，未指定时使用列名
+    """
+    import pyarrow as pa
+
+    names = names or [column.name for column in columns]
+    return pa.schema(
+        [pa.field(name, _arrow_type(pa, column)) for name, column in zip(names, columns)]
+    )
+
+
+def iter_record_batches(rows: Iterable[Sequence], schema, batch_size: int = 1000) -> Iterator:
+    """将记录按 batch_size 行分组，逐个转换为 Arrow RecordBatch"""
+    import pyarrow as pa
+
+    def to_batch(buffer):
+        arrays = [
+            pa.array([row[index] for row in buffer], type=field.type)
+            for index, field in enumerate(schema)
+        ]
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    buffer = []
+    for row in rows:
+        buffer.append(row)
+        if len(buffer) >= batch_size:
+            yield to_batch(buffer)
+            buffer = []
+    if buffer:
+        yield to_batch(buffer)
+
+
+def iter_arrow_ipc(
+    rows: Iterable[Sequence], columns: Sequence[Column], batch_size: int = 1000
+) -> Iterator[bytes]:
+    """
+    将记录编码为 Arrow IPC 流，每 batch_size 行一个 record batch
+
+    Args:
+        rows: 记录元组，顺序与 columns 一致
+        columns: 列定义，用于生成 Arrow schema
+        batch_size: 每个 record batch 的行数
+
+    Yields:
+        bytes: IPC 流片段 (schema、record batch 及结束标记)
+    """
+    import pyarrow as pa
+
+    schema = arrow_schema(columns)
+    sink = io.BytesIO()
+
+    def drain() -> bytes:
+        data = sink.getvalue()
+        sink.seek(0)
+        sink.truncate(0)
+        return data
+
+    writer = pa.ipc.new_stream(sink, schema)
+    for batch in iter_record_batches(rows, schema, batch_size):
+        writer.write_batch(batch)
+        yield drain()
+    writer.close()
+    yield drain()
@@ -0,0 +1,34 @@
+"""
+交易时间分桶工具
+交易明细冗余存储按交易时间派生的分桶列，按月分组和筛选时直接使用带索引的列，
+不必对每一行计算 strftime：
+- year_month: 年月整数 (YYYYMM，如 202401)
+"""
+
+from datetime import date, datetime
+from typing import Dict, Union
+
+
+def to_year_month(value: Union[date, datetime]) -> int:
+    """返回日期所在年月的整数表示 YYYYMM"""
+    return value.year * 100 + value.month
+
+
+def year_month_start(year_month: int) -> datetime:
+    """由 YYYYMM 整数返回当月1号"""
+    return datetime(year_month // 100, year_month % 100, 1)
+
+
+def derive_time_bucket_columns(transaction_time: datetime) -> Dict[str, int]:
+    """
+    计算交易明细的时间分桶列
+
+    导入时的批量写入、ORM 写入和迁移回填共用，保证分桶列与 transaction_time 一致。
+
+    Args:
+        transaction_time: 交易时间
+
+    Returns:
+        {"year_month": YYYYMM}
+    """
+    return {"year_month": to_year_month(transaction_time)}
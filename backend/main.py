@@ -1,15 +1,18 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from app.api.routes import router
-from app.database.connection import create_tables
 import os
 from pathlib import Path
 from dotenv import load_dotenv
 
 # Load environment variables from the project root .env file
+# 必须在导入 app 之前加载：数据库连接、连接池和查询缓存的配置在模块导入时读取
 project_root = Path(__file__).resolve().parent.parent
 load_dotenv(project_root / ".env", override=False)
 
+from fastapi import FastAPI  # noqa: E402
+from fastapi.middleware.cors import CORSMiddleware  # noqa: E402
+from app.api.routes import router  # noqa: E402
+from app.database.connection import create_tables  # noqa: E402
+from app.middleware.compression import CompressionMiddleware  # noqa: E402
+
 # 创建FastAPI应用实例
 app = FastAPI(
     title="财务可视化管理工具 API",
@@ -26,6 +29,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "ETag"],
+)
+
+# 配置响应压缩中间件 (小于阈值的响应不压缩，流式响应按块压缩)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.getenv("COMPRESSION_MINIMUM_SIZE", 1024)),
+    gzip_level=int(os.getenv("COMPRESSION_GZIP_LEVEL", 6)),
+    brotli_quality=int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4)),
 )
 
 # 创建数据库表
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+响应压缩基准测试
+对比 identity / gzip / br 三种编码下交易明细查询接口的传输字节数和响应耗时
+
+用法: python scripts/benchmark_compression.py [--rows 10000 100000] [--bandwidth-mbps 20]
+测试在临时 SQLite 数据库中进行，不会影响项目数据；未安装 brotli 时跳过 br
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ENCODINGS = ["identity", "gzip", "br"]
+
+
+def seed(session, rows: int):
+    """生成测试交易数据"""
+    from sqlalchemy import insert
+
+    from app.database.dimensions import DimensionInterner
+    from app.models.base import TransactionDetail
+
+    categories = ["住房", "餐饮", "生活", "娱乐", "交通", "旅行", "礼物", "工资"]
+    methods = ["支付宝", "微信支付", "银行卡", None]
+    start = datetime(2015, 1, 1)
+    now = datetime.now()
+    random.seed(42)
+    records = [
+        {
+            "transaction_time": start + timedelta(minutes=37 * index),
+            "category": random.choice(categories),
+            "amount": round(random.uniform(-5000, 5000), 2),
+            "income_expense_type": random.choice(["收入", "支出"]),
+            "payment_method": random.choice(methods),
+            "counterparty": f"商户{random.randint(1, 3000)}",
+            "item_name": f"商品{random.randint(1, 500)}",
+            "remarks": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for index in range(rows)
+    ]
+    DimensionInterner(session).assign_ids(records)
+    session.execute(insert(TransactionDetail), records)
+    session.commit()
+
+
+def measure(client, rows: int, response_format: str, encoding: str, repeat: int):
+    """返回 (传输字节数, 最快一次耗时秒数)"""
+    best = float("inf")
+    wire_bytes = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.post(
+            "/api/v1/transactions/search",
+            params={"format": response_format},
+            json={"limit": rows, "include_total": False},
+            headers={"Accept-Encoding": encoding},
+        )
+        response.read()
+        best = min(best, time.perf_counter() - started)
+        wire_bytes = response.num_bytes_downloaded
+    return wire_bytes, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="响应压缩基准测试")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000], help="返回的记录数")
+    parser.add_argument("--repeat", type=int, default=3, help="每种编码的重复次数，取最快一次")
+    parser.add_argument("--bandwidth-mbps", type=float, default=20.0, help="估算传输耗时使用的带宽 (Mbit/s)")
+    args = parser.parse_args()
+
+    print("⏱️ 响应压缩基准测试")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # 必须在导入应用前设置，关闭查询缓存以便每次都计入查询和压缩耗时
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(temp_dir, 'benchmark.db')}"
+        os.environ["QUERY_CACHE_MAX_BYTES"] = "0"
+
+        from fastapi.testclient import TestClient
+
+        from app.database.connection import SessionLocal, engine
+        from app.middleware import compression
+        from main import app
+
+        encodings = [e for e in ENCODINGS if e != "br" or compression.brotli is not None]
+        if "br" not in encodings:
+            print("⚠️ 未安装 brotli，跳过 br 编码")
+
+        session = SessionLocal()
+        try:
+            print(f"🔧 生成 {max(args.rows)} 条测试数据...")
+            seed(session, max(args.rows))
+        finally:
+            session.close()
+
+        bytes_per_second = args.bandwidth_mbps * 1e6 / 8
+        with TestClient(app) as client:
+            for rows in args.rows:
+                for response_format in ("json", "ndjson"):
+                    print(f"\n📊 {rows} 条记录, format={response_format} (带宽 {args.bandwidth_mbps:g} Mbit/s):")
+                    print(f"   {'编码':<8} {'传输大小':>10} {'压缩比':>7} {'服务端耗时':>10} {'估算总耗时':>10}")
+                    baseline = None
+                    for encoding in encodings:
+                        wire_bytes, seconds = measure(client, rows, response_format, encoding, args.repeat)
+                        baseline = baseline or wire_bytes
+                        total = seconds + wire_bytes / bytes_per_second
+                        print(
+                            f"   {encoding:<10} {wire_bytes / 1e6:9.2f}MB {baseline / wire_bytes:7.1f}x"
+                            f" {seconds * 1000:11.1f}ms {total * 1000:13.1f}ms"
+                        )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+只读查询路径基准测试
+对比 ORM 实例 + pydantic 校验 与 Core 查询行直接序列化两种方式返回交易明细 JSON 的吞吐量
+
+用法: python scripts/benchmark_read_path.py [--rows 100000] [--repeat 3]
+测试在临时 SQLite 数据库中进行，不会影响项目数据
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app import schemas
+from app.database.dimensions import DimensionInterner
+from app.models.base import Base, TransactionDetail
+from app.services.analyze.transaction_service import TransactionService
+from app.utils.fast_json import dumps, rows_to_dicts
+
+
+def seed(session, rows: int):
+    """生成测试交易数据"""
+    categories = ["住房", "餐饮", "生活", "娱乐", "交通", "旅行", "礼物", "工资"]
+    methods = ["支付宝", "微信支付", "银行卡", None]
+    start = datetime(2015, 1, 1)
+    now = datetime.now()
+    random.seed(42)
+    records = [
+        {
+            "transaction_time": start + timedelta(minutes=37 * index),
+            "category": random.choice(categories),
+            "amount": round(random.uniform(-5000, 5000), 2),
+            "income_expense_type": random.choice(["收入", "支出"]),
+            "payment_method": random.choice(methods),
+            "counterparty": f"商户{random.randint(1, 3000)}",
+            "item_name": f"商品{random.randint(1, 500)}",
+            "remarks": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for index in range(rows)
+    ]
+    DimensionInterner(session).assign_ids(records)
+    session.execute(insert(TransactionDetail), records)
+    session.commit()
+
+
+def orm_path(session, limit: int) -> bytes:
+    """原有路径：ORM 实例 -> pydantic 校验 -> JSON"""
+    records = (
+        session.query(TransactionDetail)
+        .order_by(TransactionDetail.transaction_time.desc(), TransactionDetail.id.desc())
+        .limit(limit)
+        .all()
+    )
+    payload = [schemas.TransactionDetail.model_validate(record) for record in records]
+    body = json.dumps(jsonable_encoder(payload), ensure_ascii=False).encode("utf-8")
+    session.expunge_all()
+    return body
+
+
+def core_path(session, limit: int) -> bytes:
+    """只读路径：Core 查询行 -> 字典 -> JSON"""
+    result = TransactionService.get_records(session, limit=limit, include_total=False)
+    return dumps(rows_to_dicts(result["records"], TransactionService.RECORD_FIELDS))
+
+
+def measure(name: str, func, session, rows: int, repeat: int) -> float:
+    best = float("inf")
+    size = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        size = len(func(session, rows))
+        best = min(best, time.perf_counter() - started)
+    print(f"   {name:<6} {best * 1000:9.1f} ms  {rows / best:12,.0f} 行/秒  {size / 1e6:6.1f} MB")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="只读查询路径基准测试")
+    parser.add_argument("--rows", type=int, default=100000, help="返回的记录数")
+    parser.add_argument("--repeat", type=int, default=3, help="每种方式的重复次数，取最快一次")
+    args = parser.parse_args()
+
+    print("⏱️ 只读查询路径基准测试")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        engine = create_engine(f"sqlite:///{os.path.join(temp_dir, 'benchmark.db')}")
+        Base.metadata.create_all(bind=engine)
+        session = sessionmaker(bind=engine)()
+        try:
+            print(f"🔧 生成 {args.rows} 条测试数据...")
+            seed(session, args.rows)
+
+            print(f"\n📊 返回 {args.rows} 条记录 (取 {args.repeat} 次中最快一次):")
+            orm_seconds = measure("ORM", orm_path, session, args.rows, args.repeat)
+            core_seconds = measure("Core", core_path, session, args.rows, args.repeat)
+            print(f"\n🚀 Core 路径吞吐量为 ORM 路径的 {orm_seconds / core_seconds:.1f} 倍")
+        finally:
+            session.close()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
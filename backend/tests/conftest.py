@@ -0,0 +1,102 @@
+"""
+后端测试公共配置
+测试使用独立的临时 SQLite 数据库，必须在导入 app 之前设置 DATABASE_URL
+"""
+
+import os
+import tempfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+temp_dir = tempfile.mkdtemp(prefix="financehub_tests_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(temp_dir, 'test.db')}"
+
+from app.database.connection import SessionLocal, create_tables, engine  # noqa: E402
+from app.models.base import Base, DataVersion  # noqa: E402
+from app.services.transaction_import_export_service import (  # noqa: E402
+    TransactionImportExportService,
+)
+
+create_tables()
+
+CSV_HEADER = ",".join(TransactionImportExportService.CSV_COLUMNS)
+
+# 两条示例交易明细：3月1日地铁车票、3月5日餐厅晚餐
+SAMPLE_ROWS = (
+    "2024-03-01 08:00:00,交通,3,支出,支付宝,地铁,车票,",
+    "2024-03-05 18:00:00,餐饮,40.5,支出,微信支付,餐厅,晚餐,聚餐",
+)
+
+
+def _clear_tables():
+    """清空数据表，数据版本表保留 (由触发器递增)"""
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            if table.name != DataVersion.__tablename__:
+                connection.execute(table.delete())
+
+
+@pytest.fixture(scope="session")
+def clear_tables():
+    """清空数据表的函数，供需要自行管理测试数据的模块级 fixture 使用"""
+    return _clear_tables
+
+
+@pytest.fixture
+def db():
+    """数据库会话，测试结束后清空数据表"""
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        _clear_tables()
+        session.close()
+
+
+@pytest.fixture
+def client(db):
+    """API 测试客户端，与 db 共用测试数据库"""
+    from main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def import_csv(db):
+    """
+    以 CSV 导入交易明细的函数：import_csv(rows, **options)
+
+    rows 为不含表头的 CSV 数据行，options 透传给 import_from_csv，返回导入结果
+    """
+
+    def run(rows, **options):
+        return TransactionImportExportService.import_from_csv(
+            db, csv_content="\n".join([CSV_HEADER, *rows]), **options
+        )
+
+    return run
+
+
+@pytest.fixture
+def sample_transactions(import_csv):
+    """导入两条示例交易明细 (SAMPLE_ROWS)"""
+    return import_csv(SAMPLE_ROWS)
+
+
+@pytest.fixture
+def import_minute_rows(import_csv):
+    """
+    导入逐分钟交易明细的函数：import_minute_rows(count)
+
+    写入 3月1日 08:00 起每分钟一条的地铁车票 (count 不超过 60)，供需要较大响应体的测试使用
+    """
+
+    def run(count: int):
+        return import_csv(
+            [f"2024-03-01 08:{minute:02d}:00,交通,3,支出,支付宝,地铁,车票," for minute in range(count)]
+        )
+
+    return run
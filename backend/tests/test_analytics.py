@@ -0,0 +1,48 @@
+from datetime import datetime
+
+from app.models.base import FinancialAggregation
+from app.services.analyze.analytics_service import AnalyticsService
+
+
+def add_months(db):
+    months = [
+        (datetime(2024, 1, 1), {"dining": -300.0, "housing": -2000.0, "salary": 10000.0, "balance": 7700.0}),
+        (datetime(2024, 2, 1), {"dining": -500.0, "housing": -2000.0, "salary": 10000.0, "balance": 7500.0}),
+        (datetime(2024, 3, 1), {"dining": -400.0, "transactions": -100.0, "salary": 12000.0, "balance": 11500.0}),
+    ]
+    db.add_all(FinancialAggregation(month_date=month_date, **values) for month_date, values in months)
+    db.commit()
+
+
+def test_category_breakdown_and_monthly_series(db):
+    add_months(db)
+
+    breakdown = AnalyticsService.get_category_breakdown(db, start_date="2024-02-01")
+    assert breakdown == {
+        "categories": [
+            {"key": "housing", "value": 2000.0},
+            {"key": "dining", "value": 900.0},
+            {"key": "transactions", "value": 100.0},
+        ],
+        "total": 3000.0,
+    }
+
+    monthly = AnalyticsService.get_monthly_expenses(db, end_date="2024-02-01")
+    assert monthly["months"] == ["2024-01", "2024-02"]
+    assert monthly["series"]["dining"] == [-300.0, -500.0]
+
+    income_expense = AnalyticsService.get_income_expense(db)
+    assert income_expense["expense"] == [2300.0, 2500.0, 400.0]
+    assert income_expense["balance"] == [7700.0, 7500.0, 11500.0]
+
+
+def test_overview(db):
+    add_months(db)
+
+    overview = AnalyticsService.get_overview(db)
+    assert overview["month_count"] == 3
+    assert overview["total_income"] == 32000.0
+    assert overview["total_expense"] == 5200.0
+    assert overview["avg_monthly_expense"] == round(5200.0 / 3, 2)
+    # 去掉最后一个月后平均支出为 2400
+    assert overview["avg_expense_change"] == round((5200.0 / 3 - 2400.0) / 2400.0 * 100, 1)
@@ -0,0 +1,30 @@
+import gzip
+import json
+
+import brotli
+
+
+def test_prefers_brotli(client, import_minute_rows):
+    import_minute_rows(60)
+
+    with client.stream(
+        "POST",
+        "/api/v1/transactions/search",
+        json={"limit": 60},
+        headers={"Accept-Encoding": "gzip, br"},
+    ) as response:
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "br"
+        raw = b"".join(response.iter_raw())
+    assert len(json.loads(brotli.decompress(raw))["records"]) == 60
+
+
+def test_csv_export_streams_gzip(client, import_minute_rows):
+    import_minute_rows(60)
+
+    with client.stream(
+        "GET", "/api/v1/transactions/export", headers={"Accept-Encoding": "gzip"}
+    ) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        raw = b"".join(response.iter_raw())
+    assert gzip.decompress(raw).decode("utf-8").count("\n") == 61
@@ -0,0 +1,58 @@
+import sqlite3
+
+from app.database.connection import engine
+
+ROWS = ["2024-03-01 08:00:00,交通,3,支出,支付宝,地铁,车票,"]
+
+
+def write_from_other_process(statement: str):
+    """不经过应用的连接池直接写入数据库，模拟导入脚本或其他 Web 进程"""
+    connection = sqlite3.connect(engine.url.database)
+    try:
+        connection.execute(statement)
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def test_etag_changes_after_external_write(client, import_csv):
+    import_csv(ROWS)
+
+    first = client.post("/api/v1/transactions/summary", json={})
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    unchanged = client.post("/api/v1/transactions/summary", json={}, headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+
+    write_from_other_process("UPDATE transaction_details SET remarks = '脚本修改'")
+    changed = client.post("/api/v1/transactions/summary", json={}, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+def test_compressed_response_uses_weak_etag(client, import_minute_rows):
+    import_minute_rows(60)
+
+    response = client.post(
+        "/api/v1/transactions/search", json={"limit": 60}, headers={"Accept-Encoding": "gzip"}
+    )
+    assert response.headers["content-encoding"] == "gzip"
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+
+    unchanged = client.post(
+        "/api/v1/transactions/search",
+        json={"limit": 60},
+        headers={"Accept-Encoding": "gzip", "If-None-Match": etag},
+    )
+    assert unchanged.status_code == 304
+    assert unchanged.headers["etag"] == etag
+
+
+def test_cached_result_refreshes_after_external_write(client, import_csv):
+    import_csv(ROWS)
+    assert client.post("/api/v1/transactions/summary", json={}).json()["count"] == 1
+
+    write_from_other_process("DELETE FROM transaction_details")
+    assert client.post("/api/v1/transactions/summary", json={}).json()["count"] == 0
@@ -0,0 +1,9 @@
+from app.services.transaction_import_export_service import TransactionImportExportService
+
+
+def test_get_csv_template(client):
+    response = client.get("/api/v1/transactions/template")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert "transaction_template.csv" in response.headers["content-disposition"]
+    assert response.text == TransactionImportExportService.get_csv_template()
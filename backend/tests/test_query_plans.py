@@ -0,0 +1,247 @@
+"""
+热点查询执行计划检查
+在测试数据库中生成测试数据，调用各服务的热点查询，对实际执行的 SQL 运行 EXPLAIN QUERY PLAN，
+断言使用了预期的索引，防止修改查询或索引后退化为全表扫描
+"""
+
+import random
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, List, Tuple
+
+import pytest
+from sqlalchemy import event, insert, text
+
+from app.database.connection import SessionLocal, engine
+from app.database.dimensions import DimensionInterner
+from app.models.base import TransactionDetail
+from app.services.aggregation_service import AggregationService
+from app.services.analyze.transaction_filter import TransactionFilter
+from app.services.analyze.transaction_service import TransactionService
+from app.services.transaction_import_export_service import TransactionImportExportService
+from app.utils.amounts import derive_amount_columns
+from app.utils.fingerprint import compute_transaction_fingerprint
+from app.utils.time_buckets import derive_time_bucket_columns
+
+TABLE = TransactionDetail.__tablename__
+
+# 测试数据行数，行数过少时查询规划器会倾向全表扫描
+SEED_ROWS = 20000
+
+
+@dataclass
+class PlanCheck:
+    """一个热点查询的执行计划要求"""
+
+    name: str
+    run: Callable
+    # 允许使用的索引，查询规划器可以在其中任选
+    indexes: Tuple[str, ...]
+    # 是否要求只读索引不回表
+    covering: bool = False
+    # 是否允许使用临时 B 树排序或分组
+    allow_temp_btree: bool = False
+
+
+def seed(session, rows: int):
+    """生成测试交易数据"""
+    categories = ["住房", "餐饮", "生活", "娱乐", "交通", "旅行", "礼物", "人情", "交易", "工资"]
+    methods = ["支付宝", "微信支付", "银行卡", None]
+    start = datetime(2015, 1, 1)
+    now = datetime.now()
+    generator = random.Random(42)
+    records = []
+    for index in range(rows):
+        record = {
+            "transaction_time": start + timedelta(minutes=263 * index),
+            "category": generator.choice(categories),
+            "amount": round(generator.uniform(1, 5000), 2),
+            "income_expense_type": generator.choice(["收入", "支出", "不计收支"]),
+            "payment_method": generator.choice(methods),
+            "counterparty": f"商户{generator.randint(1, 3000)}",
+            "item_name": f"商品{generator.randint(1, 500)}",
+            "remarks": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        record.update(derive_amount_columns(record["amount"], record["income_expense_type"]))
+        record.update(derive_time_bucket_columns(record["transaction_time"]))
+        record["fingerprint"] = compute_transaction_fingerprint(
+            record["transaction_time"], record["amount"], record["counterparty"], record["item_name"]
+        )
+        records.append(record)
+    DimensionInterner(session).assign_ids(records)
+    session.execute(insert(TransactionDetail), records)
+    session.commit()
+    session.execute(text(f"ANALYZE {TABLE}"))
+    session.commit()
+
+
+@contextmanager
+def capture_statements():
+    """记录期间执行的 SELECT 语句及参数"""
+    statements: List[Tuple[str, object]] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and f"FROM {TABLE}" in statement:
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def explain(session, statement: str, parameters) -> List[str]:
+    connection = session.connection().connection.driver_connection
+    cursor = connection.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+    return [row[3] for row in cursor.fetchall()]
+
+
+def find_problems(session, plan_check: PlanCheck) -> List[str]:
+    """执行查询并检查执行计划，返回发现的问题"""
+    with capture_statements() as statements:
+        plan_check.run(session)
+    if not statements:
+        return ["未捕获到查询语句"]
+
+    # 以最后一条访问交易明细的查询为准 (分页时之前可能有 COUNT 查询)
+    statement, parameters = statements[-1]
+    details = explain(session, statement, parameters)
+
+    problems = []
+    table_steps = [detail for detail in details if f" {TABLE} " in f"{detail} "]
+    if any(detail.strip() == f"SCAN {TABLE}" for detail in table_steps):
+        problems.append("全表扫描")
+    used = [name for name in plan_check.indexes if any(name in detail for detail in table_steps)]
+    if not used:
+        problems.append(f"未使用预期索引 ({' / '.join(plan_check.indexes)})")
+    elif plan_check.covering and not any("COVERING INDEX" in detail for detail in table_steps):
+        problems.append("未使用覆盖索引，需要回表")
+    if not plan_check.allow_temp_btree and any("USE TEMP B-TREE" in detail for detail in details):
+        problems.append("使用了临时 B 树排序")
+    if problems:
+        problems.append(f"SQL: {' '.join(statement.split())}")
+        problems.extend(details)
+    return problems
+
+
+def build_checks() -> List[PlanCheck]:
+    year_range = {"start_date": "2020-01-01", "end_date": "2020-12-31"}
+    hot_categories = {"categories": ["餐饮", "交通"], "income_expense_types": ["支出"]}
+
+    def records(order_by="transaction_time", **filters):
+        return lambda session: TransactionService.get_records(
+            session,
+            TransactionFilter.create(**filters),
+            limit=20,
+            order_by=order_by,
+            include_total=False,
+        )
+
+    def facets(field, **filters):
+        return lambda session: TransactionService.get_facets(
+            session, TransactionFilter.create(**filters), fields=[field]
+        )
+
+    def summary(**filters):
+        return lambda session: TransactionService.get_summary(session, TransactionFilter.create(**filters))
+
+    def month_aggregation(**options):
+        return lambda session: AggregationService._calculate_grouped_aggregation(
+            session,
+            AggregationService._get_category_mapping(),
+            AggregationService._get_financial_fields(),
+            **options,
+        )
+
+    def dedup_lookup(session):
+        TransactionImportExportService._load_existing_keys(
+            session, [datetime(2020, 1, 1, 12, 0), datetime(2020, 1, 2, 8, 30)]
+        )
+
+    return [
+        PlanCheck(
+            "交易查询: 时间范围 + 分类 + 收支类型",
+            records(**year_range, **hot_categories),
+            ("ix_transaction_details_category_type_time", "ix_transaction_details_transaction_time"),
+            allow_temp_btree=True,
+        ),
+        PlanCheck(
+            "交易查询: 时间范围按时间排序",
+            records(**year_range),
+            ("ix_transaction_details_transaction_time",),
+        ),
+        PlanCheck(
+            "交易查询: 时间范围按金额排序",
+            records(order_by="amount", **year_range),
+            ("ix_transaction_details_transaction_time", "ix_transaction_details_time_dimensions"),
+            allow_temp_btree=True,
+        ),
+        PlanCheck(
+            "汇总统计: 时间范围 + 分类 + 收支类型",
+            summary(**year_range, **hot_categories),
+            ("ix_transaction_details_category_type_time",),
+            covering=True,
+            # 分组结果关联维度表后按名称排序，只涉及分组后的少量行
+            allow_temp_btree=True,
+        ),
+        PlanCheck(
+            "汇总统计: 时间范围",
+            summary(**year_range),
+            ("ix_transaction_details_category_type_time",),
+            covering=True,
+            allow_temp_btree=True,
+        ),
+        PlanCheck(
+            "筛选项统计: 交易对方",
+            facets("counterparty"),
+            ("ix_transaction_details_counterparty_id",),
+            covering=True,
+            allow_temp_btree=True,
+        ),
+        PlanCheck(
+            "筛选项统计: 时间范围内的交易类型",
+            facets("category", **year_range),
+            ("ix_transaction_details_transaction_time", "ix_transaction_details_category_type_time"),
+            allow_temp_btree=True,
+        ),
+        PlanCheck(
+            "月度聚合: 指定月份",
+            month_aggregation(months=[datetime(2020, 1, 1), datetime(2020, 2, 1)]),
+            ("ix_transaction_details_month_category",),
+            covering=True,
+        ),
+        PlanCheck(
+            "月度聚合: 指定年份",
+            month_aggregation(year=2020),
+            ("ix_transaction_details_month_category",),
+            covering=True,
+        ),
+        PlanCheck(
+            "导入去重: 按交易时间查找已有记录",
+            dedup_lookup,
+            ("ix_transaction_details_transaction_time", "ix_transaction_details_time_dimensions"),
+        ),
+    ]
+
+
+@pytest.fixture(scope="module")
+def seeded_session(clear_tables):
+    """生成测试数据的会话，模块结束后删除测试数据"""
+    session = SessionLocal()
+    try:
+        seed(session, SEED_ROWS)
+        yield session
+    finally:
+        session.rollback()
+        clear_tables()
+        session.close()
+
+
+@pytest.mark.parametrize("plan_check", build_checks(), ids=lambda plan_check: plan_check.name)
+def test_query_plan(seeded_session, plan_check):
+    problems = find_problems(seeded_session, plan_check)
+    assert not problems, "\n".join(problems)
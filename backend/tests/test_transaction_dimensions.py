@@ -0,0 +1,96 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import insert, text
+from sqlalchemy.exc import IntegrityError
+
+from app.models.base import CounterpartyDimension, TransactionDetail
+from app.services.analyze.transaction_filter import TransactionFilter
+from app.services.analyze.transaction_service import TransactionService
+from app.utils.fingerprint import compute_transaction_fingerprint
+
+
+def add_transaction(db, **values):
+    transaction = TransactionDetail(
+        transaction_time=datetime(2024, 3, 1, 12, 30),
+        category="餐饮",
+        amount=25.5,
+        income_expense_type="支出",
+        payment_method="支付宝",
+        counterparty="第一食堂",
+        item_name="午餐",
+        **values,
+    )
+    db.add(transaction)
+    db.commit()
+    return transaction
+
+
+def test_orm_write_stores_dimension_ids(db):
+    transaction = add_transaction(db)
+    counterparty_id = transaction.counterparty_id
+
+    assert transaction.category_id is not None
+    assert (transaction.category, transaction.payment_method, transaction.counterparty) == (
+        "餐饮",
+        "支付宝",
+        "第一食堂",
+    )
+    assert db.get(CounterpartyDimension, counterparty_id).name == "第一食堂"
+
+    transaction.counterparty = "第二食堂"
+    db.commit()
+
+    assert transaction.counterparty_id != counterparty_id
+    assert transaction.counterparty == "第二食堂"
+    assert transaction.fingerprint == compute_transaction_fingerprint(
+        datetime(2024, 3, 1, 12, 30), 25.5, "第二食堂", "午餐"
+    )
+    # 全文索引触发器按新的维度 id 同步交易对方
+    result = TransactionService.get_records(db, TransactionFilter.create(keyword="第二食堂"))
+    assert [record.counterparty for record in result["records"]] == ["第二食堂"]
+    assert TransactionService.get_records(db, TransactionFilter.create(keyword="第一食堂"))["total"] == 0
+
+
+def test_category_is_required(db):
+    db.add(
+        TransactionDetail(
+            transaction_time=datetime(2024, 3, 1), amount=1.0, income_expense_type="支出"
+        )
+    )
+    with pytest.raises(IntegrityError):
+        db.commit()
+
+
+def test_records_view_uses_dimension_names(db):
+    transaction = add_transaction(db, remarks="备注")
+
+    row = db.execute(
+        text(
+            "SELECT category, payment_method, counterparty, remarks "
+            "FROM transaction_records WHERE id = :id"
+        ),
+        {"id": transaction.id},
+    ).one()
+    assert tuple(row) == ("餐饮", "支付宝", "第一食堂", "备注")
+
+
+def test_summary_keeps_rows_without_category_name(db):
+    add_transaction(db)
+    # 维度表中不存在的 category_id (如绕过应用直接写入)
+    db.execute(
+        insert(TransactionDetail.__table__).values(
+            transaction_time=datetime(2024, 3, 2),
+            amount=10.0,
+            amount_cents=1000,
+            signed_amount_cents=-1000,
+            income_expense_type="支出",
+            category_id=-1,
+        )
+    )
+    db.commit()
+
+    summary = TransactionService.get_summary(db)
+    assert summary["count"] == 2
+    assert summary["expense"] == 35.5
+    assert {item["category"] for item in summary["categories"]} == {"餐饮", None}
@@ -0,0 +1,21 @@
+import io
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+def test_export_parquet(client, sample_transactions):
+    response = client.get("/api/v1/transactions/export", params={"format": "parquet"})
+    assert response.status_code == 200
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.column("金额").to_pylist() == [40.5, 3.0]
+    assert table.schema.field("交易时间").type == pa.timestamp("us")
+
+
+def test_export_arrow(client, sample_transactions):
+    response = client.get(
+        "/api/v1/transactions/export", params={"format": "arrow", "order_direction": "asc"}
+    )
+    assert response.status_code == 200
+    table = pa.ipc.open_file(pa.BufferReader(response.content)).read_all()
+    assert table.column("交易对方").to_pylist() == ["地铁", "餐厅"]
@@ -0,0 +1,61 @@
+from datetime import datetime
+
+from app.models.base import TransactionDetail
+from app.services.transaction_import_export_service import TransactionImportExportService
+from app.utils.fingerprint import compute_transaction_fingerprint
+
+
+def test_orm_insert_sets_fingerprint(db, import_csv):
+    transaction = TransactionDetail(
+        transaction_time=datetime(2024, 3, 1, 12, 30),
+        category="餐饮",
+        amount=25.5,
+        income_expense_type="支出",
+        counterparty=" 食堂 ",
+        item_name="午餐",
+    )
+    db.add(transaction)
+    db.commit()
+
+    assert transaction.fingerprint == compute_transaction_fingerprint(
+        datetime(2024, 3, 1, 12, 30), 25.5, "食堂", "午餐"
+    )
+
+    result = import_csv(["2024-03-01 12:30:00,餐饮,25.5,支出,微信支付,食堂,午餐,"])
+    assert result["imported_count"] == 0
+    assert result["duplicate_count"] == 1
+
+
+def test_import_skips_rows_already_in_time_window(db, import_csv):
+    rows = [
+        "2024-03-01 08:00:00,交通,3,支出,支付宝,地铁,车票,",
+        "2024-03-05 18:00:00,餐饮,40,支出,支付宝,餐厅,晚餐,",
+    ]
+    first = import_csv(rows)
+    assert first["imported_count"] == 2
+
+    rows.append("2024-03-03 12:00:00,餐饮,20,支出,支付宝,餐厅,午餐,")
+    second = import_csv(rows)
+    assert second["imported_count"] == 1
+    assert second["duplicate_count"] == 2
+    assert db.query(TransactionDetail).count() == 3
+
+
+def test_import_counts_fingerprint_conflicts_as_duplicates(db, import_csv, monkeypatch):
+    rows = ["2024-03-01 08:00:00,交通,3,支出,支付宝,地铁,车票,"]
+    import_csv(rows)
+
+    # 模拟并发导入：去重查询之后另一个导入已写入相同记录，只剩唯一索引兜底
+    monkeypatch.setattr(
+        TransactionImportExportService,
+        "_mark_duplicates",
+        staticmethod(lambda db, records, enable_deduplication=True: [False] * len(records)),
+    )
+    result = import_csv(rows)
+    assert result["imported_count"] == 0
+    assert result["duplicate_count"] == 1
+    assert [(detail["row"], detail["counterparty"]) for detail in result["duplicate_details"]] == [
+        (2, "地铁")
+    ]
+    assert result["duplicate_details"][0]["reason"].startswith("数据重复")
+    assert db.query(TransactionDetail).count() == 1
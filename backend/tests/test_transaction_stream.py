@@ -0,0 +1,27 @@
+import json
+
+import pyarrow as pa
+
+
+def test_search_streams_arrow_ipc(client, sample_transactions):
+    response = client.post(
+        "/api/v1/transactions/search",
+        json={"order_by": "transaction_time", "order_direction": "asc"},
+        headers={"Accept": "application/vnd.apache.arrow.stream"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/vnd.apache.arrow.stream")
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.column("counterparty").to_pylist() == ["地铁", "餐厅"]
+    assert table.column("amount").to_pylist() == [3.0, 40.5]
+
+
+def test_search_streams_ndjson(client, sample_transactions):
+    response = client.post(
+        "/api/v1/transactions/search",
+        params={"format": "ndjson"},
+        json={"categories": ["餐饮"]},
+    )
+    assert response.status_code == 200
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [record["item_name"] for record in records] == ["晚餐"]
@@ -9,17 +9,17 @@ import {
 import { Chart } from "react-chartjs-2";
 import { useTranslation } from "react-i18next";
 import { expenseCategories, getCategoryLabel } from "../../utils/chart-utils";
-import { FinancialAggregationRecord } from "../../services/types";
+import { CategoryBreakdownResult } from "../../services/types";
 
 ChartJS.register(ArcElement, Tooltip, Legend);
 
 interface ExpensePieChartProps {
-  financialData: FinancialAggregationRecord[] | null;
+  breakdown: CategoryBreakdownResult | null | undefined;
   loading: boolean;
 }
 
 const ExpensePieChart: React.FC<ExpensePieChartProps> = ({
-  financialData,
+  breakdown,
   loading,
 }) => {
   const chartRef = useRef<ChartJS<"doughnut">>(null);
@@ -36,7 +36,7 @@ const ExpensePieChart: React.FC<ExpensePieChartProps> = ({
     );
   }
 
-  if (!financialData || financialData.length === 0) {
+  if (!breakdown || breakdown.categories.length === 0) {
     return (
       <div className="bg-white rounded-xl shadow-lg p-6 hover:shadow-xl transition-shadow duration-300">
         <div className="h-96 w-full flex items-center justify-center">
@@ -46,16 +46,14 @@ const ExpensePieChart: React.FC<ExpensePieChartProps> = ({
     );
   }
 
+  const categoryValues = new Map(
+    breakdown.categories.map((item) => [item.key, item.value])
+  );
   const categoryData = expenseCategories
     .map((category) => ({
       ...category,
       label: getCategoryLabel(category.key, t),
-      value: Math.abs(
-        financialData.reduce((sum, record) => {
-          const categoryValue = record[category.key as keyof FinancialAggregationRecord];
-          return sum + (typeof categoryValue === 'number' ? categoryValue : 0);
-        }, 0)
-      ),
+      value: categoryValues.get(category.key) ?? 0,
     }))
     .filter((item) => item.value > 0);
 
@@ -99,10 +97,7 @@ const ExpensePieChart: React.FC<ExpensePieChartProps> = ({
         callbacks: {
           label: function (context) {
             const value = context.parsed as number;
-            const total = categoryData.reduce(
-              (sum, item) => sum + item.value,
-              0
-            );
+            const total = breakdown.total;
             const percentage = ((value / total) * 100).toFixed(1);
             return `${
               context.label
@@ -44,6 +44,8 @@ interface ImportResult {
     item_name: string;
     reason: string;
   }>;
+  error_details_truncated?: boolean;
+  duplicate_details_truncated?: boolean;
   parser_details?: {
     format?: string;
     encoding?: string;
@@ -76,6 +78,15 @@ const CSV_TO_DRAFT_KEY_MAP: Record<string, keyof TransactionDraftRow> = {
   备注: "remarks",
 };
 
+type ExportFormat = "csv" | "xlsx" | "parquet" | "arrow";
+
+const EXPORT_FORMAT_OPTIONS: Array<{ value: ExportFormat; label: string }> = [
+  { value: "csv", label: "CSV (.csv)" },
+  { value: "xlsx", label: "Excel (.xlsx)" },
+  { value: "parquet", label: "Parquet (.parquet)" },
+  { value: "arrow", label: "Arrow IPC (.arrow)" },
+];
+
 const ImportExportModal: React.FC<ImportExportModalProps> = ({
   isOpen,
   onClose,
@@ -86,6 +97,7 @@ const ImportExportModal: React.FC<ImportExportModalProps> = ({
   const [activeTab, setActiveTab] = useState<"import" | "export">(defaultTab);
   const [startDate, setStartDate] = useState("");
   const [endDate, setEndDate] = useState("");
+  const [exportFormat, setExportFormat] = useState<ExportFormat>("csv");
   const [importResult, setImportResult] = useState<ImportResult | null>(null);
   const [isImporting, setIsImporting] = useState(false);
   const [dragActive, setDragActive] = useState(false);
@@ -189,6 +201,7 @@ const ImportExportModal: React.FC<ImportExportModalProps> = ({
       const params = new URLSearchParams();
       if (startDate) params.append("start_date", startDate);
       if (endDate) params.append("end_date", endDate);
+      params.append("format", exportFormat);
 
       const response = await fetch(
         `${API_BASE_URL}/transactions/export?${params.toString()}`
@@ -205,7 +218,7 @@ const ImportExportModal: React.FC<ImportExportModalProps> = ({
 
       // 从响应头获取文件名，或使用默认文件名
       const contentDisposition = response.headers.get("content-disposition");
-      let filename = "transactions.csv";
+      let filename = `transactions.${exportFormat}`;
       if (contentDisposition) {
         const filenameMatch = contentDisposition.match(/filename=(.+)/);
         if (filenameMatch) {
@@ -737,7 +750,10 @@ const ImportExportModal: React.FC<ImportExportModalProps> = ({
                                 <ChevronDown className="w-4 h-4" />
                               )}
                               查看重复数据详情 (
-                              {importResult.duplicate_details.length} 条)
+                              {importResult.duplicate_details_truncated
+                                ? `仅显示前 ${importResult.duplicate_details.length} / ${importResult.duplicate_count}`
+                                : importResult.duplicate_details.length}{" "}
+                              条)
                             </button>
 
                             {showDuplicateDetails && (
@@ -789,7 +805,10 @@ const ImportExportModal: React.FC<ImportExportModalProps> = ({
                                 <ChevronDown className="w-4 h-4" />
                               )}
                               查看错误数据详情 (
-                              {importResult.error_details.length} 条)
+                              {importResult.error_details_truncated
+                                ? `仅显示前 ${importResult.error_details.length} / ${importResult.skipped_count}`
+                                : importResult.error_details.length}{" "}
+                              条)
                             </button>
 
                             {showErrorDetails && (
@@ -845,7 +864,11 @@ const ImportExportModal: React.FC<ImportExportModalProps> = ({
                 <h3 className="font-medium text-green-900 mb-2">导出说明</h3>
                 <ul className="text-sm text-green-800 space-y-1">
                   <li>• 可按时间范围导出交易明细</li>
-                  <li>• 导出格式为CSV，可用Excel等软件打开</li>
+                  <li>• CSV、Excel 格式可用Excel等软件打开</li>
+                  <li>
+                    • Parquet、Arrow 格式保留日期和金额类型，适合 pandas、DuckDB
+                    等工具分析
+                  </li>
                   <li>• 不选择日期范围将导出所有数据</li>
                 </ul>
               </div>
@@ -876,6 +899,26 @@ const ImportExportModal: React.FC<ImportExportModalProps> = ({
                 </div>
               </div>
 
+              {/* 导出格式选择 */}
+              <div>
+                <label className="block text-sm font-medium text-gray-700 mb-1">
+                  导出格式
+                </label>
+                <select
+                  value={exportFormat}
+                  onChange={(e) =>
+                    setExportFormat(e.target.value as ExportFormat)
+                  }
+                  className="w-full px-3 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent"
+                >
+                  {EXPORT_FORMAT_OPTIONS.map((option) => (
+                    <option key={option.value} value={option.value}>
+                      {option.label}
+                    </option>
+                  ))}
+                </select>
+              </div>
+
               {/* 导出按钮 */}
               <div>
                 <button
@@ -883,7 +926,7 @@ const ImportExportModal: React.FC<ImportExportModalProps> = ({
                   className="flex items-center gap-2 px-6 py-3 bg-green-500 text-white rounded-lg hover:bg-green-600"
                 >
                   <Download className="w-4 h-4" />
-                  导出CSV文件
+                  导出文件
                 </button>
               </div>
             </div>
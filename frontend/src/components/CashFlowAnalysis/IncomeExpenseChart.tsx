@@ -12,7 +12,7 @@ import {
   ChartOptions,
 } from "chart.js";
 import { Chart } from "react-chartjs-2";
-import { FinancialAggregationRecord } from "../../services/types";
+import { IncomeExpenseSeries } from "../../services/types";
 
 ChartJS.register(
   CategoryScale,
@@ -26,12 +26,12 @@ ChartJS.register(
 );
 
 interface IncomeExpenseChartProps {
-  financialData: FinancialAggregationRecord[] | null;
+  incomeExpense: IncomeExpenseSeries | null | undefined;
   loading: boolean;
 }
 
 const IncomeExpenseChart: React.FC<IncomeExpenseChartProps> = ({
-  financialData,
+  incomeExpense,
   loading,
 }) => {
   const chartRef = useRef<ChartJS<"bar">>(null);
@@ -47,7 +47,7 @@ const IncomeExpenseChart: React.FC<IncomeExpenseChartProps> = ({
     );
   }
 
-  if (!financialData || financialData.length === 0) {
+  if (!incomeExpense || incomeExpense.months.length === 0) {
     return (
       <div className="bg-white rounded-xl shadow-lg p-6 hover:shadow-xl transition-shadow duration-300">
         <div className="h-96 w-full flex items-center justify-center">
@@ -57,25 +57,7 @@ const IncomeExpenseChart: React.FC<IncomeExpenseChartProps> = ({
     );
   }
 
-  const months = financialData.map((record) => {
-    const date = new Date(record.month_date);
-    return `${date.getFullYear()}/${String(date.getMonth() + 1).padStart(
-      2,
-      "0"
-    )}`;
-  });
-
-  const expenses = financialData.map((record) => {
-    return Math.abs(
-      record.housing +
-        record.dining +
-        record.living +
-        record.entertainment +
-        record.transportation +
-        record.travel +
-        record.gifts
-    );
-  });
+  const months = incomeExpense.months.map((month) => month.replace("-", "/"));
 
   const data = {
     labels: months,
@@ -83,7 +65,7 @@ const IncomeExpenseChart: React.FC<IncomeExpenseChartProps> = ({
       {
         type: "bar" as const,
         label: "收入",
-        data: financialData.map((record) => record.salary),
+        data: incomeExpense.income,
         backgroundColor: "rgba(34, 197, 94, 0.8)",
         borderColor: "rgb(34, 197, 94)",
         borderWidth: 1,
@@ -93,7 +75,7 @@ const IncomeExpenseChart: React.FC<IncomeExpenseChartProps> = ({
       {
         type: "bar" as const,
         label: "支出",
-        data: expenses,
+        data: incomeExpense.expense,
         backgroundColor: "rgba(239, 68, 68, 0.8)",
         borderColor: "rgb(239, 68, 68)",
         borderWidth: 1,
@@ -103,7 +85,7 @@ const IncomeExpenseChart: React.FC<IncomeExpenseChartProps> = ({
       {
         type: "line" as const,
         label: "结余",
-        data: financialData.map((record) => record.balance),
+        data: incomeExpense.balance,
         borderColor: "rgb(59, 130, 246)",
         backgroundColor: "rgba(59, 130, 246, 0.1)",
         borderWidth: 3,
@@ -12,7 +12,7 @@ import {
 import { Chart } from "react-chartjs-2";
 import { useTranslation } from "react-i18next";
 import { expenseCategories, getCategoryLabel } from "../../utils/chart-utils";
-import { FinancialAggregationRecord } from "../../services/types";
+import { MonthlyExpenseSeries } from "../../services/types";
 
 ChartJS.register(
   CategoryScale,
@@ -24,12 +24,12 @@ ChartJS.register(
 );
 
 interface MonthlyExpenseChartProps {
-  financialData: FinancialAggregationRecord[] | null;
+  monthlyExpenses: MonthlyExpenseSeries | null | undefined;
   loading: boolean;
 }
 
 const MonthlyExpenseChart: React.FC<MonthlyExpenseChartProps> = ({
-  financialData,
+  monthlyExpenses,
   loading,
 }) => {
   const chartRef = useRef<ChartJS<"bar">>(null);
@@ -46,7 +46,7 @@ const MonthlyExpenseChart: React.FC<MonthlyExpenseChartProps> = ({
     );
   }
 
-  if (!financialData || financialData.length === 0) {
+  if (!monthlyExpenses || monthlyExpenses.months.length === 0) {
     return (
       <div className="bg-white rounded-xl shadow-lg p-6 hover:shadow-xl transition-shadow duration-300">
         <div className="h-96 w-full flex items-center justify-center">
@@ -57,19 +57,11 @@ const MonthlyExpenseChart: React.FC<MonthlyExpenseChartProps> = ({
   }
 
   // 准备数据：按月份和消费类别聚合
-  const months = financialData.map((record) => {
-    const date = new Date(record.month_date);
-    return `${date.getFullYear()}/${String(date.getMonth() + 1).padStart(
-      2,
-      "0"
-    )}`;
-  });
+  const months = monthlyExpenses.months.map((month) => month.replace("-", "/"));
 
   const datasets = expenseCategories.map((category) => ({
     label: getCategoryLabel(category.key, t),
-    data: financialData.map(
-      (record) => record[category.key as keyof typeof record] as number
-    ),
+    data: monthlyExpenses.series[category.key] ?? [],
     backgroundColor: category.color,
     borderColor: category.color,
     borderWidth: 1,
@@ -1,6 +1,6 @@
 import React from "react";
 import { Wallet, TrendingUp, TrendingDown, CreditCard } from "lucide-react";
-import { FinancialAggregationRecord } from "../../services/types";
+import { AnalyticsOverview } from "../../services/types";
 
 interface StatCardProps {
   title: string;
@@ -49,11 +49,11 @@ const StatCard: React.FC<StatCardProps> = ({
 };
 
 interface OverviewProps {
-  financialData: FinancialAggregationRecord[] | null;
+  overview: AnalyticsOverview | null | undefined;
   loading: boolean;
 }
 
-const Overview: React.FC<OverviewProps> = ({ financialData, loading }) => {
+const Overview: React.FC<OverviewProps> = ({ overview, loading }) => {
   // 处理 loading 状态和空数据
   if (loading) {
     return (
@@ -72,7 +72,7 @@ const Overview: React.FC<OverviewProps> = ({ financialData, loading }) => {
     );
   }
 
-  if (!financialData || financialData.length < 2) {
+  if (!overview || overview.month_count < 2) {
     return (
       <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-4 gap-6 mb-8">
         {[1, 2, 3, 4].map((i) => (
@@ -89,42 +89,14 @@ const Overview: React.FC<OverviewProps> = ({ financialData, loading }) => {
     );
   }
 
-  // 计算统计数据
-  // 计算总收入（所有月份的收入总和）
-  const totalIncome = financialData.reduce((sum, record) => sum + record.salary, 0);
-
-  // 计算总支出（所有月份的支出总和）
-  const totalExpenses = financialData.reduce((sum, record) => {
-    return sum + Math.abs(
-      record.housing +
-      record.dining +
-      record.living +
-      record.entertainment +
-      record.transportation +
-      record.travel +
-      record.gifts
-    );
-  }, 0);
-
-  // 计算总结余（总收入 - 总支出）
-  const totalBalance = totalIncome - totalExpenses;
-
-  // 计算均匀消费支出（平均每月支出）
-  const avgMonthlyExpenses = totalExpenses / financialData.length;
-  const avgMonthlyExpensesLastPeriod = financialData.length > 1 ? 
-    financialData.slice(0, -1).reduce((sum, record) => {
-      return sum + Math.abs(
-        record.housing +
-        record.dining +
-        record.living +
-        record.entertainment +
-        record.transportation +
-        record.travel +
-        record.gifts
-      );
-    }, 0) / (financialData.length - 1) : 0;
-  const avgExpenseChange = avgMonthlyExpensesLastPeriod > 0 ?
-    (((avgMonthlyExpenses - avgMonthlyExpensesLastPeriod) / avgMonthlyExpensesLastPeriod) * 100).toFixed(1) : "0.0";
+  // 统计数据由后端在SQL中汇总
+  const {
+    total_income: totalIncome,
+    total_expense: totalExpenses,
+    total_balance: totalBalance,
+    avg_monthly_expense: avgMonthlyExpenses,
+  } = overview;
+  const avgExpenseChange = overview.avg_expense_change.toFixed(1);
 
   return (
     <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-4 gap-6 mb-8">
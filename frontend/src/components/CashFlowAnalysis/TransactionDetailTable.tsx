@@ -20,12 +20,16 @@ import {
   Search,
   X,
 } from "lucide-react";
-import { TransactionDetail } from "../../services/types";
+import {
+  TransactionDetail,
+  TransactionFacetResult,
+} from "../../services/types";
 import { formatCurrency, formatDate } from "../../utils/chart-utils";
 
 interface TransactionDetailTableProps {
   data: TransactionDetail[];
   loading?: boolean;
+  facets?: TransactionFacetResult | null;
 }
 
 const columnHelper = createColumnHelper<TransactionDetail>();
@@ -107,6 +111,7 @@ const SelectFilter: React.FC<{
 const TransactionDetailTable: React.FC<TransactionDetailTableProps> = ({
   data,
   loading = false,
+  facets,
 }) => {
   const [sorting, setSorting] = useState<SortingState>([
     { id: "transaction_time", desc: false }, // 修改为增序排列
@@ -124,28 +129,36 @@ const TransactionDetailTable: React.FC<TransactionDetailTableProps> = ({
       })
       )
     ).sort();
-    const categories = Array.from(
-      new Set(data.map((item) => item.category))
-    ).sort();
-    const incomeExpenseTypes = Array.from(
-      new Set(data.map((item) => item.income_expense_type))
-    ).sort();
-    const paymentMethods = Array.from(
-      new Set(
-        data
-          .map((item) => item.payment_method)
-          .filter((method): method is string => Boolean(method))
-      )
-    ).sort();
-    const counterparties = Array.from(
-      new Set(
-        data
-          .map((item) => item.counterparty)
-          .filter((party): party is string => Boolean(party))
+    // 优先使用后端统计的筛选项，未提供时从当前数据中聚合
+    const facetValues = (field: string) =>
+      facets?.facets[field]?.values.map((item) => item.value);
+
+    const categories =
+      facetValues("category") ??
+      Array.from(new Set(data.map((item) => item.category))).sort();
+    const incomeExpenseTypes =
+      facetValues("income_expense_type") ??
+      Array.from(new Set(data.map((item) => item.income_expense_type))).sort();
+    const paymentMethods =
+      facetValues("payment_method") ??
+      Array.from(
+        new Set(
+          data
+            .map((item) => item.payment_method)
+            .filter((method): method is string => Boolean(method))
+        )
+      ).sort();
+    const counterparties =
+      facetValues("counterparty") ??
+      Array.from(
+        new Set(
+          data
+            .map((item) => item.counterparty)
+            .filter((party): party is string => Boolean(party))
+        )
       )
-    )
-      .sort()
-      .slice(0, 50); // 限制数量
+        .sort()
+        .slice(0, 50); // 限制数量
 
     return {
       transactionMonths,
@@ -154,7 +167,7 @@ const TransactionDetailTable: React.FC<TransactionDetailTableProps> = ({
       paymentMethods,
       counterparties,
     };
-  }, [data]);
+  }, [data, facets]);
 
   // 定义列配置
   const columns = useMemo(
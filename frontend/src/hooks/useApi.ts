@@ -62,6 +62,29 @@ export function useGetFinancialAggregationRecords(
   }, [startDate, endDate]);
 }
 
+/**
+ * 现金流看板图表数据Hook
+ */
+export function useCashFlowAnalytics(
+  startDate?: string | null,
+  endDate?: string | null
+) {
+  return useApi(async () => {
+    const query = {
+      start_date: startDate || undefined,
+      end_date: endDate || undefined,
+    };
+    const [overview, categoryBreakdown, monthlyExpenses, incomeExpense] =
+      await Promise.all([
+        api.getAnalyticsOverview(query),
+        api.getCategoryBreakdown(query),
+        api.getMonthlyExpenses(query),
+        api.getIncomeExpense(query),
+      ]);
+    return { overview, categoryBreakdown, monthlyExpenses, incomeExpense };
+  }, [startDate, endDate]);
+}
+
 /**
  * 获取所有财务数据（用于计算日期范围）
  */
@@ -96,6 +119,22 @@ export function useSearchTransactionDetails(
   );
 }
 
+/**
+ * 交易筛选项统计Hook
+ */
+export function useTransactionFacets(
+  facetQuery: any = {},
+  immediate: boolean = true
+) {
+  return useApi(
+    async () => {
+      return await api.getTransactionFacets(facetQuery);
+    },
+    [JSON.stringify(facetQuery)],
+    { immediate }
+  );
+}
+
 /**
  * 健康检查Hook
  */
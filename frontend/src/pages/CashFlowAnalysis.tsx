@@ -26,6 +26,8 @@ import {
   useGetFinancialAggregationRecords,
   useGetAllFinancialRecords,
   useSearchTransactionDetails,
+  useTransactionFacets,
+  useCashFlowAnalytics,
 } from "../hooks/useApi";
 import {
   getDateRangeFromTimeRange,
@@ -78,6 +80,13 @@ const CashFlowAnalysis: React.FC = () => {
     refetch: refetchFinancialData,
   } = useGetFinancialAggregationRecords(dateRange.startDate, dateRange.endDate);
 
+  // 获取看板图表数据（后端汇总）
+  const {
+    data: analytics,
+    loading: analyticsLoading,
+    refetch: refetchAnalytics,
+  } = useCashFlowAnalytics(dateRange.startDate, dateRange.endDate);
+
   // 获取交易详情数据
   const {
     data: transactionData,
@@ -90,6 +99,13 @@ const CashFlowAnalysis: React.FC = () => {
     order_direction: "asc", // 修改为增序排列
   });
 
+  // 获取交易明细表格的筛选项
+  const { data: transactionFacets, refetch: refetchTransactionFacets } =
+    useTransactionFacets({
+      start_date: dateRange.startDate,
+      end_date: dateRange.endDate,
+    });
+
   const handleTimeRangeChange = (newTimeRange: TimeRange) => {
     setTimeRange(newTimeRange);
   };
@@ -98,7 +114,9 @@ const CashFlowAnalysis: React.FC = () => {
     const state = (location.state as { importSuccess?: boolean } | null) || null;
     if (state?.importSuccess) {
       refetchTransactions();
+      refetchTransactionFacets();
       refetchFinancialData();
+      refetchAnalytics();
       routerNavigate(`${location.pathname}${location.search}`, {
         replace: true,
         state: undefined,
@@ -109,7 +127,9 @@ const CashFlowAnalysis: React.FC = () => {
     location.search,
     location.state,
     refetchFinancialData,
+    refetchAnalytics,
     refetchTransactions,
+    refetchTransactionFacets,
     routerNavigate,
   ]);
 
@@ -250,7 +270,10 @@ const CashFlowAnalysis: React.FC = () => {
                       {t('cashFlow.overview')}
                     </h2>
                   </div>
-                  <Overview financialData={financialData} loading={loading} />
+                  <Overview
+                    overview={analytics?.overview}
+                    loading={analyticsLoading}
+                  />
                 </div>
 
                 {/* 图表区域 */}
@@ -264,8 +287,8 @@ const CashFlowAnalysis: React.FC = () => {
                       </h3>
                     </div>
                     <MonthlyExpenseChart
-                      financialData={financialData}
-                      loading={loading}
+                      monthlyExpenses={analytics?.monthlyExpenses}
+                      loading={analyticsLoading}
                     />
                   </div>
 
@@ -292,8 +315,8 @@ const CashFlowAnalysis: React.FC = () => {
                       </h3>
                     </div>
                     <ExpensePieChart
-                      financialData={financialData}
-                      loading={loading}
+                      breakdown={analytics?.categoryBreakdown}
+                      loading={analyticsLoading}
                     />
                   </div>
 
@@ -306,8 +329,8 @@ const CashFlowAnalysis: React.FC = () => {
                       </h3>
                     </div>
                     <IncomeExpenseChart
-                      financialData={financialData}
-                      loading={loading}
+                      incomeExpense={analytics?.incomeExpense}
+                      loading={analyticsLoading}
                     />
                   </div>
 
@@ -375,6 +398,7 @@ const CashFlowAnalysis: React.FC = () => {
                 <TransactionDetailTable
                   data={transactionData?.records || []}
                   loading={transactionLoading}
+                  facets={transactionFacets}
                 />
               </>
             )}
@@ -1,17 +1,29 @@
 /* eslint-disable @typescript-eslint/no-explicit-any */
 import { API_BASE_URL } from "./constants";
 import type {
+  AnalyticsOverview,
+  AnalyticsQuery,
+  CategoryBreakdownResult,
   FinancialAggregationRecord,
+  IncomeExpenseSeries,
+  MonthlyExpenseSeries,
   FinancialQuery,
   RequestOptions,
   TransactionImportPayload,
   TransactionImportResult,
+  TransactionFacetQuery,
+  TransactionFacetResult,
   TransactionFilterQuery,
   TransactionFilterResult,
+  TransactionSummaryResult,
 } from "./types";
 
+// 条件请求缓存的最大条目数
+const MAX_ETAG_CACHE_ENTRIES = 50;
+
 class RequestAPI {
   private baseURL: string;
+  private etagCache = new Map<string, { etag: string; data: any }>();
 
   constructor() {
     this.baseURL = API_BASE_URL;
@@ -89,6 +101,55 @@ class RequestAPI {
     });
   }
 
+  /**
+   * 带 ETag 条件请求的POST查询
+   * 浏览器不会为POST请求自动发送 If-None-Match，这里手动缓存响应，服务端返回304时复用
+   */
+  async postConditional<T = any>(endpoint: string, data: any = {}): Promise<T> {
+    const body = JSON.stringify(data);
+    const cacheKey = `${endpoint}:${body}`;
+    const cached = this.etagCache.get(cacheKey);
+
+    try {
+      const response = await fetch(`${this.baseURL}${endpoint}`, {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json",
+          ...(cached ? { "If-None-Match": cached.etag } : {}),
+        },
+        body,
+      });
+
+      if (response.status === 304 && cached) {
+        return cached.data as T;
+      }
+
+      if (!response.ok) {
+        const errorData = await response.json().catch(() => ({}));
+        throw new Error(
+          errorData.detail || `HTTP error! status: ${response.status}`
+        );
+      }
+
+      const result = await response.json();
+      const etag = response.headers.get("ETag");
+      this.etagCache.delete(cacheKey);
+      if (etag) {
+        this.etagCache.set(cacheKey, { etag, data: result });
+        if (this.etagCache.size > MAX_ETAG_CACHE_ENTRIES) {
+          const oldestKey = this.etagCache.keys().next().value;
+          if (oldestKey !== undefined) {
+            this.etagCache.delete(oldestKey);
+          }
+        }
+      }
+      return result;
+    } catch (error) {
+      console.error("API request failed:", error);
+      throw error;
+    }
+  }
+
   async postWithoutJsonHeader<T = any>(
     endpoint: string,
     body: FormData
@@ -127,12 +188,36 @@ class FinancialAPI extends RequestAPI {
   async searchTransactionDetails(
     filterQuery: TransactionFilterQuery
   ): Promise<TransactionFilterResult> {
-    return this.post<TransactionFilterResult>(
+    return this.postConditional<TransactionFilterResult>(
       "/transactions/search",
       filterQuery
     );
   }
 
+  /**
+   * 统计筛选条件下各字段的取值及记录数
+   */
+  async getTransactionFacets(
+    facetQuery: TransactionFacetQuery
+  ): Promise<TransactionFacetResult> {
+    return this.postConditional<TransactionFacetResult>(
+      "/transactions/facets",
+      facetQuery
+    );
+  }
+
+  /**
+   * 统计筛选条件下的记录数、收支合计及各交易类型的合计
+   */
+  async getTransactionSummary(
+    filterQuery: TransactionFilterQuery
+  ): Promise<TransactionSummaryResult> {
+    return this.postConditional<TransactionSummaryResult>(
+      "/transactions/summary",
+      filterQuery
+    );
+  }
+
   // === 财务聚合记录查询API ===
 
   /**
@@ -160,6 +245,47 @@ class FinancialAPI extends RequestAPI {
     });
   }
 
+  // === 现金流看板图表API ===
+
+  /**
+   * 获取各消费类别支出占比
+   */
+  async getCategoryBreakdown(
+    query: AnalyticsQuery = {}
+  ): Promise<CategoryBreakdownResult> {
+    return this.get<CategoryBreakdownResult>(
+      "/analytics/category-breakdown",
+      query
+    );
+  }
+
+  /**
+   * 获取按月份、消费类别拆分的支出序列
+   */
+  async getMonthlyExpenses(
+    query: AnalyticsQuery = {}
+  ): Promise<MonthlyExpenseSeries> {
+    return this.get<MonthlyExpenseSeries>("/analytics/monthly-expenses", query);
+  }
+
+  /**
+   * 获取每月收入、支出和结余序列
+   */
+  async getIncomeExpense(
+    query: AnalyticsQuery = {}
+  ): Promise<IncomeExpenseSeries> {
+    return this.get<IncomeExpenseSeries>("/analytics/income-expense", query);
+  }
+
+  /**
+   * 获取收支总览
+   */
+  async getAnalyticsOverview(
+    query: AnalyticsQuery = {}
+  ): Promise<AnalyticsOverview> {
+    return this.get<AnalyticsOverview>("/analytics/overview", query);
+  }
+
   // === 健康检查API ===
 
   /**
@@ -186,8 +312,15 @@ const api = new FinancialAPI();
 export const {
   // 交易记录
   searchTransactionDetails,
+  getTransactionFacets,
+  getTransactionSummary,
   // 财务记录
   getFinancialAggregationRecords,
+  // 看板图表
+  getCategoryBreakdown,
+  getMonthlyExpenses,
+  getIncomeExpense,
+  getAnalyticsOverview,
   // 健康检查
   healthCheck,
   importTransactionsFromRecords,
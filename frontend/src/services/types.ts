@@ -35,8 +35,11 @@ export interface TransactionFilterQuery {
   keyword?: string;
   skip?: number;
   limit?: number;
-  order_by?: "transaction_time" | "category" | "amount" | "income_expense_type" | "payment_method" | "counterparty" | "item_name" | "remarks";
+  order_by?: "transaction_time" | "category" | "amount" | "income_expense_type" | "payment_method" | "counterparty" | "item_name" | "remarks" | "relevance";
   order_direction?: "asc" | "desc";
+  pagination_mode?: "offset" | "cursor";  // cursor 模式按游标分页
+  cursor?: string;  // 上一页返回的 next_cursor
+  include_total?: boolean;  // 默认 offset 模式返回总数，cursor 模式不返回
 }
 
 // 分页信息接口
@@ -49,9 +52,92 @@ export interface PaginationInfo {
 // 筛选结果接口
 export interface TransactionFilterResult {
   records: TransactionDetail[];
-  total: number;
+  total: number | null;
   filters_applied: string[];
   pagination: PaginationInfo;
+  next_cursor?: string | null;
+}
+
+// 筛选项统计查询接口
+export interface TransactionFacetQuery {
+  start_date?: string;
+  end_date?: string;
+  categories?: string[];
+  income_expense_types?: string[];
+  payment_methods?: string[];
+  counterparties?: string[];
+  min_amount?: number;
+  max_amount?: number;
+  keyword?: string;
+  fields?: ("category" | "income_expense_type" | "payment_method" | "counterparty")[];
+  facet_limit?: number;
+  counterparty_prefix?: string;
+}
+
+// 筛选项取值接口
+export interface FacetValue {
+  value: string;
+  count: number;
+}
+
+// 单个字段的筛选项统计结果
+export interface FacetResult {
+  values: FacetValue[];
+  has_more: boolean;
+}
+
+// 筛选项统计结果接口
+export interface TransactionFacetResult {
+  facets: Record<string, FacetResult>;
+  filters_applied: string[];
+}
+
+// 交易汇总统计接口
+export interface TransactionSummaryCategory {
+  category: string | null;
+  income_expense_type: string;
+  count: number;
+  amount: number;
+}
+
+export interface TransactionSummaryResult {
+  count: number;
+  income: number;
+  expense: number;
+  categories: TransactionSummaryCategory[];
+  filters_applied: string[];
+}
+
+// 现金流看板图表数据接口
+export interface AnalyticsQuery {
+  start_date?: string;
+  end_date?: string;
+}
+
+export interface CategoryBreakdownResult {
+  categories: { key: string; value: number }[];
+  total: number;
+}
+
+export interface MonthlyExpenseSeries {
+  months: string[];  // YYYY-MM
+  series: Record<string, number[]>;
+}
+
+export interface IncomeExpenseSeries {
+  months: string[];  // YYYY-MM
+  income: number[];
+  expense: number[];
+  balance: number[];
+}
+
+export interface AnalyticsOverview {
+  month_count: number;
+  total_income: number;
+  total_expense: number;
+  total_balance: number;
+  avg_monthly_expense: number;
+  avg_expense_change: number;  // 平均月支出变化百分比
 }
 
 // 财务聚合记录相关接口
@@ -122,6 +208,8 @@ export interface TransactionImportResult {
   duplicate_count: number;
   error_details: ImportErrorDetail[];
   duplicate_details: ImportDuplicateDetail[];
+  error_details_truncated?: boolean;
+  duplicate_details_truncated?: boolean;
 }
 
 export interface PortfolioCashInfo {